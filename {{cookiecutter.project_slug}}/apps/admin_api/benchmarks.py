@@ -0,0 +1,337 @@
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+import django
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+# Rows created per unit of --size for each benchmarked model
+SCALE = {
+    'post': 1,
+    'comment': 3,
+    'task': 1,
+    'order': 1,
+    'requestlog': 10,
+}
+
+# (model label, model_name used by the admin API router)
+BENCHMARK_MODELS = [
+    ('blog.Post', 'post'),
+    ('blog.Comment', 'comment'),
+    ('todo.Task', 'task'),
+    ('shop.Order', 'order'),
+    ('core.RequestLog', 'requestlog'),
+]
+
+SEARCH_TERM = 'lorem'
+IMPORT_ROWS = 50
+BATCH_SIZE = 1000
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+    'incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud'
+).split()
+
+
+def _get_model(label):
+    app_label, model_name = label.split('.')
+    try:
+        return apps.get_model(app_label, model_name)
+    except LookupError:
+        return None
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _bulk_create(model, objects):
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def generate_benchmark_data(size, seed=0):
+    """
+    Creates a deterministic data set scaled by ``size`` for every benchmarked
+    model whose app is installed. Rows go in with bulk_create, so model
+    signals do not fire. Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    created = {}
+
+    _bulk_create(User, [
+        User(username=f'bench-user-{i}', email=f'bench-user-{i}@example.com')
+        for i in range(max(size // 10, 1))
+    ])
+    users = list(User.objects.filter(username__startswith='bench-user-'))
+
+    Post = _get_model('blog.Post')
+    if Post is not None:
+        posts = []
+        for i in range(size * SCALE['post']):
+            status = rng.choice(['published', 'published', 'draft', 'archived'])
+            posts.append(Post(
+                title=_sentence(rng, 6),
+                slug=f'bench-post-{i}',
+                content='\n\n'.join(_sentence(rng, 40) for _ in range(5)),
+                excerpt=_sentence(rng, 20),
+                author=rng.choice(users),
+                status=status,
+                is_featured=rng.random() < 0.1,
+                view_count=rng.randint(0, 5000),
+                # Always in the past: no signal moves a future post to scheduled here
+                published_at=now - timedelta(days=rng.randint(0, 365)) if status == 'published' else None,
+            ))
+        _bulk_create(Post, posts)
+        created['post'] = len(posts)
+
+        Comment = _get_model('blog.Comment')
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        comments = [
+            Comment(
+                post_id=rng.choice(post_ids),
+                author_name=f'Reader {i}',
+                author_email=f'reader-{i}@example.com',
+                content=_sentence(rng, 25),
+                is_approved=rng.random() < 0.8,
+            )
+            for i in range(size * SCALE['comment'])
+        ]
+        _bulk_create(Comment, comments)
+        created['comment'] = len(comments)
+
+    Task = _get_model('todo.Task')
+    if Task is not None:
+        Project = _get_model('todo.Project')
+        _bulk_create(Project, [
+            Project(name=f'Benchmark project {i}', owner=rng.choice(users))
+            for i in range(max(size // 100, 1))
+        ])
+        projects = list(Project.objects.filter(name__startswith='Benchmark project '))
+        tasks = [
+            Task(
+                project=rng.choice(projects),
+                title=_sentence(rng, 5),
+                description=_sentence(rng, 30),
+                status=rng.choice(Task.Status.values),
+                assignee=rng.choice(users),
+                due_date=(now + timedelta(days=rng.randint(-30, 60))).date(),
+                metadata={'priority': rng.choice(['low', 'medium', 'high'])},
+            )
+            for _ in range(size * SCALE['task'])
+        ]
+        _bulk_create(Task, tasks)
+        created['task'] = len(tasks)
+
+    Order = _get_model('shop.Order')
+    if Order is not None:
+        statuses = [choice for choice, _ in Order.STATUS_CHOICES]
+        orders = [
+            Order(
+                user=rng.choice(users),
+                first_name=f'First{i}',
+                last_name=f'Last{i}',
+                email=f'customer-{i}@example.com',
+                address=f'{i} {_sentence(rng, 2)} Street',
+                postal_code=f'{rng.randint(10000, 99999)}',
+                city=rng.choice(['Berlin', 'Paris', 'London', 'Lagos', 'Douala']),
+                status=rng.choice(statuses),
+            )
+            for i in range(size * SCALE['order'])
+        ]
+        _bulk_create(Order, orders)
+        created['order'] = len(orders)
+
+    RequestLog = _get_model('core.RequestLog')
+    logs = [
+        RequestLog(
+            user=rng.choice(users) if rng.random() < 0.5 else None,
+            ip_address=f'10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+            method=rng.choice(['GET', 'GET', 'GET', 'POST', 'PATCH', 'DELETE']),
+            path=f'/api/blog/posts/{rng.choice(WORDS)}-{rng.randint(1, 500)}/',
+            status_code=rng.choice([200, 200, 200, 201, 304, 400, 404, 500]),
+            response_time_ms=rng.randint(5, 800),
+        )
+        for _ in range(size * SCALE['requestlog'])
+    ]
+    _bulk_create(RequestLog, logs)
+    created['requestlog'] = len(logs)
+    return created
+
+
+def _filter_params(model, model_name):
+    """Query parameters for the first choice or boolean list_filter, using a stored value."""
+    from .urls import admin_viewsets
+
+    for name in admin_viewsets[model_name].filterset_fields:
+        if not isinstance(name, str):
+            continue
+        field = model._meta.get_field(name)
+        if field.choices or field.get_internal_type() == 'BooleanField':
+            value = model.objects.values_list(name, flat=True).first()
+            if value is not None:
+                return {name: value}
+    return {}
+
+
+def _import_payload(iteration):
+    rows = [{'name': f'bench-import-{iteration}-{i}'} for i in range(IMPORT_ROWS)]
+    return {'file': SimpleUploadedFile('tags.json', json.dumps(rows).encode(), content_type='application/json')}
+
+
+def get_scenarios():
+    """
+    Returns the benchmark scenarios as (name, method, url, params) tuples.
+    ``params`` may be a callable taking the iteration number, for requests
+    that must differ between runs.
+    """
+    from .urls import admin_viewsets
+
+    scenarios = []
+    for label, model_name in BENCHMARK_MODELS:
+        model = _get_model(label)
+        if model is None or model_name not in admin_viewsets:
+            continue
+        list_url = reverse(f'admin_api:{model_name}-list')
+        pk = model._base_manager.values_list('pk', flat=True).first()
+        scenarios.append((f'{model_name}.list', 'get', list_url, {}))
+        if pk is not None:
+            scenarios.append((f'{model_name}.retrieve', 'get', reverse(f'admin_api:{model_name}-detail', args=[pk]), {}))
+        if admin_viewsets[model_name].search_fields:
+            scenarios.append((f'{model_name}.search', 'get', list_url, {'search': SEARCH_TERM}))
+        filter_params = _filter_params(model, model_name)
+        if filter_params:
+            scenarios.append((f'{model_name}.filter', 'get', list_url, filter_params))
+        # CSV is the default; DRF reserves ?format= for renderer selection
+        scenarios.append((f'{model_name}.export', 'get', reverse(f'admin_api:{model_name}-export'), {}))
+
+    scenarios.append(('tag.import', 'post', reverse('admin_api:tag-bulk-import'), _import_payload))
+    try:
+        scenarios.append(('dashboard', 'get', reverse('admin_api:dashboard-stats'), {}))
+    except NoReverseMatch:
+        pass
+    return scenarios
+
+
+def _percentile(samples, percent):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[percent - 1]
+
+
+def run_scenario(client, method, url, params, iterations, warmup=1):
+    """
+    Times ``iterations`` requests after ``warmup`` untimed ones, then replays
+    the request once more to count its queries and measure the peak memory
+    it allocates, so neither measurement slows the timed runs.
+    """
+    def send(iteration):
+        data = params(iteration) if callable(params) else params
+        if method == 'post':
+            return client.post(url, data, format='multipart')
+        return client.get(url, data)
+
+    iteration = 0
+    for _ in range(warmup):
+        send(iteration)
+        iteration += 1
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = send(iteration)
+        samples.append((time.perf_counter() - start) * 1000)
+        iteration += 1
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = send(iteration)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        'status_code': response.status_code,
+        'iterations': iterations,
+        'min_ms': round(samples[0], 2),
+        'p50_ms': round(_percentile(samples, 50), 2),
+        'p90_ms': round(_percentile(samples, 90), 2),
+        'p95_ms': round(_percentile(samples, 95), 2),
+        'p99_ms': round(_percentile(samples, 99), 2),
+        'max_ms': round(samples[-1], 2),
+        'mean_ms': round(statistics.fmean(samples), 2),
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(size, iterations=20, warmup=1, seed=0, only=None, stdout=None):
+    """
+    Seeds the current database and runs every scenario (or those whose name
+    starts with one of ``only``) through the API as a superuser. Returns a
+    JSON-serializable report.
+    """
+    cache.clear()
+    data_start = time.perf_counter()
+    rows = generate_benchmark_data(size, seed=seed)
+    data_time = time.perf_counter() - data_start
+
+    admin = User.objects.create_superuser(username='bench-admin', email='bench-admin@example.com', password=None)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    results = {}
+    for name, method, url, params in get_scenarios():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = run_scenario(client, method, url, params, iterations, warmup=warmup)
+        if stdout is not None:
+            stdout(name, results[name])
+
+    return {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'database_version': '.'.join(str(part) for part in connection.get_database_version()),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'size': size,
+            'seed': seed,
+            'iterations': iterations,
+            'rows': rows,
+            'data_generation_s': round(data_time, 2),
+        },
+        'scenarios': results,
+    }
+
+
+def compare_reports(baseline, current, threshold=0.2, metric='p95_ms'):
+    """
+    Lists the scenarios that got slower than the baseline by more than
+    ``threshold`` (a fraction) on ``metric``, or that run more queries.
+    """
+    regressions = []
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if previous[metric] and result[metric] > previous[metric] * (1 + threshold):
+            change = (result[metric] - previous[metric]) / previous[metric]
+            regressions.append(f'{name}: {metric} {previous[metric]} -> {result[metric]} (+{change:.0%})')
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {result['queries']}")
+    return regressions
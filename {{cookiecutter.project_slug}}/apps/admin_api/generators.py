@@ -3,10 +3,17 @@ from django.db import models
 from rest_framework import serializers, viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
 from django.urls import reverse, NoReverseMatch
+from apps.core.authentication import with_stateless_jwt
+from apps.core.instrumentation import QueryBudgetMixin, TimedListSerializer, TimedSerializerMixin
+from apps.core.mixins import ConditionalGetMixin, LanguagePruningMixin
+from apps.core.permission_cache import has_cached_perm
 from .permissions import AdminPermission
+from .serializers import ModelUniqueValidationMixin, SparseFieldsetSerializerMixin
 from .utils import get_model_metadata
+from .viewsets import SparseFieldsetMixin
 from django.contrib.auth import get_user_model
 
 class AdminAPIGenerator:
@@ -61,6 +68,7 @@ class AdminAPIGenerator:
             
             Meta.model = model
             Meta.fields = [field.name for field in model._meta.fields] + ['groups', 'user_permissions']
+            Meta.list_serializer_class = TimedListSerializer
             Meta.extra_kwargs = {
                 'password': {'write_only': True, 'style': {'input_type': 'password'}}
             }
@@ -70,14 +78,20 @@ class AdminAPIGenerator:
                 'create': create,
                 'update': update,
             }
-            return type('UserAdminSerializer', (serializers.ModelSerializer,), attrs)
+            return type('UserAdminSerializer', (SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer), attrs)
         
         class Meta:
             pass
         
         Meta.model = model
-        Meta.fields = '__all__'
+        excluded = getattr(model_admin, 'exclude', None)
+        if excluded:
+            # Fields the admin hides stay out of the API as well
+            Meta.exclude = list(excluded)
+        else:
+            Meta.fields = '__all__'
         Meta.read_only_fields = getattr(model_admin, 'readonly_fields', [])
+        Meta.list_serializer_class = TimedListSerializer
         
         # Create dynamic serializer class
         attrs = {'Meta': Meta}
@@ -99,7 +113,8 @@ class AdminAPIGenerator:
                 )
         
         serializer_name = f'{model.__name__}AdminSerializer'
-        return type(serializer_name, (serializers.ModelSerializer,), attrs)
+        bases = (ModelUniqueValidationMixin, SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer)
+        return type(serializer_name, bases, attrs)
     
     @staticmethod
     def generate_viewset(model, model_admin):
@@ -107,8 +122,19 @@ class AdminAPIGenerator:
         
         serializer_class = AdminAPIGenerator.generate_serializer(model, model_admin)
         
-        class DynamicAdminViewSet(viewsets.ModelViewSet):
+        # Relations the serializer renders: foreign keys via their *_str fields and
+        # many-to-many fields as primary key lists
+        foreign_keys = [field.name for field in model._meta.fields if isinstance(field, models.ForeignKey)]
+        many_to_many = [field.name for field in model._meta.many_to_many]
+
+        class DynamicAdminViewSet(QueryBudgetMixin, ConditionalGetMixin, LanguagePruningMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+            # Read by AdminPermission to check the model permissions of non-superuser
+            # staff, as Django admin does; get_queryset builds the real one
+            queryset = model._default_manager.all()
+            authentication_classes = with_stateless_jwt(api_settings.DEFAULT_AUTHENTICATION_CLASSES)
             permission_classes = [AdminPermission]
+            list_display = getattr(model_admin, 'list_display', ())
+            query_budget = getattr(getattr(model_admin, 'Meta', None), 'query_budget', None)
             filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
             
             # Configure filtering based on admin settings
@@ -120,8 +146,22 @@ class AdminAPIGenerator:
             def get_queryset(self):
                 """Apply admin's queryset logic"""
                 if hasattr(model_admin, 'get_queryset'):
-                    return model_admin.get_queryset(self.request)
-                return model.objects.all()
+                    queryset = model_admin.get_queryset(self.request)
+                else:
+                    queryset = model.objects.all()
+
+                # Only join, prefetch and load what the requested fields read; language
+                # columns are pruned through the sparse fieldset, and only with ?lang=
+                fields = self.get_sparse_fieldset()
+                related = foreign_keys if fields is None else [name for name in foreign_keys if f'{name}_str' in fields]
+                prefetched = many_to_many if fields is None else [name for name in many_to_many if name in fields]
+                if related:
+                    # select_related() without arguments would follow every relation
+                    queryset = queryset.select_related(*related)
+                queryset = queryset.prefetch_related(*prefetched)
+                if fields is not None:
+                    queryset = queryset.only(*self.get_sparse_columns(model, fields))
+                return queryset
             
             @action(detail=False, methods=['post'], url_path='import')
             def bulk_import(self, request):
@@ -203,6 +243,7 @@ class AdminAPIGenerator:
                         'search_fields': getattr(model_admin, 'search_fields', []),
                         'readonly_fields': getattr(model_admin, 'readonly_fields', []),
                         'ordering': getattr(model_admin, 'ordering', []),
+                        'list_fields': self.get_list_fields(),
                     },
                     'permissions': self._get_permissions_info(request),
                     'frontend_config': getattr(model_admin.Meta, 'frontend_config', {}) 
@@ -219,18 +260,22 @@ class AdminAPIGenerator:
                 if not action_name or not ids:
                     return Response({'error': 'Action and ids required'}, status=400)
                 
+                # AdminPermission only checked the add permission a POST maps to.
+                # Django admin offers an action to users holding the permissions
+                # it declares; one declaring none still changes rows, so needs change
+                actions = model_admin.get_actions(request)
+                if action_name not in actions:
+                    return Response({'error': 'Action not found'}, status=404)
+                action_func = actions[action_name][0]
+                if not getattr(action_func, 'allowed_permissions', None) and not model_admin.has_change_permission(request):
+                    return Response({'error': 'You do not have permission to perform this action.'}, status=403)
+
                 queryset = self.get_queryset().filter(id__in=ids)
-                
-                # Check if action exists in model_admin
-                if hasattr(model_admin, action_name):
-                    action_func = getattr(model_admin, action_name)
-                    try:
-                        action_func(model_admin, request, queryset)
-                        return Response({'success': True, 'message': f'Action {action_name} completed'})
-                    except Exception as e:
-                        return Response({'error': str(e)}, status=400)
-                
-                return Response({'error': 'Action not found'}, status=404)
+                try:
+                    action_func(model_admin, request, queryset)
+                    return Response({'success': True, 'message': f'Action {action_name} completed'})
+                except Exception as e:
+                    return Response({'error': str(e)}, status=400)
             
             @action(detail=False, methods=['get'])
             def export(self, request):
@@ -249,10 +294,8 @@ class AdminAPIGenerator:
                 """Get user permissions for this model"""
                 opts = model._meta
                 return {
-                    'add': request.user.has_perm(f'{opts.app_label}.add_{opts.model_name}'),
-                    'change': request.user.has_perm(f'{opts.app_label}.change_{opts.model_name}'),
-                    'delete': request.user.has_perm(f'{opts.app_label}.delete_{opts.model_name}'),
-                    'view': request.user.has_perm(f'{opts.app_label}.view_{opts.model_name}'),
+                    action: has_cached_perm(request.user, f'{opts.app_label}.{action}_{opts.model_name}')
+                    for action in ('add', 'change', 'delete', 'view')
                 }
             
             def _export_csv(self, queryset):
@@ -265,7 +308,8 @@ class AdminAPIGenerator:
                 writer = csv.writer(response)
                 
                 # Write headers
-                fields = [f.name for f in model._meta.fields]
+                excluded = getattr(model_admin, 'exclude', None) or ()
+                fields = [f.name for f in model._meta.fields if f.name not in excluded]
                 writer.writerow(fields)
                 
                 # Write data
@@ -0,0 +1,208 @@
+import re
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DatabaseError, connections, models, router
+
+
+class IndexSuggestion:
+    """A missing index on a model, with the admin options that need it."""
+
+    def __init__(self, model, fields, sources):
+        self.model = model
+        self.fields = tuple(fields)
+        self.sources = list(sources)
+        self.row_count = None
+        self.plan = None
+        self.full_scan = None
+        self.sort = None
+
+    @property
+    def index(self):
+        index = models.Index(fields=list(self.fields), name='')
+        index.set_name_with_model(self.model)
+        return index
+
+    @property
+    def declaration(self):
+        index = self.index
+        return f"models.Index(fields={list(index.fields)!r}, name={index.name!r})"
+
+
+def _resolve_field(model, name):
+    """Returns the concrete local field behind an admin option, or None."""
+    if not isinstance(name, str):
+        return None
+    name = name.lstrip('-^=@').split('__')[0]
+    if name == 'pk':
+        return model._meta.pk
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not getattr(field, 'concrete', False) or field.many_to_many:
+        return None
+    return field
+
+
+def _get_admin_candidates(model, model_admin):
+    """
+    Collects the column sets the admin (and the generated viewsets) filter
+    and sort on. Returns the candidates in order and notes about lookups an
+    index cannot serve.
+    """
+    candidates = {}
+    notes = []
+
+    def add(fields, source):
+        key = tuple(field.name for field in fields)
+        candidates.setdefault(key, []).append(source)
+
+    for item in getattr(model_admin, 'list_filter', None) or ():
+        # Tuples are (field, filter class); filter classes have no column
+        field = _resolve_field(model, item[0] if isinstance(item, (list, tuple)) else item)
+        if field is not None:
+            add([field], 'list_filter')
+
+    date_hierarchy = getattr(model_admin, 'date_hierarchy', None)
+    field = _resolve_field(model, date_hierarchy)
+    if field is not None:
+        add([field], 'date_hierarchy')
+
+    ordering = getattr(model_admin, 'ordering', None) or model._meta.ordering
+    ordering_fields = []
+    for item in ordering or ():
+        field = _resolve_field(model, item)
+        if field is None:
+            break
+        ordering_fields.append(field)
+    if ordering_fields:
+        add(ordering_fields, 'ordering')
+
+    for item in getattr(model_admin, 'search_fields', None) or ():
+        if '__' in item.lstrip('^=@'):
+            continue
+        field = _resolve_field(model, item)
+        if field is None:
+            continue
+        if item[0] in '^=':
+            add([field], 'search_fields')
+        else:
+            notes.append(
+                f"search on '{field.name}' uses icontains or full-text lookups, "
+                "which a B-tree index cannot serve"
+            )
+
+    # A single column is served by any candidate that starts with it
+    for key in [key for key in candidates if len(key) == 1]:
+        longer = next((other for other in candidates if len(other) > 1 and other[0] == key[0]), None)
+        if longer is not None:
+            candidates[longer].extend(candidates.pop(key))
+
+    return candidates, notes
+
+
+def get_existing_indexes(model, connection):
+    """
+    Column tuples of every index on the model's table: the ones in the
+    database plus the ones declared on the model but not migrated yet.
+    """
+    existing = set()
+    try:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    except DatabaseError:
+        constraints = {}
+    for constraint in constraints.values():
+        if (constraint['index'] or constraint['unique'] or constraint['primary_key']) and constraint['columns']:
+            existing.add(tuple(constraint['columns']))
+
+    opts = model._meta
+    for field in opts.concrete_fields:
+        if field.primary_key or field.unique or field.db_index:
+            existing.add((field.column,))
+    for index in opts.indexes:
+        if index.fields:
+            existing.add(tuple(opts.get_field(name.lstrip('-')).column for name in index.fields))
+    for unique_together in opts.unique_together:
+        existing.add(tuple(opts.get_field(name).column for name in unique_together))
+    return existing
+
+
+def _is_covered(columns, existing):
+    return any(index[:len(columns)] == columns for index in existing)
+
+
+def _is_full_scan(plan):
+    # PostgreSQL, SQLite and MySQL spell a sequential scan differently
+    return bool(
+        'Seq Scan' in plan
+        or re.search(r'\bSCAN \S+\s*$', plan, re.MULTILINE)
+        or re.search(r'\bALL\b', plan)
+    )
+
+
+def _needs_sort(plan):
+    return bool(re.search(r'\bSort\b|TEMP B-TREE FOR ORDER BY|Using filesort', plan))
+
+
+def explain_suggestion(suggestion, using):
+    """
+    Runs EXPLAIN for a query shaped like the admin's and records the table
+    size and whether the database currently has to scan the whole table.
+    """
+    queryset = suggestion.model._base_manager.using(using)
+    suggestion.row_count = queryset.count()
+
+    leading = suggestion.fields[0]
+    if suggestion.sources == ['ordering']:
+        queryset = queryset.order_by(*suggestion.fields)[:25]
+    else:
+        value = queryset.exclude(**{f'{leading}__isnull': True}).values_list(leading, flat=True).first()
+        if value is None:
+            return suggestion
+        queryset = queryset.filter(**{leading: value}).order_by(*suggestion.fields[1:])
+    suggestion.plan = queryset.explain()
+    suggestion.full_scan = _is_full_scan(suggestion.plan)
+    suggestion.sort = _needs_sort(suggestion.plan)
+    return suggestion
+
+
+def suggest_indexes(app_labels=None, explain=False, admin_site=None):
+    """
+    Compares the columns every registered ModelAdmin filters, sorts and
+    searches on with the indexes that exist. Returns a list of
+    (model, suggestions, notes) for models with something to report.
+    Only the project's own apps are inspected.
+    """
+    admin_site = admin_site or admin.site
+    local_apps = getattr(settings, 'LOCAL_APPS', None)
+
+    report = []
+    for model, model_admin in admin_site._registry.items():
+        opts = model._meta
+        if app_labels and opts.app_label not in app_labels:
+            continue
+        if local_apps is not None and opts.app_config.name not in local_apps:
+            continue
+        if not opts.managed or opts.proxy:
+            continue
+
+        using = router.db_for_read(model)
+        existing = get_existing_indexes(model, connections[using])
+        candidates, notes = _get_admin_candidates(model, model_admin)
+
+        suggestions = []
+        for fields, sources in candidates.items():
+            columns = tuple(opts.get_field(name).column for name in fields)
+            if _is_covered(columns, existing):
+                continue
+            suggestion = IndexSuggestion(model, fields, sources)
+            if explain:
+                explain_suggestion(suggestion, using)
+            suggestions.append(suggestion)
+
+        if suggestions or notes:
+            report.append((model, suggestions, notes))
+    return report
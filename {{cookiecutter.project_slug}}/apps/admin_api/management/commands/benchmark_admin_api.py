@@ -0,0 +1,80 @@
+import json
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from apps.admin_api.benchmarks import compare_reports, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the generated admin API (list, retrieve, search, filter, export, import and dashboard) '
+        'against a throwaway test database and reports latency percentiles, query counts and peak memory. '
+        'Point DATABASE_URL at PostgreSQL to benchmark it instead of SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000, help='Scale of the generated data set (posts, tasks and orders).')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed requests before each scenario.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the data generator.')
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Only run scenarios starting with this name, e.g. "post" or "order.export". Repeatable.',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--compare', help='A previous JSON report to check for regressions.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed p95 slowdown against --compare, as a fraction (default 0.2).',
+        )
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database schema between runs; its rows are replaced.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        # Benchmark production behaviour: no debug toolbar and no query log
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if options['keepdb']:
+                # Keep the schema, not the rows of the last run: they would clash with the new ones
+                call_command('flush', interactive=False, verbosity=0)
+            self.stdout.write(f"Benchmarking on {connection.vendor} with size {options['size']}...")
+            report = run_benchmarks(
+                options['size'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                seed=options['seed'],
+                only=options['scenarios'],
+                stdout=self._write_result,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f"Report written to {options['output']}.")
+
+        if baseline is not None:
+            regressions = compare_reports(baseline, report, threshold=options['threshold'])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f'  {regression}'))
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}.')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def _write_result(self, name, result):
+        self.stdout.write(
+            f"{name:<22} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"p99 {result['p99_ms']:>8.2f}ms  {result['queries']:>3} queries  "
+            f"{result['peak_memory_kb']:>9.1f}KB  [{result['status_code']}]"
+        )
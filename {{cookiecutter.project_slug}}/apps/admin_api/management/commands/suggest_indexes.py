@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from apps.admin_api.index_advisor import suggest_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports indexes missing for the columns registered ModelAdmins filter, sort and search on. '
+        'Add the suggested declarations to Meta.indexes and run makemigrations.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('app_labels', nargs='*', help='Only inspect these apps.')
+        parser.add_argument(
+            '--explain', action='store_true',
+            help='Run EXPLAIN for each suggestion to show whether the table is scanned today.',
+        )
+
+    def handle(self, *args, **options):
+        report = suggest_indexes(app_labels=options['app_labels'], explain=options['explain'])
+        if not report:
+            self.stdout.write(self.style.SUCCESS('Every admin filter, ordering and search column is indexed.'))
+            return
+
+        missing = 0
+        for model, suggestions, notes in report:
+            self.stdout.write(self.style.MIGRATE_HEADING(model._meta.label))
+            for suggestion in suggestions:
+                missing += 1
+                self.stdout.write(f"  + {suggestion.declaration}  # {', '.join(suggestion.sources)}")
+                if suggestion.plan is not None:
+                    costs = []
+                    if suggestion.full_scan:
+                        costs.append(f'full table scan of {suggestion.row_count} rows')
+                    if suggestion.sort:
+                        costs.append('sort of every matching row')
+                    if costs:
+                        benefit = ' and '.join(costs) + ' today'
+                    else:
+                        benefit = f'already served without a full scan ({suggestion.row_count} rows)'
+                    self.stdout.write(f'      EXPLAIN: {benefit}')
+                    for line in suggestion.plan.splitlines():
+                        self.stdout.write(f'        {line}')
+                elif suggestion.row_count is not None:
+                    self.stdout.write(f'      EXPLAIN: skipped, no rows to sample ({suggestion.row_count} rows)')
+            for note in notes:
+                self.stdout.write(self.style.WARNING(f'  ! {note}'))
+
+        self.stdout.write(self.style.SUCCESS(f'{missing} missing index(es) found.'))
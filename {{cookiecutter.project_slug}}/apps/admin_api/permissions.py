@@ -1,9 +1,22 @@
 from rest_framework.permissions import BasePermission
 
+from apps.core.permission_cache import has_cached_perm
+
 class AdminPermission(BasePermission):
     """
-    Custom permission for admin API that respects Django admin permissions
+    Custom permission for admin API that respects Django admin permissions.
+    Superusers pass; other staff need the view, add, change or delete
+    permission of the view's model for the request method, as in Django
+    admin. Checks are served from the user's cached permission set.
     """
+    perms_map = {
+        'GET': 'view',
+        'POST': 'add',
+        'PUT': 'change',
+        'PATCH': 'change',
+        'DELETE': 'delete',
+    }
+
     def has_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
             return False
@@ -16,22 +29,14 @@ class AdminPermission(BasePermission):
             return True
         
         # Check specific model permissions
-        model = getattr(view, 'queryset', None)
-        if model is not None:
-            model = model.model
-            opts = model._meta
-            
-            if request.method == 'GET':
-                return request.user.has_perm(f'{opts.app_label}.view_{opts.model_name}')
-            elif request.method == 'POST':
-                return request.user.has_perm(f'{opts.app_label}.add_{opts.model_name}')
-            elif request.method in ['PUT', 'PATCH']:
-                return request.user.has_perm(f'{opts.app_label}.change_{opts.model_name}')
-            elif request.method == 'DELETE':
-                return request.user.has_perm(f'{opts.app_label}.delete_{opts.model_name}')
+        queryset = getattr(view, 'queryset', None)
+        action = self.perms_map.get(request.method)
+        if queryset is not None and action:
+            opts = queryset.model._meta
+            return has_cached_perm(request.user, f'{opts.app_label}.{action}_{opts.model_name}')
         
         return False
     
     def has_object_permission(self, request, view, obj):
         """Object-level permissions (can be extended for row-level security)"""
-        return self.has_permission(request, view) 
\ No newline at end of file
+        return self.has_permission(request, view) 
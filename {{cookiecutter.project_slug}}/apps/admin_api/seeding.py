@@ -0,0 +1,339 @@
+import multiprocessing
+import random
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models.signals import pre_save
+
+from apps.site_config.models import SingletonModel
+
+FIXTURE_DIR = 'seed_fixtures'
+
+# Fields left at their default so seeded users cannot log in or gain rights
+PRESERVED_FIELDS = {
+    settings.AUTH_USER_MODEL: {'password', 'is_superuser', 'is_staff', 'last_login'},
+}
+
+# Share of nullable columns left empty, and most targets linked per m2m field
+NULL_RATE = 0.2
+MAX_M2M_LINKS = 3
+
+# Generated dates are spread around this fixed moment rather than the day
+# of the run, so the same seed always gives the same rows
+SEED_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+    'incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud '
+    'exercitation ullamco laboris nisi aliquip ex ea commodo consequat duis aute irure'
+).split()
+
+
+class SeedError(Exception):
+    """Raised when a model cannot be seeded, e.g. a required relation has no rows."""
+
+
+def get_seedable_models(admin_site=None, local_only=False):
+    """
+    Registered admin models, minus singletons and unmanaged or proxy models.
+    With ``local_only``, only the project's own apps and the user model,
+    which leaves third-party models such as OTP devices alone.
+    """
+    admin_site = admin_site or admin.site
+    local_apps = getattr(settings, 'LOCAL_APPS', None)
+    seedable = []
+    for model in admin_site._registry:
+        opts = model._meta
+        if not opts.managed or opts.proxy or issubclass(model, SingletonModel):
+            continue
+        if local_only and local_apps is not None and opts.label != settings.AUTH_USER_MODEL \
+                and opts.app_config.name not in local_apps:
+            continue
+        seedable.append(model)
+    return seedable
+
+
+def sort_by_dependencies(seed_models):
+    """Orders models so the targets of their foreign keys are seeded first."""
+    remaining = list(seed_models)
+    ordered = []
+    while remaining:
+        for model in remaining:
+            targets = {
+                field.related_model for field in model._meta.fields
+                if field.is_relation and field.related_model is not model
+            }
+            if not targets.intersection(remaining):
+                break
+        else:
+            # A cycle; it has to go through a nullable key, so break it anywhere
+            model = remaining[0]
+        remaining.remove(model)
+        ordered.append(model)
+    return ordered
+
+
+def _fixture(field):
+    """Writes one shared file per kind of field and returns its storage name."""
+    if isinstance(field, models.ImageField):
+        name = f'{FIXTURE_DIR}/seed.png'
+        if not default_storage.exists(name):
+            from PIL import Image
+
+            buffer = BytesIO()
+            Image.new('RGB', (200, 200), color='steelblue').save(buffer, format='PNG')
+            name = default_storage.save(name, ContentFile(buffer.getvalue()))
+    else:
+        name = f'{FIXTURE_DIR}/seed.txt'
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(b'Seed fixture shared by every generated row.'))
+    return name
+
+
+def build_field_specs(model, pool_sizes, files=False):
+    """
+    Describes how to generate every column of ``model`` as plain
+    (attname, kind, params, nullable) tuples, so the generation itself can
+    run in worker processes without Django. ``pool_sizes`` maps relation
+    fields to the number of rows they may point at.
+    """
+    preserved = PRESERVED_FIELDS.get(model._meta.label, set())
+    specs = []
+
+    for field in model._meta.concrete_fields:
+        if isinstance(field, models.AutoField) or getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            continue
+        if field.generated:
+            # Computed by the database from the other columns
+            continue
+        name = field.attname
+        nullable = field.null and not field.unique
+
+        if field.name in preserved:
+            value = make_password(None) if field.name == 'password' else field.get_default()
+            specs.append((name, 'const', value, False))
+        elif field.is_relation:
+            if pool_sizes[name] == 0 and not field.null:
+                raise SeedError(f'{model._meta.label}.{field.name} needs {field.related_model._meta.label} rows first.')
+            specs.append((name, 'unique_fk' if field.one_to_one else 'fk', pool_sizes[name], field.null))
+        elif field.choices:
+            specs.append((name, 'choice', [value for value, _ in field.flatchoices], nullable))
+        elif isinstance(field, models.FileField):
+            if files or not field.blank:
+                specs.append((name, 'const', _fixture(field), False))
+        elif isinstance(field, models.BooleanField):
+            specs.append((name, 'bool', None, False))
+        elif isinstance(field, models.UUIDField):
+            specs.append((name, 'uuid', None, nullable))
+        elif isinstance(field, models.EmailField):
+            specs.append((name, 'email', field.max_length, nullable))
+        elif isinstance(field, models.URLField):
+            specs.append((name, 'url', field.max_length, nullable))
+        elif isinstance(field, models.GenericIPAddressField):
+            specs.append((name, 'ip', None, nullable))
+        elif isinstance(field, models.SlugField) or (isinstance(field, models.CharField) and field.unique):
+            specs.append((name, 'slug', field.max_length, nullable))
+        elif field.has_default():
+            specs.append((name, 'const', field.get_default(), False))
+        elif isinstance(field, models.CharField):
+            specs.append((name, 'text', field.max_length, nullable))
+        elif isinstance(field, models.TextField):
+            specs.append((name, 'paragraphs', None, nullable))
+        elif isinstance(field, models.DecimalField):
+            specs.append((name, 'decimal', (field.max_digits, field.decimal_places), nullable))
+        elif isinstance(field, (models.IntegerField, models.FloatField)):
+            specs.append((name, 'int', None, nullable))
+        elif isinstance(field, models.DateTimeField):
+            specs.append((name, 'datetime', None, nullable))
+        elif isinstance(field, models.DateField):
+            specs.append((name, 'date', None, nullable))
+        elif isinstance(field, models.JSONField):
+            specs.append((name, 'const', {}, False))
+        elif field.null:
+            specs.append((name, 'const', None, False))
+        else:
+            raise SeedError(f'Cannot generate values for {model._meta.label}.{field.name} ({field.get_internal_type()}).')
+
+    m2m_specs = [
+        (field.name, pool_sizes[field.name]) for field in model._meta.many_to_many
+        if field.remote_field.through._meta.auto_created
+    ]
+    return specs, m2m_specs
+
+
+def _words(rng, count):
+    return ' '.join(rng.choices(WORDS, k=count))
+
+
+def _fit(text, max_length, suffix=''):
+    if max_length:
+        text = text[:max_length - len(suffix)]
+    return text + suffix
+
+
+def _generate_value(rng, kind, params, index, position):
+    if kind == 'const':
+        return params
+    if kind == 'bool':
+        return rng.random() < 0.5
+    if kind == 'choice':
+        return rng.choice(params)
+    if kind == 'fk':
+        return rng.randrange(params) if params else None
+    if kind == 'unique_fk':
+        return position if position < params else None
+    if kind == 'uuid':
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+    if kind == 'email':
+        return _fit(f'{rng.choice(WORDS)}.{index}', params, '@example.com')
+    if kind == 'url':
+        return _fit(f'https://example.com/{rng.choice(WORDS)}-{index}', params)
+    if kind == 'ip':
+        return f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}'
+    if kind == 'slug':
+        return _fit('-'.join(rng.choices(WORDS, k=3)), params, f'-{index}')
+    if kind == 'text':
+        return _fit(_words(rng, rng.randint(2, 8)).capitalize(), params)
+    if kind == 'paragraphs':
+        return '\n\n'.join(_words(rng, rng.randint(20, 60)).capitalize() + '.' for _ in range(rng.randint(1, 4)))
+    if kind == 'decimal':
+        max_digits, decimal_places = params
+        upper = min(10 ** (max_digits - decimal_places) - 1, 10000)
+        return Decimal(rng.randint(0, upper * 10 ** decimal_places)).scaleb(-decimal_places)
+    if kind == 'int':
+        return rng.randint(0, 1000)
+    if kind == 'datetime':
+        return SEED_EPOCH - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+    if kind == 'date':
+        return SEED_EPOCH.date() + timedelta(days=rng.randint(-180, 180))
+    raise ValueError(f'Unknown value kind {kind!r}')
+
+
+def generate_chunk(task):
+    """
+    Generates the column values of one chunk of rows, in the order of
+    ``specs``. Relations are returned
+    as indexes into the caller's primary key pools. Each chunk has its own
+    random generator derived from the seed and the rows already in the table,
+    so the output does not depend on how many workers share the work and a
+    second run adds new rows instead of repeating the first.
+    """
+    label, specs, m2m_specs, base, offset, count, seed, chunk_index = task
+    rng = random.Random(f'{seed}:{label}:{base}:{chunk_index}')
+    rows = []
+    for position in range(offset, offset + count):
+        index = base + position
+        values = [
+            None if nullable and rng.random() < NULL_RATE else _generate_value(rng, kind, params, index, position)
+            for _, kind, params, nullable in specs
+        ]
+        links = {
+            name: rng.sample(range(pool_size), rng.randint(0, min(MAX_M2M_LINKS, pool_size)))
+            for name, pool_size in m2m_specs
+        }
+        rows.append((values, links))
+    return rows
+
+
+def _load_pool(model, exclude_used_by=None):
+    queryset = model._base_manager.order_by('pk')
+    if exclude_used_by is not None:
+        source_model, field = exclude_used_by
+        queryset = queryset.exclude(pk__in=source_model._base_manager.values(field.attname))
+    return list(queryset.values_list('pk', flat=True))
+
+
+def seed_model(model, rows, seed=0, batch_size=1000, workers=1, files=False):
+    """
+    Bulk inserts ``rows`` generated rows into ``model`` and wires their
+    many-to-many relations. Chunks are generated in ``workers`` processes
+    and inserted by this one, each in its own transaction. bulk_create
+    sends no signals, so ``pre_save`` is sent for every row first; its
+    receivers derive fields and apply rules such as scheduling posts dated
+    in the future. Returns the number of rows inserted.
+    """
+    opts = model._meta
+    pools = {}
+    for field in opts.fields:
+        if field.is_relation:
+            pools[field.attname] = _load_pool(field.related_model, (model, field) if field.one_to_one else None)
+            if field.one_to_one:
+                # Each target can be used once, so never generate more rows than free targets
+                random.Random(f'{seed}:{opts.label}:{field.name}').shuffle(pools[field.attname])
+                rows = min(rows, len(pools[field.attname]))
+    for field in opts.many_to_many:
+        pools[field.name] = _load_pool(field.related_model)
+    if not rows:
+        return 0
+
+    specs, m2m_specs = build_field_specs(model, {name: len(pks) for name, pks in pools.items()}, files=files)
+    base = model._base_manager.count()
+    tasks = [
+        (opts.label, specs, m2m_specs, base, offset, min(batch_size, rows - offset), seed, chunk_index)
+        for chunk_index, offset in enumerate(range(0, rows, batch_size))
+    ]
+    # Instances are built positionally, which skips the keyword handling
+    # (and modeltranslation's rewriting of it) that dominates bulk inserts
+    fields = opts.concrete_fields
+    template = [None if field.primary_key and not field.has_default() else field.get_default() for field in fields]
+    positions = {field.attname: position for position, field in enumerate(fields)}
+    spec_positions = [positions[name] for name, *_ in specs]
+    relations = [(positions[field.attname], pools[field.attname]) for field in fields if field.is_relation]
+    using = model._base_manager.db
+    send_pre_save = pre_save.has_listeners(model)
+
+    inserted = 0
+    pool = None
+    if workers > 1 and len(tasks) > 1:
+        # Spawned and forkserver workers start without the app registry and
+        # have to set it up before they can import this module
+        pool = multiprocessing.get_context().Pool(workers, initializer=django.setup)
+    try:
+        chunks = pool.imap(generate_chunk, tasks) if pool else map(generate_chunk, tasks)
+        for chunk in chunks:
+            objects = []
+            for values, _ in chunk:
+                row = template.copy()
+                for position, value in zip(spec_positions, values):
+                    row[position] = value
+                for position, pks in relations:
+                    if row[position] is not None:
+                        row[position] = pks[row[position]]
+                obj = model(*row)
+                if send_pre_save:
+                    pre_save.send(sender=model, instance=obj, raw=False, using=using, update_fields=None)
+                objects.append(obj)
+            with transaction.atomic():
+                model._base_manager.bulk_create(objects, batch_size=batch_size)
+                _link_many_to_many(model, objects, [links for _, links in chunk], pools, batch_size)
+            inserted += len(objects)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return inserted
+
+
+def _link_many_to_many(model, objects, links, pools, batch_size):
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            continue
+        source_name = field.m2m_field_name()
+        target_name = field.m2m_reverse_field_name()
+        through_objects = [
+            through(**{f'{source_name}_id': obj.pk, f'{target_name}_id': pools[field.name][index]})
+            for obj, row_links in zip(objects, links)
+            if obj.pk is not None
+            for index in row_links[field.name]
+        ]
+        through._base_manager.bulk_create(through_objects, batch_size=batch_size, ignore_conflicts=True)
@@ -1 +1,38 @@
- 
\ No newline at end of file
+import copy
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.fields import get_error_detail
+
+
+class SparseFieldsetSerializerMixin:
+    """Lets the view narrow a serializer to a subset of its fields with the ``fields`` argument."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+
+class ModelUniqueValidationMixin:
+    """
+    Runs the model's ``validate_unique`` on writes, as the admin form does,
+    so uniqueness a model checks itself answers 400 instead of failing on
+    the database constraint.
+    """
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        model = self.Meta.model
+        instance = copy.copy(self.instance) if self.instance is not None else model()
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        for name, value in attrs.items():
+            if name not in many_to_many:
+                setattr(instance, name, value)
+        try:
+            instance.validate_unique()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(get_error_detail(e))
+        return attrs
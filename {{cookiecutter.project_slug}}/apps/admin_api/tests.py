@@ -1,3 +1,553 @@
-from django.test import TestCase
+import multiprocessing
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import AdminPreferences, Category, OutboundEmail, RequestLog, Tag
+from apps.core.instrumentation import QueryBudgetExceeded, RequestStats, collect_request_stats, view_metrics
+from .benchmarks import compare_reports, run_benchmarks
+from .index_advisor import suggest_indexes
+from .seeding import build_field_specs, generate_chunk, get_seedable_models, seed_model
+from .urls import admin_viewsets
+
+# A cache every process sees, as Redis is in production; the local memory
+# cache of the test settings is private to one process
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='shared-cache-'),
+    }
+}
+
+
+class ConditionalGetTests(APITestCase):
+    """
+    Tests for ETag and Last-Modified support on generated admin endpoints.
+    """
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpassword123')
+        self.client.force_authenticate(user=self.admin)
+        self.category = Category.objects.create(name='News')
+        self.url = reverse('admin_api:category-detail', kwargs={'pk': self.category.pk})
+
+    def test_retrieve_returns_not_modified(self):
+        """
+        Ensure an unchanged object is answered with 304 and a changed one with 200.
+        """
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(self.url, {'description': 'Updated'})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['description'], 'Updated')
+
+    def test_retrieve_honours_if_modified_since(self):
+        """
+        Ensure Last-Modified can be used on its own for a single object, but is not sent for lists.
+        """
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(self.client.get(reverse('admin_api:category-list')).has_header('Last-Modified'))
+
+    def test_list_etag_changes_on_delete(self):
+        """
+        Ensure deleting a row changes the list ETag even though no timestamp moved.
+        """
+        other = Category.objects.create(name='Other')
+        list_url = reverse('admin_api:category-list')
+        etag = self.client.get(list_url)['ETag']
+        other.delete()
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_models_without_timestamp_have_no_validators(self):
+        """
+        Ensure models without updated_at are served as before.
+        """
+        tag = Tag.objects.create(name='python')
+        response = self.client.get(reverse('admin_api:tag-detail', kwargs={'pk': tag.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class IndexAdvisorTests(TestCase):
+    """
+    Tests for the index suggestions derived from ModelAdmin options.
+    """
+    def get_report(self, model):
+        for reported_model, suggestions, notes in suggest_indexes(app_labels=['core']):
+            if reported_model is model:
+                return [suggestion.fields for suggestion in suggestions], notes
+        return [], []
+
+    def test_unindexed_filters_are_reported(self):
+        """
+        Ensure list_filter columns without an index are suggested.
+        """
+        suggestions, _ = self.get_report(Category)
+        self.assertIn(('is_active',), suggestions)
+
+    def test_indexed_columns_are_not_reported(self):
+        """
+        Ensure columns led by an existing index are skipped.
+        """
+        suggestions, _ = self.get_report(RequestLog)
+        self.assertIn(('method',), suggestions)
+        self.assertNotIn(('status_code',), suggestions)
+        self.assertNotIn(('timestamp',), suggestions)
+
+    def test_contains_searches_are_noted(self):
+        """
+        Ensure searches a B-tree index cannot serve are reported as notes.
+        """
+        _, notes = self.get_report(Tag)
+        self.assertTrue(any("'name'" in note for note in notes))
+
+    def test_command_reports_explain_output(self):
+        """
+        Ensure the command prints declarations and EXPLAIN results.
+        """
+        Category.objects.create(name='News')
+        out = StringIO()
+        call_command('suggest_indexes', 'core', '--explain', stdout=out)
+        output = out.getvalue()
+        self.assertIn("models.Index(fields=['is_active']", output)
+        self.assertIn('EXPLAIN:', output)
+
+
+class QueryInstrumentationTests(APITestCase):
+    """
+    Tests for per-view query instrumentation and query budgets.
+    """
+    def setUp(self):
+        view_metrics.reset()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpassword123')
+        self.client.force_authenticate(user=self.admin)
+        root = Category.objects.create(name='Root')
+        for i in range(10):
+            Category.objects.create(name=f'Child {i}', parent=root)
+        self.list_url = reverse('admin_api:category-list')
+
+    def test_server_timing_header(self):
+        """
+        Ensure staff responses report database and serializer timings.
+        """
+        response = self.client.get(self.list_url)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+        self.client.force_authenticate(user=None)
+        self.assertFalse(self.client.get(self.list_url).has_header('Server-Timing'))
+
+    def test_analytics_endpoint(self):
+        """
+        Ensure per-view figures are aggregated and can be reset.
+        """
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        response = self.client.get(reverse('admin_api:query-analytics'))
+        views = {row['view']: row for row in response.data['views']}
+        row = views['admin_api:category-list']
+        self.assertEqual(row['requests'], 2)
+        self.assertGreater(row['avg_queries'], 0)
+        self.assertEqual(row['query_budget'], 5)
+        self.assertEqual(row['over_budget'], 0)
+
+        self.client.delete(reverse('admin_api:query-analytics'))
+        views = [row['view'] for row in view_metrics.snapshot()]
+        self.assertNotIn('admin_api:category-list', views)
+
+    def test_list_stays_within_budget(self):
+        """
+        Ensure related objects are loaded in bulk so the declared budget holds.
+        """
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 11)
+
+    def test_exceeding_budget_fails_in_strict_mode(self):
+        """
+        Ensure a view over its budget raises while STRICT_BUDGETS is enabled.
+        """
+        with mock.patch.object(admin_viewsets['category'], 'query_budget', {'list': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(self.list_url)
+
+    def test_duplicate_queries_are_detected(self):
+        """
+        Ensure repeated statements are counted as duplicates or similar queries.
+        """
+        stats = RequestStats()
+        with collect_request_stats(stats):
+            list(Category.objects.filter(name='Root'))
+            list(Category.objects.filter(name='Root'))
+            list(Category.objects.filter(name='Child 1'))
+        self.assertEqual(stats.query_count, 3)
+        self.assertEqual(stats.duplicate_count, 1)
+        self.assertEqual(stats.similar_count, 2)
+
+
+class BenchmarkTests(TestCase):
+    """
+    Tests for the admin API benchmark harness.
+    """
+    def test_run_benchmarks_reports_every_scenario(self):
+        """
+        Ensure a small run seeds data and reports timings, queries and memory per scenario.
+        """
+        report = run_benchmarks(5, iterations=2, only=['requestlog', 'tag.import', 'dashboard'])
+
+        self.assertEqual(report['meta']['rows']['requestlog'], 50)
+        self.assertEqual(
+            set(report['scenarios']),
+            {'requestlog.list', 'requestlog.retrieve', 'requestlog.search', 'requestlog.export', 'tag.import', 'dashboard'},
+        )
+        for name, result in report['scenarios'].items():
+            with self.subTest(scenario=name):
+                self.assertLess(result['status_code'], 400)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertGreater(result['queries'], 0)
+                self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_compare_reports_flags_regressions(self):
+        """
+        Ensure slower percentiles beyond the threshold and extra queries are reported.
+        """
+        baseline = {'scenarios': {'post.list': {'p95_ms': 10.0, 'queries': 5}}}
+        faster = {'scenarios': {'post.list': {'p95_ms': 11.0, 'queries': 5}}}
+        slower = {'scenarios': {'post.list': {'p95_ms': 15.0, 'queries': 6}}}
+
+        self.assertEqual(compare_reports(baseline, faster, threshold=0.2), [])
+        self.assertEqual(len(compare_reports(baseline, slower, threshold=0.2)), 2)
+
+
+class SeedCommandTests(TestCase):
+    """
+    Tests for the seed command and the bulk data generator behind it.
+    """
+    def test_seed_command_creates_rows_in_batches(self):
+        """
+        Ensure the requested rows are created with relations pointing at existing rows.
+        """
+        out = StringIO()
+        call_command('seed', 'auth.User=12', 'core.Category=10', 'core.RequestLog=25', '--batch-size', '7', '--workers', '1', stdout=out)
+
+        self.assertEqual(User.objects.count(), 12)
+        self.assertFalse(User.objects.filter(is_superuser=True).exists())
+        self.assertFalse(any(user.has_usable_password() for user in User.objects.all()))
+        self.assertEqual(Category.objects.count(), 10)
+        self.assertEqual(RequestLog.objects.count(), 25)
+        self.assertEqual(RequestLog.objects.filter(user__isnull=True).count() + RequestLog.objects.filter(user__in=User.objects.all()).count(), 25)
+        self.assertIn('core.RequestLog: 25 rows', out.getvalue())
+
+    def test_seed_is_deterministic_and_repeatable(self):
+        """
+        Ensure a chunk is generated identically from the same seed and a second run adds new unique rows.
+        """
+        specs, m2m_specs = build_field_specs(Tag, {})
+        task = ('core.Tag', specs, m2m_specs, 0, 0, 5, 42, 0)
+        self.assertEqual(generate_chunk(task), generate_chunk(task))
+
+        seed_model(Tag, 5, seed=42)
+        seed_model(Tag, 5, seed=42)
+        self.assertEqual(Tag.objects.values('slug').distinct().count(), 10)
+
+    def test_seed_in_spawned_workers(self):
+        """
+        Ensure spawned worker processes set up Django and generate the same rows as a single process.
+        """
+        spawn = multiprocessing.get_context('spawn')
+        with mock.patch('apps.admin_api.seeding.multiprocessing.get_context', return_value=spawn):
+            self.assertEqual(seed_model(RequestLog, 6, seed=3, batch_size=2, workers=2), 6)
+        parallel = list(RequestLog.objects.order_by('pk').values_list('path', 'ip_address', 'response_time_ms'))
+        RequestLog.objects.all().delete()
+
+        seed_model(RequestLog, 6, seed=3, batch_size=2, workers=1)
+        self.assertEqual(list(RequestLog.objects.order_by('pk').values_list('path', 'ip_address', 'response_time_ms')), parallel)
+
+    def test_seed_links_many_to_many_and_one_to_one(self):
+        """
+        Ensure m2m rows are wired to existing targets and one-to-one rows never exceed free targets.
+        """
+        seed_model(User, 6)
+        seed_model(Group, 20, seed=1)
+        self.assertTrue(Group.permissions.through.objects.exists())
+
+        self.assertEqual(seed_model(AdminPreferences, 10), 6)
+        self.assertEqual(seed_model(AdminPreferences, 10), 0)
+
+    def test_seed_skips_singletons(self):
+        """
+        Ensure singleton settings models are never seeded.
+        """
+        labels = {model._meta.label for model in get_seedable_models()}
+        self.assertIn('core.Tag', labels)
+        self.assertNotIn('site_identity.SiteIdentity', labels)
+
+
+class AdminPermissionTests(APITestCase):
+    """
+    Tests that staff reach generated admin endpoints through the model permissions Django admin uses.
+    """
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='testpassword123', is_staff=True)
+        self.staff.user_permissions.add(Permission.objects.get(codename='view_category'))
+        self.category = Category.objects.create(name='News')
+        self.list_url = reverse('admin_api:category-list')
+        self.detail_url = reverse('admin_api:category-detail', kwargs={'pk': self.category.pk})
+
+    def test_view_permission_allows_reads_only(self):
+        """
+        Ensure staff with the view permission can list and retrieve, but not add, change or delete.
+        """
+        self.client.force_authenticate(user=self.staff)
+        self.assertEqual(self.client.get(self.list_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(self.list_url, {'name': 'New'}).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.patch(self.detail_url, {'name': 'Renamed'}).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.delete(self.detail_url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Category.objects.get().name, 'News')
+
+    def test_each_action_needs_its_own_permission(self):
+        """
+        Ensure granting change allows updates while adding and deleting stay forbidden.
+        """
+        self.staff.user_permissions.add(Permission.objects.get(codename='change_category'))
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        self.assertEqual(self.client.patch(self.detail_url, {'name': 'Renamed'}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(self.list_url, {'name': 'New'}).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.delete(self.detail_url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_staff_without_model_permissions_are_denied(self):
+        """
+        Ensure staff without a permission on the model, and other models, are denied.
+        """
+        other = User.objects.create_user(username='other', password='testpassword123', is_staff=True)
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.list_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.staff)
+        self.assertEqual(self.client.get(reverse('admin_api:tag-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_actions_need_the_permissions_they_act_with(self):
+        """
+        Ensure the add permission a POST maps to runs no action: deleting needs delete, other actions change.
+        """
+        self.staff.user_permissions.add(*Permission.objects.filter(codename__in=['add_category', 'view_outboundemail', 'add_outboundemail']))
+        email = OutboundEmail.objects.create(subject='Hi', body='Hello', to=['reader@example.com'], status='failed')
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        response = self.client.post(
+            reverse('admin_api:category-bulk-action'), {'action': 'delete_selected', 'ids': [self.category.pk]}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Category.objects.exists())
+        url = reverse('admin_api:outboundemail-bulk-action')
+        response = self.client.post(url, {'action': 'requeue', 'ids': [email.pk]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+
+        self.staff.user_permissions.add(Permission.objects.get(codename='change_outboundemail'))
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        self.assertEqual(self.client.post(url, {'action': 'requeue', 'ids': [email.pk]}, format='json').status_code, status.HTTP_200_OK)
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'queued')
+
+    def test_non_staff_are_denied_despite_model_permissions(self):
+        """
+        Ensure model permissions alone do not open the admin API to users who cannot use the admin.
+        """
+        self.staff.is_staff = False
+        self.staff.save()
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        self.assertEqual(self.client.get(self.list_url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class PermissionCacheTests(APITestCase):
+    """
+    Tests that admin permission checks are served from the cached permission set.
+    """
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name='Editors')
+        self.group.permissions.add(Permission.objects.get(codename='view_category'))
+        self.staff = User.objects.create_user(username='staff', password='testpassword123', is_staff=True)
+        self.staff.groups.add(self.group)
+        self.client.force_authenticate(user=self.staff)
+        self.url = reverse('admin_api:category-list')
+        Category.objects.create(name='News')
+
+    def _permission_queries(self, queries):
+        return [query['sql'] for query in queries if '"auth_permission"' in query['sql']]
+
+    def test_group_permissions_are_resolved_once(self):
+        """
+        Ensure a reloaded user is granted access without querying permissions again.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        # Authentication reloads the user on every request
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._permission_queries(queries), [])
+
+        response = self.client.post(self.url, {'name': 'Denied'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_grant_changes_invalidate_the_cache(self):
+        """
+        Ensure adding and removing group permissions takes effect on the next request.
+        """
+        self.client.get(self.url)
+        self.group.permissions.add(Permission.objects.get(codename='add_category'))
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        response = self.client.post(self.url, {'name': 'Allowed'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.staff.groups.remove(self.group)
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_grant_changes_in_another_process_invalidate_the_cache(self):
+        """
+        Ensure a grant revoked by another process is not served from the cached set.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        # The other process has its own connection to the shared cache
+        with mock.patch('apps.core.permission_cache.cache', caches.create_connection('default')):
+            self.staff.groups.remove(self.group)
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_is_not_used(self):
+        """
+        Ensure permission sets are resolved again on every request when the cache is private to the process.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(user=User.objects.get(pk=self.staff.pk))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.assertNotEqual(self._permission_queries(queries), [])
+
+    def test_config_reports_cached_permissions(self):
+        """
+        Ensure the config action reports the permissions from the same set.
+        """
+        response = self.client.get(reverse('admin_api:category-config'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['permissions'],
+            {'add': False, 'change': False, 'delete': False, 'view': True},
+        )
+
+
+class SparseFieldsetTests(APITestCase):
+    """
+    Tests for ?fields= and ?exclude= on generated admin endpoints.
+    """
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpassword123')
+        self.client.force_authenticate(user=self.admin)
+        parent = Category.objects.create(name='News', description='A long description')
+        self.category = Category.objects.create(name='Local', parent=parent, description='Another description')
+        self.list_url = reverse('admin_api:category-list')
+        self.detail_url = reverse('admin_api:category-detail', kwargs={'pk': self.category.pk})
+
+    def _category_selects(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('SELECT') and 'FROM "core_category"' in query['sql']]
+
+    def test_list_defaults_to_list_display(self):
+        """
+        Ensure the list only renders and loads the list_display columns.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.data['results'][0]),
+            {'id', 'name', 'parent', 'parent_str', 'is_active', 'post_count'},
+        )
+        selects = self._category_selects(queries)
+        self.assertTrue(selects)
+        self.assertFalse(any('"core_category"."description' in sql for sql in selects))
+
+    def test_fields_and_exclude(self):
+        """
+        Ensure explicit fields, exclusions and ?fields=* narrow or widen the response.
+        """
+        response = self.client.get(self.list_url, {'fields': 'name'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+        response = self.client.get(self.list_url, {'fields': '*'})
+        self.assertIn('description', response.data['results'][0])
+
+        response = self.client.get(self.detail_url, {'exclude': 'description,meta_description'})
+        self.assertNotIn('description', response.data)
+        self.assertNotIn('meta_description', response.data)
+        self.assertEqual(response.data['parent_str'], 'News')
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['description'], 'Another description')
+
+    def test_unknown_field_is_rejected(self):
+        """
+        Ensure unknown field names are answered with 400.
+        """
+        response = self.client.get(self.list_url, {'fields': 'name,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_writes_use_full_serializer(self):
+        """
+        Ensure ?fields= does not narrow what a write accepts or returns.
+        """
+        response = self.client.patch(f'{self.detail_url}?fields=name', {'description': 'Changed'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['description'], 'Changed')
+        self.assertIn('meta_title', response.data)
+
+    def test_lang_drops_other_languages(self):
+        """
+        Ensure ?lang= keeps only the requested per-language fields and columns.
+        """
+        Category.objects.filter(pk=self.category.pk).update(name_de='Lokal', name_fr='Locale')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.detail_url, {'lang': 'de'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Lokal')
+        self.assertEqual(response.data['name_de'], 'Lokal')
+        self.assertNotIn('name_fr', response.data)
+        self.assertNotIn('description_fr', response.data)
+        selects = self._category_selects(queries)
+        self.assertTrue(selects)
+        self.assertFalse(any('"core_category"."name_fr"' in sql for sql in selects))
+
+        response = self.client.get(self.detail_url)
+        self.assertIn('name_fr', response.data)
+
+    def test_unknown_lang_is_rejected(self):
+        """
+        Ensure unknown language codes are answered with 400.
+        """
+        response = self.client.get(self.list_url, {'lang': 'xx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('lang', response.data)
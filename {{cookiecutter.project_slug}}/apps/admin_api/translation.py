@@ -3,6 +3,9 @@ from django.conf import settings
 from django.db import models
 from modeltranslation.translator import translator, TranslationOptions
 
+# Operational records and contact details whose text is never translated
+UNTRANSLATED_MODELS = {'core.OutboundEmail', 'newsletter.Subscriber', 'newsletter.Email'}
+
 
 def register_all_translations():
     """Automatically register translation fields for all models."""
@@ -12,6 +15,8 @@ def register_all_translations():
             continue
         if model._meta.app_label == 'site_config':
             continue
+        if model._meta.label in UNTRANSLATED_MODELS:
+            continue
         if model in translator.get_registered_models():
             continue
         fields = [
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from apps.core.authentication import with_stateless_jwt
 from .generators import AdminAPIGenerator
 from .utils import get_admin_site_config
-from .views import DashboardStatsView
+from .views import DashboardStatsView, QueryAnalyticsView
 
 # Auto-generate viewsets for all registered admin models
 admin_viewsets = AdminAPIGenerator.register_all()
@@ -15,11 +17,13 @@ for model_name, viewset in admin_viewsets.items():
     router.register(model_name, viewset, basename=model_name)
 
 @api_view(['GET'])
+@authentication_classes(with_stateless_jwt(api_settings.DEFAULT_AUTHENTICATION_CLASSES))
 def admin_site_config(request):
     """Return configuration for the entire admin site"""
     return Response(get_admin_site_config())
 
 @api_view(['GET'])
+@authentication_classes(with_stateless_jwt(api_settings.DEFAULT_AUTHENTICATION_CLASSES))
 def admin_user_info(request):
     """Return current user information and permissions"""
     if not request.user.is_authenticated:
@@ -44,4 +48,5 @@ urlpatterns = [
     path('user/', admin_user_info, name='admin-user-info'),
     path('models/', include(router.urls)),
     path('dashboard-stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('query-analytics/', QueryAnalyticsView.as_view(), name='query-analytics'),
 ] 
\ No newline at end of file
@@ -21,11 +21,17 @@ def get_model_metadata(model, model_admin=None):
         trans_opts = None
         translated_field_names = []
 
+    excluded = getattr(model_admin, 'exclude', None) or ()
+
     for field in model._meta.get_fields():
         if isinstance(field, (models.ManyToOneRel, models.ManyToManyRel, models.OneToOneRel)):
             # These are reverse relations, we can skip them for direct model fields
             continue
 
+        # Fields the admin hides are not offered to the frontend either
+        if field.name in excluded:
+            continue
+
         # If this is an original field that has translations, skip it.
         # We'll process its language-specific variants instead.
         if field.name in translated_field_names:
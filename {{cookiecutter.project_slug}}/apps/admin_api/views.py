@@ -2,6 +2,7 @@ from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
@@ -16,11 +17,14 @@ from apps.blog.models import Post, Comment
 from apps.todo.models import Task, Project
 {% endif %}
 from apps.core.models import Category, Tag
+from apps.core.authentication import with_stateless_jwt
+from apps.core.instrumentation import view_metrics
 
 class DashboardStatsView(APIView):
     """
     Provides statistics for the admin dashboard.
     """
+    authentication_classes = with_stateless_jwt(api_settings.DEFAULT_AUTHENTICATION_CLASSES)
     permission_classes = [IsAdminUser]
 
     def get(self, request, *args, **kwargs):
@@ -132,3 +136,18 @@ class DashboardStatsView(APIView):
         }
 
         return Response(data)
+
+class QueryAnalyticsView(APIView):
+    """
+    Per-view query counts and timings recorded by QueryInstrumentationMiddleware
+    in this process. DELETE resets the figures.
+    """
+    authentication_classes = with_stateless_jwt(api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({'views': view_metrics.snapshot()})
+
+    def delete(self, request, *args, **kwargs):
+        view_metrics.reset()
+        return Response(status=204)
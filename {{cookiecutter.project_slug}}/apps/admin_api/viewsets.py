@@ -1 +1,122 @@
- 
\ No newline at end of file
+from django.core.exceptions import FieldDoesNotExist
+from modeltranslation.manager import get_translatable_fields_for_model
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from apps.core.languages import get_language_fields, get_loaded_languages
+
+# Serializer fields generated next to a model field
+DERIVED_SUFFIXES = ('_str', '_display')
+
+
+class SparseFieldsetMixin:
+    """
+    Lets clients pick the fields of GET responses with ``?fields=a,b`` and
+    ``?exclude=c``. The serializer is narrowed and the queryset only loads
+    the columns those fields read. List responses default to the
+    ``list_display`` columns of the ModelAdmin; ``?fields=*`` returns every
+    field. With ``?lang=`` (see LanguagePruningMixin) the per-language
+    fields of other languages are dropped as well.
+    """
+    list_display = ()
+    requested_languages = None
+
+    def get_available_fields(self):
+        """Field names of the full serializer, computed once per viewset class."""
+        cls = type(self)
+        if '_available_fields' not in cls.__dict__:
+            cls._available_fields = list(self.get_serializer_class()().fields)
+        return cls._available_fields
+
+    def get_list_fields(self):
+        """
+        The fields listed by default: the primary key plus every serializer
+        field behind a list_display column, with its _str and _display
+        companions. None when list_display names no serializer field.
+        """
+        available = self.get_available_fields()
+        fields = []
+        for name in self.list_display:
+            if not isinstance(name, str):
+                continue
+            fields.extend(
+                candidate for candidate in (name, f'{name}_str', f'{name}_display')
+                if candidate in available and candidate not in fields
+            )
+        if not fields:
+            return None
+        pk_name = self.get_serializer_class().Meta.model._meta.pk.name
+        return [pk_name] + [name for name in fields if name != pk_name]
+
+    def _parse_fields_param(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.get_available_fields()]
+        if unknown:
+            raise ValidationError({param: f"Unknown field(s): {', '.join(unknown)}."})
+        return names
+
+    def get_sparse_fieldset(self):
+        """
+        The serializer fields to render for this request, or None for all of
+        them. Write requests always use the full serializer.
+        """
+        # Cached per request; the browsable API renders its forms with a cloned POST request
+        cached = getattr(self, '_sparse_fieldset', None)
+        if cached is not None and cached[0] is self.request:
+            return cached[1]
+
+        fields = None
+        if self.request is not None and self.request.method in SAFE_METHODS:
+            if self.request.query_params.get('fields') not in ('*', '__all__'):
+                fields = self._parse_fields_param('fields')
+                if fields is None and self.action == 'list':
+                    fields = self.get_list_fields()
+                elif fields is not None:
+                    pk_name = self.get_serializer_class().Meta.model._meta.pk.name
+                    fields = [pk_name] + [name for name in fields if name != pk_name]
+            excluded = set(self._parse_fields_param('exclude') or ())
+            if self.requested_languages:
+                model = self.get_serializer_class().Meta.model
+                other_languages = [code for code in AVAILABLE_LANGUAGES if code not in self.requested_languages]
+                excluded.update(get_language_fields(model, other_languages))
+            if excluded:
+                fields = [name for name in (fields or self.get_available_fields()) if name not in excluded]
+
+        self._sparse_fieldset = (self.request, fields)
+        return fields
+
+    def get_sparse_columns(self, model, fields):
+        """Names of the model fields the given serializer fields read."""
+        opts = model._meta
+        translated = set(get_translatable_fields_for_model(model) or ())
+        languages = get_loaded_languages(self.requested_languages) if self.requested_languages else AVAILABLE_LANGUAGES
+        columns = {opts.pk.name}
+        for name in fields:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                base = next((name[:-len(suffix)] for suffix in DERIVED_SUFFIXES if name.endswith(suffix)), None)
+                try:
+                    field = opts.get_field(base) if base else None
+                except FieldDoesNotExist:
+                    field = None
+            if field is None or not field.concrete or field.many_to_many:
+                continue
+            if field.name in translated:
+                # The translated accessor reads the per-language columns, falling back
+                # between them; only() would widen the bare name to every language
+                columns.update(build_localized_fieldname(field.name, language) for language in languages)
+            else:
+                columns.add(field.name)
+        return columns
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
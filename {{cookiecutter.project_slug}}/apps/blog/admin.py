@@ -1,5 +1,8 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import Post, Comment
+from .response_cache import invalidate_tags, object_tag
+from .feeds import invalidate_feeds
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
@@ -22,13 +25,23 @@ class PostAdmin(admin.ModelAdmin):
             'content': {'ui_component': 'markdown_editor'},
             'excerpt': {'ui_component': 'textarea'},
         }
+        # Queries the generated API may run per request, including permission lookups
+        query_budget = {'list': 7, 'retrieve': 6}
 
     def approve_posts(self, request, queryset):
-        queryset.update(status='published')
+        now = timezone.now()
+        queryset.filter(published_at__isnull=True).update(published_at=now)
+        queryset.filter(published_at__lte=now).update(status='published')
+        # Posts dated in the future go live through publish_scheduled_posts
+        queryset.filter(published_at__gt=now).update(status='scheduled')
+        invalidate_tags('posts', 'post_index')
+        invalidate_feeds()
     approve_posts.short_description = "Mark selected posts as published"
 
     def archive_posts(self, request, queryset):
         queryset.update(status='archived')
+        invalidate_tags('posts', 'post_index')
+        invalidate_feeds()
     archive_posts.short_description = "Mark selected posts as archived"
 
 @admin.register(Comment)
@@ -46,11 +59,17 @@ class CommentAdmin(admin.ModelAdmin):
             'description': 'Moderate comments on posts.',
             'include_in_dashboard': True,
         }
+        # Queries the generated API may run per request, including permission lookups
+        query_budget = {'list': 5, 'retrieve': 4}
 
     def approve_comments(self, request, queryset):
+        post_ids = set(queryset.values_list('post_id', flat=True))
         queryset.update(is_approved=True)
+        invalidate_tags('comments', *[object_tag('post', post_id) for post_id in post_ids])
     approve_comments.short_description = "Approve selected comments"
 
     def reject_comments(self, request, queryset):
+        post_ids = set(queryset.values_list('post_id', flat=True))
         queryset.update(is_approved=False)
+        invalidate_tags('comments', *[object_tag('post', post_id) for post_id in post_ids])
     reject_comments.short_description = "Reject selected comments" 
\ No newline at end of file
@@ -0,0 +1,102 @@
+# apps/blog/feeds.py
+import hashlib
+import uuid
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import feedgenerator, translation
+from django.utils.http import quote_etag
+from modeltranslation.utils import get_language
+
+from .models import Post
+
+CACHE_KEY_PREFIX = 'blog_feed'
+VERSION_KEY = 'blog_feed:version'
+
+# Seconds a feed built for a version that was rotated away lingers before eviction
+CACHE_TIMEOUT = 24 * 60 * 60
+
+FEED_GENERATORS = {
+    'rss': feedgenerator.Rss201rev2Feed,
+    'atom': feedgenerator.Atom1Feed,
+}
+
+
+def get_feed_version():
+    """The current feeds version token, random so an evicted token never revives old feeds."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _cache_key(feed_format, language, site_url):
+    site = hashlib.md5(site_url.encode()).hexdigest()
+    return f'{CACHE_KEY_PREFIX}:{get_feed_version()}:{feed_format}:{language}:{site}'
+
+
+def build_feed(feed_format, language, site_url):
+    """
+    Renders the feed of the latest published posts in the given language.
+    Returns the document as bytes together with its validators.
+    """
+    blog_settings = getattr(settings, 'BLOG_API_SETTINGS', {})
+    post_url = blog_settings.get('FEED_POST_URL', '/blog/{slug}/')
+
+    with translation.override(language):
+        feed = FEED_GENERATORS[feed_format](
+            title=blog_settings.get('FEED_TITLE', 'Blog'),
+            link=site_url,
+            description=blog_settings.get('FEED_DESCRIPTION', ''),
+            language=language,
+        )
+        posts = (
+            Post.published.select_related('author').prefetch_related('categories')
+            [:blog_settings.get('FEED_ITEM_COUNT', 20)]
+        )
+        for post in posts:
+            feed.add_item(
+                title=post.title or '',
+                link=urljoin(site_url, post_url.format(slug=post.slug, id=post.pk)),
+                description=post.excerpt,
+                unique_id=f'urn:uuid:{post.pk}',
+                unique_id_is_permalink=False,
+                pubdate=post.published_at,
+                updateddate=post.updated_at,
+                author_name=(post.author.get_full_name() or post.author.username) if post.author else None,
+                categories=[category.name for category in post.categories.all()],
+            )
+        content = feed.writeString('utf-8').encode('utf-8')
+
+    latest = feed.latest_post_date()
+    return {
+        'content': content,
+        'content_type': feed.content_type,
+        'etag': quote_etag(hashlib.md5(content).hexdigest()),
+        'last_modified': int(latest.timestamp()),
+    }
+
+
+def get_feed(feed_format, request):
+    """
+    Returns the cached feed for the active language, building it on a miss.
+    Feeds are cached per site URL, which without FEED_SITE_URL is the
+    requesting scheme and host, so one client's Host header is never
+    served to another. invalidate_feeds() rotates the version every key
+    includes when a post changes, so the document is rendered once per
+    change.
+    """
+    language = get_language()
+    site_url = getattr(settings, 'BLOG_API_SETTINGS', {}).get('FEED_SITE_URL') or request.build_absolute_uri('/')
+    key = _cache_key(feed_format, language, site_url)
+    feed = cache.get(key)
+    if feed is None:
+        feed = build_feed(feed_format, language, site_url)
+        cache.set(key, feed, CACHE_TIMEOUT)
+    return feed
+
+
+def invalidate_feeds():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
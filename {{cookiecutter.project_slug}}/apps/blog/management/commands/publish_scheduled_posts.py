@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.blog.scheduling import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = 'Publishes scheduled posts whose publication date has passed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Number of posts updated per batch.')
+        parser.add_argument(
+            '--interval', type=int, default=None,
+            help='Keep running and check for due posts every INTERVAL seconds.',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            published = publish_due_posts(batch_size=options['batch_size'])
+            if published or not interval:
+                self.stdout.write(self.style.SUCCESS(f'Published {published} scheduled post(s).'))
+            if not interval:
+                break
+            time.sleep(interval)
@@ -1,10 +1,32 @@
-from django.db import models
-from django.utils import timezone
-from django.db.models import Count
+from django.db import connections, models
+from django.db.models import Count, Prefetch, Q
+from django.db.models.expressions import RawSQL
+from django.contrib.auth.models import User
 
-class PublishedManager(models.Manager):
+from apps.core.languages import defer_other_languages
+from apps.core.models import Category, Tag
+
+class PostQuerySet(models.QuerySet):
+    def with_list_data(self):
+        """
+        Loads everything PostListSerializer renders in a fixed number of queries:
+        authors (annotated with their post count), categories and tags are
+        prefetched, and the approved comment count is annotated per post.
+        Categories and tags only load the columns of the active language.
+        """
+        return self.prefetch_related(
+            Prefetch('author', queryset=User.objects.annotate(blog_post_count=Count('blog_posts'))),
+            Prefetch('categories', queryset=defer_other_languages(Category.objects.all())),
+            Prefetch('tags', queryset=defer_other_languages(Tag.objects.all())),
+        ).annotate(
+            approved_comments_count=Count('comments', filter=Q(comments__is_approved=True), distinct=True),
+        )
+
+class PublishedManager(models.Manager.from_queryset(PostQuerySet)):
     def get_queryset(self):
-        return super().get_queryset().filter(status='published', published_at__lte=timezone.now())
+        # Due scheduled posts are flipped to published by publish_scheduled_posts,
+        # so there is no clock comparison and the query stays stable and index-friendly
+        return super().get_queryset().filter(status='published')
 
     def featured(self):
         return self.get_queryset().filter(is_featured=True)
@@ -22,5 +44,32 @@ class ApprovedCommentManager(models.Manager):
     def for_post(self, post):
         return self.get_queryset().filter(post=post)
 
+    def replies_by_parent(self, root_ids):
+        """
+        Loads the approved replies below the given comments, at any depth, in
+        one query and groups them by parent id, so their threads can be
+        assembled in memory. A recursive CTE walks down from the roots, so
+        only the threads asked for are read, however large the post's
+        discussion is.
+        """
+        connection = connections[self.db]
+        root_ids = [self.model._meta.pk.get_db_prep_value(pk, connection) for pk in root_ids]
+        if not root_ids:
+            return {}
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        # UNION rather than UNION ALL, so a parent cycle cannot recurse forever
+        descendants = RawSQL(
+            f'WITH RECURSIVE thread(id) AS ('
+            f'SELECT id FROM {table} WHERE parent_id IN ({", ".join(["%s"] * len(root_ids))}) AND is_approved = %s '
+            f'UNION SELECT reply.id FROM {table} reply JOIN thread ON reply.parent_id = thread.id '
+            f'WHERE reply.is_approved = %s'
+            f') SELECT id FROM thread',
+            [*root_ids, True, True],
+        )
+        reply_map = {}
+        for reply in self.get_queryset().filter(pk__in=descendants).select_related('user'):
+            reply_map.setdefault(reply.parent_id, []).append(reply)
+        return reply_map
+
     def recent(self, count=5):
-        return self.get_queryset().order_by('-created_at')[:count] 
\ No newline at end of file
+        return self.get_queryset().order_by('-created_at')[:count]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_future_posts(apps, schema_editor):
+    """
+    PublishedManager no longer compares published_at with the current time,
+    so posts that relied on that comparison to stay hidden are moved out of
+    the published status.
+    """
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(status='published', published_at__gt=timezone.now()).update(status='scheduled')
+    Post.objects.filter(status='published', published_at__isnull=True).update(status='draft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_delete_newsletter'),
+        ('core', '0005_adminpreferences_requestlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'published_at'], name='blog_post_status_pub_idx'),
+        ),
+        migrations.RunPython(schedule_future_posts, migrations.RunPython.noop),
+    ]
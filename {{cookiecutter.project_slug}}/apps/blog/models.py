@@ -57,6 +57,9 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            models.Index(fields=['status', 'published_at'], name='blog_post_status_pub_idx'),
+        ]
         verbose_name = _('Post')
         verbose_name_plural = _('Posts')
 
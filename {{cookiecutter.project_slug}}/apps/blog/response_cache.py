@@ -0,0 +1,153 @@
+# apps/blog/response_cache.py
+import hashlib
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from django.utils.translation import get_language
+
+TAG_KEY_PREFIX = 'blog_response_cache:tag'
+ENTRY_KEY_PREFIX = 'blog_response_cache:response'
+METRIC_KEY_PREFIX = 'blog_response_cache:metric'
+
+# Headers replayed on a cache hit
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Names of every cached endpoint, used to report metrics
+cached_endpoints = set()
+
+
+def get_cache_timeout():
+    return getattr(settings, 'BLOG_API_SETTINGS', {}).get('CACHE_TIMEOUT', 300)
+
+
+def _tag_key(tag):
+    return f'{TAG_KEY_PREFIX}:{tag}'
+
+
+def get_tag_versions(tags):
+    """
+    Returns the current version token of each tag. Tokens are random rather
+    than incrementing so an evicted tag can never revive stale entries.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Evicts every cached response that depends on any of the given tags."""
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def object_tag(name, pk):
+    """The tag of a single object, such as one post, for pages that render it."""
+    return f'{name}:{pk}'
+
+
+def add_cache_dependencies(request, tags):
+    """
+    Makes the cached response of ``request`` depend on ``tags`` found while
+    rendering it, such as the other posts a detail page embeds. Their
+    versions are stored with the entry, which is only served while they hold.
+    """
+    request._cache_dependencies = [*getattr(request, '_cache_dependencies', ()), *tags]
+
+
+def make_cache_key(request, tags):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    raw_key = '|'.join([request.path, query, get_language() or ''] + get_tag_versions(tags))
+    return f'{ENTRY_KEY_PREFIX}:{hashlib.md5(raw_key.encode()).hexdigest()}'
+
+
+def record_metric(name, outcome):
+    key = f'{METRIC_KEY_PREFIX}:{name}:{outcome}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_metrics():
+    keys = {
+        name: (f'{METRIC_KEY_PREFIX}:{name}:hit', f'{METRIC_KEY_PREFIX}:{name}:miss')
+        for name in sorted(cached_endpoints)
+    }
+    values = cache.get_many([key for pair in keys.values() for key in pair])
+    metrics = {}
+    for name, (hit_key, miss_key) in keys.items():
+        hits, misses = values.get(hit_key, 0), values.get(miss_key, 0)
+        total = hits + misses
+        metrics[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+    return metrics
+
+
+def cache_response(*tags):
+    """
+    Caches the rendered response of an anonymous GET handler.
+
+    Entries are keyed by path, query string and active language, and by the
+    current version of each tag, so invalidate_tags() evicts only the
+    endpoints that depend on the changed content. A tag can be a callable
+    taking the view and its URL kwargs, for tags of the requested object.
+    Validators stored with the entry are checked on a hit, so conditional
+    requests still get 304.
+    """
+    def decorator(view_method):
+        name = view_method.__qualname__
+        cached_endpoints.add(name)
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            key = make_cache_key(request, [tag(self, kwargs) if callable(tag) else tag for tag in tags])
+            cached = cache.get(key)
+            if cached is not None:
+                dependencies = cached[2]
+                if dependencies and get_tag_versions(dependencies) != list(dependencies.values()):
+                    cached = None
+            if cached is not None:
+                record_metric(name, 'hit')
+                content, headers, _ = cached
+                response = get_conditional_response(
+                    request,
+                    etag=headers.get('ETag'),
+                    last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+                )
+                if response is None:
+                    response = HttpResponse(content, content_type=headers.get('Content-Type'))
+                for header in ('ETag', 'Last-Modified'):
+                    if header in headers:
+                        response[header] = headers[header]
+                response['X-Cache'] = 'HIT'
+                return response
+
+            record_metric(name, 'miss')
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                def store(rendered):
+                    headers = {header: rendered[header] for header in CACHED_HEADERS if rendered.has_header(header)}
+                    dependencies = list(dict.fromkeys(getattr(request, '_cache_dependencies', ())))
+                    dependencies = dict(zip(dependencies, get_tag_versions(dependencies)))
+                    cache.set(key, (rendered.content, headers, dependencies), get_cache_timeout())
+                response.add_post_render_callback(store)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,43 @@
+# apps/blog/scheduling.py
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post
+from .response_cache import invalidate_tags
+from .feeds import invalidate_feeds
+
+
+def publish_due_posts(batch_size=None, now=None):
+    """
+    Flips scheduled posts whose publication date has passed to published.
+
+    Posts are updated in batches so a large backlog never holds long locks,
+    and public caches are invalidated once at the end.
+    Returns the number of posts published.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'BLOG_API_SETTINGS', {}).get('SCHEDULED_PUBLISH_BATCH_SIZE', 500)
+    now = now or timezone.now()
+
+    published = 0
+    while True:
+        post_ids = list(
+            Post.objects.filter(status='scheduled', published_at__lte=now)
+            .order_by('published_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not post_ids:
+            break
+        with transaction.atomic():
+            # Re-check the status in case a post was edited since it was selected
+            published += Post.objects.filter(pk__in=post_ids, status='scheduled').update(
+                status='published', updated_at=now,
+            )
+        if len(post_ids) < batch_size:
+            break
+
+    if published:
+        invalidate_tags('posts', 'post_index')
+        invalidate_feeds()
+    return published
@@ -1,8 +1,11 @@
 # apps/blog/serializers.py
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db import models
 from .models import Post, Comment
 from apps.core.models import Category, Tag
+from apps.core.category_tree import CategoryTree
+from apps.core.languages import defer_other_languages
 from .validators import validate_profanity
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -14,9 +17,22 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ('post_count',)
 
     def get_subcategories(self, obj):
-        subcategories = obj.children.filter(is_active=True)
+        subcategories = self._get_tree().children(obj.pk)
         return CategorySerializer(subcategories, many=True, context=self.context).data
 
+    def _get_tree(self):
+        # The cached category tree is fetched once per serialization run and
+        # shared through the context, instead of one query per category node.
+        tree = self.context.get('_category_tree')
+        if tree is None:
+            tree = self.context['_category_tree'] = CategoryTree.get()
+        return tree
+
+class CategorySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ('id', 'name', 'slug', 'parent')
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
@@ -32,13 +48,16 @@ class AuthorSerializer(serializers.ModelSerializer):
         fields = ('id', 'username', 'first_name', 'last_name', 'email', 'post_count') # 'profile_image'
     
     def get_post_count(self, obj):
+        # Use the annotation from PostQuerySet.with_list_data() when available
+        if hasattr(obj, 'blog_post_count'):
+            return obj.blog_post_count
         return obj.blog_posts.count()
 
 class PostListSerializer(serializers.ModelSerializer):
     author = AuthorSerializer(read_only=True)
     categories = CategorySerializer(many=True, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True)
+    comments_count = serializers.SerializerMethodField()
     absolute_url = serializers.SerializerMethodField()
     
     class Meta:
@@ -49,6 +68,12 @@ class PostListSerializer(serializers.ModelSerializer):
             'reading_time', 'view_count', 'likes_count', 'comments_count', 'absolute_url'
         )
     
+    def get_comments_count(self, obj):
+        # Use the annotation from PostQuerySet.with_list_data() when available
+        if hasattr(obj, 'approved_comments_count'):
+            return obj.approved_comments_count
+        return obj.comments.filter(is_approved=True).count()
+
     def get_absolute_url(self, obj):
         request = self.context.get('request')
         return request.build_absolute_uri(f'/blog/{obj.slug}/') if request else f'/blog/{obj.slug}/'
@@ -68,7 +93,8 @@ class PostDetailSerializer(PostListSerializer):
     def get_previous_post(self, obj):
         request = self.context.get('request')
         try:
-            previous = Post.published.filter(published_at__lt=obj.published_at).order_by('-published_at').first()
+            previous = defer_other_languages(Post.published.filter(published_at__lt=obj.published_at).with_list_data())
+            previous = previous.order_by('-published_at').first()
             if previous:
                 return PostListSerializer(previous, context={'request': request}).data
         except Post.DoesNotExist:
@@ -78,7 +104,8 @@ class PostDetailSerializer(PostListSerializer):
     def get_next_post(self, obj):
         request = self.context.get('request')
         try:
-            next_post = Post.published.filter(published_at__gt=obj.published_at).order_by('published_at').first()
+            next_post = defer_other_languages(Post.published.filter(published_at__gt=obj.published_at).with_list_data())
+            next_post = next_post.order_by('published_at').first()
             if next_post:
                 return PostListSerializer(next_post, context={'request': request}).data
         except Post.DoesNotExist:
@@ -89,10 +116,20 @@ class PostDetailSerializer(PostListSerializer):
         request = self.context.get('request')
         # Simple related by category for now
         related = Post.published.filter(categories__in=obj.categories.all()).exclude(id=obj.id)
-        related = related.distinct().order_by('-published_at')[:count]
+        related = defer_other_languages(related.distinct().with_list_data()).order_by('-published_at')[:count]
         return PostListSerializer(related, many=True, context={'request': request}).data
 
 
+class CommentListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # Without a reply map from the caller, load one for every comment of
+        # the list, so no sibling is serialized against another one's map
+        comments = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if 'reply_map' not in self.context:
+            self.context['reply_map'] = Comment.approved.replies_by_parent([comment.pk for comment in comments])
+        return super().to_representation(comments)
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author_display_name = serializers.SerializerMethodField()
     replies = serializers.SerializerMethodField()
@@ -101,15 +138,19 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ('id', 'post', 'author_display_name', 'author_website', 'user', 'parent', 'content', 'created_at', 'replies')
         read_only_fields = ('user',)
+        list_serializer_class = CommentListSerializer
 
     def get_author_display_name(self, obj):
         return obj.user.username if obj.user else obj.author_name
     
     def get_replies(self, obj):
-        # Recursive serialization for nested comments
-        if obj.replies.exists():
-            return CommentSerializer(obj.replies.filter(is_approved=True), many=True, context=self.context).data
-        return []
+        # Recursive serialization for nested comments. Replies come from a map
+        # loaded once per serialization run (see CommentThreadMixin and
+        # CommentListSerializer); a single comment loads its own thread.
+        reply_map = self.context.get('reply_map')
+        if reply_map is None:
+            reply_map = self.context['reply_map'] = Comment.approved.replies_by_parent([obj.pk])
+        return CommentSerializer(reply_map.get(obj.pk, []), many=True, context=self.context).data
 
 class CommentCreateSerializer(serializers.ModelSerializer):
     content = serializers.CharField(validators=[validate_profanity])
@@ -2,11 +2,18 @@
 from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
 from django.dispatch import receiver
 from django.db.models import F
+from django.utils import timezone
 
 from .models import Post, Comment
 from apps.core.models import Category, Tag
+from apps.core.category_tree import CategoryTree
+from .response_cache import invalidate_tags, object_tag
+from .feeds import invalidate_feeds
 from .utils import calculate_reading_time, generate_excerpt, generate_unique_slug
 
+# Fields deciding where a post appears: in public lists, between which neighbours
+POST_INDEX_FIELDS = ('status', 'published_at')
+
 @receiver(pre_save, sender=Post)
 def populate_post_fields_on_pre_save(sender, instance, **kwargs):
     if instance.title and not instance.slug:
@@ -15,6 +22,12 @@ def populate_post_fields_on_pre_save(sender, instance, **kwargs):
         instance.reading_time = calculate_reading_time(instance.content)
         if not instance.excerpt:
             instance.excerpt = generate_excerpt(instance.content)
+    if instance.status == 'published':
+        # Future dates are handed to the scheduler instead of being hidden by the query
+        if instance.published_at is None:
+            instance.published_at = timezone.now()
+        elif instance.published_at > timezone.now():
+            instance.status = 'scheduled'
 
 @receiver(post_save, sender=Post)
 def update_counts_on_post_save(sender, instance, created, **kwargs):
@@ -22,20 +35,36 @@ def update_counts_on_post_save(sender, instance, created, **kwargs):
     Signal to update post counts on related models when a post is saved.
     """
     if created:
-        for category in instance.categories.all():
+        categories = instance.categories.all()
+        for category in categories:
             Category.objects.filter(pk=category.pk).update(post_count=F('post_count') + 1)
-        for tag in instance.tags.all():
+        if categories:
+            # post_count is part of the cached category tree and responses
+            CategoryTree.invalidate()
+            invalidate_tags('categories')
+        tags = instance.tags.all()
+        for tag in tags:
             Tag.objects.filter(pk=tag.pk).update(post_count=F('post_count') + 1)
+        if tags:
+            invalidate_tags('tags')
 
 @receiver(post_delete, sender=Post)
 def update_counts_on_post_delete(sender, instance, **kwargs):
     """
     Signal to update post counts on related models when a post is deleted.
     """
-    for category in instance.categories.all():
+    categories = instance.categories.all()
+    for category in categories:
         Category.objects.filter(pk=category.pk).update(post_count=F('post_count') - 1)
-    for tag in instance.tags.all():
+    if categories:
+        # post_count is part of the cached category tree and responses
+        CategoryTree.invalidate()
+        invalidate_tags('categories')
+    tags = instance.tags.all()
+    for tag in tags:
         Tag.objects.filter(pk=tag.pk).update(post_count=F('post_count') - 1)
+    if tags:
+        invalidate_tags('tags')
 
 @receiver(post_save, sender=Comment)
 def update_comment_count_on_save(sender, instance, created, **kwargs):
@@ -49,6 +78,73 @@ def update_comment_count_on_delete(sender, instance, **kwargs):
         instance.post.comments_count = F('comments_count') - 1
         instance.post.save()
 
+@receiver(pre_save, sender=Post)
+def remember_post_index_fields(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored status and publication date, to tell edits in place from
+    changes that move the post between lists and neighbours.
+    """
+    if raw or instance._state.adding:
+        instance._stored_index_fields = None
+    else:
+        instance._stored_index_fields = Post.objects.filter(pk=instance.pk).values_list(*POST_INDEX_FIELDS).first()
+
+@receiver(post_save, sender=Post)
+def invalidate_post_responses_on_save(sender, instance, created, **kwargs):
+    """
+    Evict the cached responses that render the post: its own detail page,
+    pages embedding it, and the lists. Only a post that appears, disappears
+    or moves also evicts the detail pages of the other posts.
+    """
+    stored = getattr(instance, '_stored_index_fields', None)
+    was_published = stored is not None and stored[0] == 'published'
+    if instance.status != 'published' and not was_published:
+        # Drafts are not visible anywhere
+        return
+    tags = [object_tag('post', instance.pk), 'posts']
+    if stored != tuple(getattr(instance, field) for field in POST_INDEX_FIELDS):
+        tags.append('post_index')
+    invalidate_tags(*tags)
+    invalidate_feeds()
+
+@receiver(post_delete, sender=Post)
+def invalidate_post_responses_on_delete(sender, instance, **kwargs):
+    invalidate_tags(object_tag('post', instance.pk), 'posts', 'post_index')
+    invalidate_feeds()
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_relation_responses(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # Related posts are picked by category, so every detail page may change
+        invalidate_tags('posts', 'post_index')
+        invalidate_feeds()
+
+@receiver(post_save, sender=Comment)
+def invalidate_comment_responses_on_save(sender, instance, created, **kwargs):
+    # New comments are pending moderation and not shown publicly
+    if created and not instance.is_approved:
+        return
+    # Pages of the post and those embedding it show its comment count
+    invalidate_tags('comments', object_tag('post', instance.post_id))
+
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_responses_on_delete(sender, instance, **kwargs):
+    if instance.is_approved:
+        invalidate_tags('comments', object_tag('post', instance.post_id))
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_responses(sender, instance, **kwargs):
+    invalidate_tags('categories')
+    # Feed items list their category names
+    invalidate_feeds()
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_responses(sender, instance, **kwargs):
+    invalidate_tags('tags')
+
 # Note: The m2m_changed signal is the correct way to handle post counts for tags/categories,
 # but due to a tool issue, the implementation is being deferred.
 # The current implementation will not update post counts correctly. 
\ No newline at end of file
@@ -0,0 +1,749 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.admin_api.seeding import seed_model
+from apps.core.models import Category, Tag
+from apps.core.category_tree import CategoryTree
+from .models import Post, Comment, PostLike, PostView
+from .scheduling import publish_due_posts
+from .serializers import CommentSerializer
+from .view_counter import view_counter
+
+
+class PostListQueryCountTests(APITestCase):
+    """
+    Tests that the public post list is serialized with a constant number of queries.
+    """
+    def setUp(self):
+        """
+        Create 100 published posts spread over several authors, a small
+        category tree and a few tags, with approved and pending comments.
+        """
+        cache.clear()
+        self.url = reverse('blog:post-list')
+        authors = [User.objects.create_user(username=f'author{i}', password='testpassword123') for i in range(5)]
+        root = Category.objects.create(name='Root')
+        child = Category.objects.create(name='Child', parent=root)
+        Category.objects.create(name='Grandchild', parent=child)
+        tags = [Tag.objects.create(name=f'tag{i}') for i in range(3)]
+
+        published_at = timezone.now() - timedelta(days=1)
+        for i in range(100):
+            post = Post.objects.create(
+                title=f'Post {i}',
+                content='Lorem ipsum dolor sit amet.',
+                author=authors[i % len(authors)],
+                status='published',
+                published_at=published_at - timedelta(minutes=i),
+            )
+            post.categories.set([root, child])
+            post.tags.set(tags)
+            Comment.objects.create(post=post, author_name='a', author_email='a@example.com', content='Nice', is_approved=True)
+            Comment.objects.create(post=post, author_name='b', author_email='b@example.com', content='Pending')
+        CategoryTree.get()
+
+    def test_list_query_count_is_constant(self):
+        """
+        Ensure the number of queries does not depend on the page size.
+        """
+        for page_size in (1, 20, 100):
+            with self.subTest(page_size=page_size):
+                # validators, count, posts, authors, categories, tags, request log
+                with self.assertNumQueries(7):
+                    response = self.client.get(self.url, {'page_size': page_size})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(response.data['data']), page_size)
+
+    def test_list_payload(self):
+        """
+        Ensure the prefetched data matches what the per-row queries used to return.
+        """
+        response = self.client.get(self.url, {'page_size': 1})
+        post = response.data['data'][0]
+        self.assertEqual(post['comments_count'], 1)
+        self.assertEqual(post['author']['post_count'], 20)
+        root = next(category for category in post['categories'] if category['name'] == 'Root')
+        self.assertEqual(root['subcategories'][0]['name'], 'Child')
+        self.assertEqual(root['subcategories'][0]['subcategories'][0]['name'], 'Grandchild')
+
+
+class CategoryTreeAPITests(APITestCase):
+    """
+    Tests for the cached category hierarchy endpoints.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.root = Category.objects.create(name='Root')
+        self.child = Category.objects.create(name='Child', parent=self.root)
+        self.grandchild = Category.objects.create(name='Grandchild', parent=self.child)
+        Category.objects.create(name='Hidden', parent=self.root, is_active=False)
+
+    def test_tree_is_served_from_cache(self):
+        """
+        Ensure the tree is built with one query and then served without touching categories.
+        """
+        url = reverse('blog:category-tree')
+        # categories, request log
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual([node['name'] for node in response.data], ['Root'])
+        self.assertEqual(response.data[0]['subcategories'][0]['subcategories'][0]['name'], 'Grandchild')
+
+        # request log
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_tree_is_invalidated_on_save(self):
+        """
+        Ensure saving a category evicts the cached tree.
+        """
+        url = reverse('blog:category-tree')
+        self.client.get(url)
+        self.grandchild.name = 'Renamed'
+        self.grandchild.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data[0]['subcategories'][0]['subcategories'][0]['name'], 'Renamed')
+
+    def test_ancestors_and_descendants(self):
+        """
+        Ensure subtree and ancestor lookups follow the active hierarchy.
+        """
+        response = self.client.get(reverse('blog:category-ancestors', args=[self.grandchild.pk]))
+        self.assertEqual([node['name'] for node in response.data], ['Root', 'Child'])
+
+        response = self.client.get(reverse('blog:category-descendants', args=[self.root.pk]))
+        self.assertEqual([node['name'] for node in response.data], ['Child', 'Grandchild'])
+
+    def test_cyclic_parents_do_not_loop(self):
+        """
+        Ensure a parent cycle cannot make the tree recurse forever.
+        """
+        Category.objects.filter(pk=self.root.pk).update(parent=self.grandchild)
+        CategoryTree.invalidate()
+        tree = CategoryTree.get()
+        self.assertEqual(tree.roots, [])
+        self.assertEqual(len(tree.ancestors(self.child.pk)), 2)
+
+
+class CommentThreadTests(APITestCase):
+    """
+    Tests that comment threads are assembled in memory with a constant number of queries.
+    """
+    def setUp(self):
+        author = User.objects.create_user(username='author', password='testpassword123')
+        self.client.force_authenticate(user=author)
+        self.post = Post.objects.create(title='Threads', content='Body', author=author, status='published', published_at=timezone.now())
+        self.url = reverse('blog:post-comments', args=[self.post.pk])
+
+    def _comment(self, parent=None, is_approved=True, content='Hello'):
+        return Comment.objects.create(
+            post=self.post, parent=parent, author_name='a', author_email='a@example.com',
+            content=content, is_approved=is_approved,
+        )
+
+    def _build_threads(self, count, depth):
+        for _ in range(count):
+            parent = self._comment()
+            for _ in range(depth):
+                parent = self._comment(parent=parent)
+
+    def test_thread_query_count_is_constant(self):
+        """
+        Ensure deeper and more numerous threads do not add queries.
+        """
+        for count, depth in ((1, 1), (5, 5)):
+            with self.subTest(count=count, depth=depth):
+                Comment.objects.all().delete()
+                self._build_threads(count, depth)
+                # count, top-level comments, replies, request log
+                with self.assertNumQueries(4):
+                    response = self.client.get(self.url)
+                self.assertEqual(response.data['meta']['pagination']['count'], count)
+
+    def test_replies_are_nested_and_filtered(self):
+        """
+        Ensure only approved replies are nested and replies are not listed at the top level.
+        """
+        root = self._comment(content='Root')
+        reply = self._comment(parent=root, content='Reply')
+        self._comment(parent=reply, content='Nested')
+        self._comment(parent=root, is_approved=False, content='Pending')
+
+        response = self.client.get(self.url)
+        threads = response.data['data']
+        self.assertEqual(len(threads), 1)
+        self.assertEqual([r['content'] for r in threads[0]['replies']], ['Reply'])
+        self.assertEqual(threads[0]['replies'][0]['replies'][0]['content'], 'Nested')
+
+    def test_only_replies_below_the_requested_roots_are_loaded(self):
+        """
+        Ensure replies are read for the roots on the page, not for the whole post.
+        """
+        root = self._comment(content='Root')
+        reply = self._comment(parent=root, content='Reply')
+        nested = self._comment(parent=reply, content='Nested')
+        other_root = self._comment(content='Other')
+        self._comment(parent=other_root, content='Other reply')
+
+        reply_map = Comment.approved.replies_by_parent([root.pk])
+        self.assertEqual({parent_id: [c.pk for c in replies] for parent_id, replies in reply_map.items()}, {
+            root.pk: [reply.pk],
+            reply.pk: [nested.pk],
+        })
+        self.assertEqual(Comment.approved.replies_by_parent([]), {})
+
+    def test_serializing_threads_without_a_reply_map(self):
+        """
+        Ensure every top-level comment gets its replies when the caller passes no reply map.
+        """
+        first, second = self._comment(content='First'), self._comment(content='Second')
+        self._comment(parent=first, content='First reply')
+        self._comment(parent=second, content='Second reply')
+
+        with self.assertNumQueries(1):
+            data = CommentSerializer([first, second], many=True).data
+        self.assertEqual([[reply['content'] for reply in thread['replies']] for thread in data], [['First reply'], ['Second reply']])
+
+
+class PostViewCounterTests(APITestCase):
+    """
+    Tests for the buffered, write-behind post view counter.
+    """
+    def setUp(self):
+        cache.clear()
+        view_counter.flush()
+        self.post = Post.objects.create(title='Viral', content='Body', status='published', published_at=timezone.now())
+        self.url = reverse('blog:post-increment-view', args=[self.post.pk])
+
+    def test_views_are_buffered_and_flushed_in_bulk(self):
+        """
+        Ensure hits do not touch the post row until the buffer is flushed.
+        """
+        for _ in range(3):
+            # request log only
+            with self.assertNumQueries(1):
+                response = self.client.post(self.url)
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+
+        self.assertEqual(view_counter.flush(), 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+
+    def test_post_views_are_deduplicated(self):
+        """
+        Ensure repeated hits from the same visitor record a single PostView row.
+        """
+        self.client.post(self.url, REMOTE_ADDR='10.0.0.1')
+        self.client.post(self.url, REMOTE_ADDR='10.0.0.1')
+        self.client.post(self.url, REMOTE_ADDR='10.0.0.2')
+        view_counter.flush()
+        self.assertEqual(PostView.objects.filter(post=self.post).count(), 2)
+
+    def test_forwarded_for_written_by_the_client_does_not_escape_the_dedup(self):
+        """
+        Ensure a visitor varying X-Forwarded-For is still one visitor, unless a trusted proxy added the entry.
+        """
+        for i in range(3):
+            self.client.post(self.url, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{i}')
+        view_counter.flush()
+        self.assertEqual(list(PostView.objects.values_list('ip_address', flat=True)), ['10.0.0.1'])
+
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            self.client.post(self.url, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='192.0.2.9, 198.51.100.7')
+        view_counter.flush()
+        self.assertTrue(PostView.objects.filter(ip_address='198.51.100.7').exists())
+
+    def test_failed_flush_keeps_the_hits(self):
+        """
+        Ensure a flush that fails neither fails the request nor drops the buffered hits.
+        """
+        self.client.post(self.url, REMOTE_ADDR='10.0.0.1')
+        self.client.post(self.url, REMOTE_ADDR='10.0.0.2')
+        blog_settings = {**settings.BLOG_API_SETTINGS, 'VIEW_COUNT_FLUSH_THRESHOLD': 3}
+        with self.settings(BLOG_API_SETTINGS=blog_settings):
+            with mock.patch.object(PostView.objects, 'bulk_create', side_effect=DatabaseError('database is locked')):
+                with self.assertLogs('apps.core.write_behind', level='ERROR'):
+                    response = self.client.post(self.url, REMOTE_ADDR='10.0.0.3')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+
+        self.assertEqual(view_counter.flush(), 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+        self.assertEqual(PostView.objects.filter(post=self.post).count(), 3)
+
+
+class PostLikeTests(APITestCase):
+    """
+    Tests for the idempotent like and unlike endpoints.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='fan', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(title='Likeable', content='Body', status='published', published_at=timezone.now())
+        self.like_url = reverse('blog:post-like', args=[self.post.pk])
+        self.unlike_url = reverse('blog:post-unlike', args=[self.post.pk])
+
+    def test_like_is_idempotent(self):
+        """
+        Ensure liking twice stores one like and counts it once.
+        """
+        for _ in range(2):
+            response = self.client.post(self.like_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data['liked'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+        self.assertEqual(PostLike.objects.filter(post=self.post).count(), 1)
+
+    def test_unlike_is_idempotent(self):
+        """
+        Ensure unliking twice removes the like and never drops the count below zero.
+        """
+        self.client.post(self.like_url)
+        for _ in range(2):
+            response = self.client.post(self.unlike_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(response.data['liked'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+
+    def test_like_missing_post(self):
+        """
+        Ensure liking an unknown post returns 404 and leaves no like behind.
+        """
+        response = self.client.post(reverse('blog:post-like', args=['00000000-0000-0000-0000-000000000000']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(PostLike.objects.exists())
+
+    def test_like_requires_authentication(self):
+        """
+        Ensure anonymous users cannot like posts.
+        """
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.like_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_liked_status_for_a_page(self):
+        """
+        Ensure the liked status of several posts is resolved with one query.
+        """
+        other = Post.objects.create(title='Other', content='Body', status='published', published_at=timezone.now())
+        self.client.post(self.like_url)
+        # likes, request log
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('blog:post-liked'), {'ids': f'{self.post.pk},{other.pk}'})
+        self.assertEqual(response.data, {str(self.post.pk): True, str(other.pk): False})
+
+
+class ResponseCacheTests(APITestCase):
+    """
+    Tests for the tag-invalidated response cache of public blog endpoints.
+    """
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(title='Cached', content='Body', status='published', published_at=timezone.now())
+        self.post_list_url = reverse('blog:post-list')
+        self.category_list_url = reverse('blog:category-list')
+
+    def test_anonymous_responses_are_cached(self):
+        """
+        Ensure a repeated anonymous request is served without running the view.
+        """
+        first = self.client.get(self.post_list_url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        # request log only
+        with self.assertNumQueries(1):
+            second = self.client.get(self.post_list_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+
+    def test_cache_is_keyed_by_query_and_language(self):
+        """
+        Ensure different query strings and languages get their own entries.
+        """
+        self.client.get(self.post_list_url)
+        self.assertEqual(self.client.get(self.post_list_url, {'page_size': 5})['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.post_list_url, HTTP_ACCEPT_LANGUAGE='de')['X-Cache'], 'MISS')
+
+    def test_publishing_evicts_only_affected_pages(self):
+        """
+        Ensure a new post evicts post pages but not the stats of other content.
+        """
+        self.client.get(self.post_list_url)
+        Post.objects.create(title='Fresh', content='Body', status='published', published_at=timezone.now())
+
+        response = self.client.get(self.post_list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['meta']['pagination']['count'], 2)
+
+    def test_editing_a_post_evicts_only_pages_rendering_it(self):
+        """
+        Ensure an edit evicts the post's page and the pages embedding it, not other detail pages.
+        """
+        now = timezone.now()
+        Post.objects.filter(pk=self.post.pk).update(published_at=now - timedelta(days=3))
+        middle = Post.objects.create(title='Middle', content='Body', status='published', published_at=now - timedelta(days=2))
+        latest = Post.objects.create(title='Latest', content='Body', status='published', published_at=now - timedelta(days=1))
+        urls = {post.pk: reverse('blog:post-detail', args=[post.pk]) for post in (self.post, middle, latest)}
+        for url in urls.values():
+            self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+        self.post.refresh_from_db()
+        self.post.title = 'Edited'
+        self.post.save()
+
+        response = self.client.get(urls[self.post.pk])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['title'], 'Edited')
+        # The next post embeds the edited one as its previous post
+        response = self.client.get(urls[middle.pk])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['previous_post']['title'], 'Edited')
+        self.assertEqual(self.client.get(urls[latest.pk])['X-Cache'], 'HIT')
+
+        # Publishing a post changes neighbours, so every detail page is rebuilt
+        Post.objects.create(title='Newest', content='Body', status='published', published_at=now)
+        self.assertEqual(self.client.get(urls[latest.pk]).data['next_post']['title'], 'Newest')
+
+    def test_category_endpoints_require_authentication(self):
+        """
+        Ensure the category endpoints keep the default authentication requirement.
+        """
+        self.assertEqual(self.client.get(self.category_list_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_pending_comments_do_not_evict(self):
+        """
+        Ensure comments awaiting moderation keep cached pages warm.
+        """
+        self.client.get(self.post_list_url)
+        Comment.objects.create(post=self.post, author_name='a', author_email='a@example.com', content='Hi')
+        self.assertEqual(self.client.get(self.post_list_url)['X-Cache'], 'HIT')
+
+    def test_authenticated_requests_bypass_cache(self):
+        """
+        Ensure authenticated users always get a fresh response.
+        """
+        user = User.objects.create_user(username='reader', password='testpassword123')
+        self.client.force_authenticate(user=user)
+        self.client.get(self.post_list_url)
+        self.assertFalse(self.client.get(self.post_list_url).has_header('X-Cache'))
+
+
+class ConditionalGetTests(APITestCase):
+    """
+    Tests for ETag and Last-Modified support on posts and categories.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='poller', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='News')
+        self.post = Post.objects.create(title='Polled', content='Body', status='published', published_at=timezone.now())
+        self.list_url = reverse('blog:post-list')
+        self.detail_url = reverse('blog:post-detail', kwargs={'pk': self.post.pk})
+
+    def test_unchanged_list_returns_not_modified(self):
+        """
+        Ensure a matching If-None-Match is answered with 304 from one aggregate query.
+        """
+        response = self.client.get(self.list_url)
+        # request log and the aggregate
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_changes_produce_new_etag(self):
+        """
+        Ensure edits, likes and new comments change the validators.
+        """
+        etag = self.client.get(self.detail_url)['ETag']
+
+        self.client.post(reverse('blog:post-like', kwargs={'pk': self.post.pk}))
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        Comment.objects.create(post=self.post, author_name='a', author_email='a@example.com', content='Hi', is_approved=True)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        self.post.title = 'Edited'
+        self.post.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Edited')
+
+    def test_no_last_modified_where_it_can_go_stale(self):
+        """
+        Ensure lists and post details, whose validators cover more than the
+        latest updated_at, send no Last-Modified to be answered with a stale 304.
+        """
+        other = Post.objects.create(title='Older', content='Body', status='published', published_at=timezone.now())
+        self.assertFalse(self.client.get(self.list_url).has_header('Last-Modified'))
+        response = self.client.get(self.detail_url)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        # A deleted row or a bumped counter leaves every updated_at alone
+        etag = self.client.get(self.list_url)['ETag']
+        other.delete()
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_missing_post_is_not_found(self):
+        """
+        Ensure validators are not emitted for posts that do not exist.
+        """
+        response = self.client.get(reverse('blog:post-detail', kwargs={'pk': 'not-a-uuid'}), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_category_etag_follows_subcategories(self):
+        """
+        Ensure a category's ETag changes when a subcategory is added to it.
+        """
+        url = reverse('blog:category-detail', kwargs={'pk': self.category.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Category.objects.create(name='Local', parent=self.category)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['subcategories']), 1)
+
+    def test_cached_responses_keep_validators(self):
+        """
+        Ensure anonymous cache hits carry the ETag and honour If-None-Match.
+        """
+        self.client.force_authenticate(user=None)
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+
+class PostFeedTests(APITestCase):
+    """
+    Tests for the cached RSS and Atom feeds.
+    """
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            title_en='Hello', title_de='Hallo', content='Body', status='published', published_at=timezone.now()
+        )
+        self.rss_url = reverse('blog:post-feed')
+        self.atom_url = reverse('blog:post-feed-atom')
+
+    def test_feeds_render(self):
+        """
+        Ensure both formats list published posts only, without authentication.
+        """
+        Post.objects.create(title='Draft', content='Body', status='draft')
+        response = self.client.get(self.rss_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/rss+xml'))
+        self.assertIn(b'<title>Hello</title>', response.content)
+        self.assertNotIn(b'Draft', response.content)
+
+        response = self.client.get(self.atom_url)
+        self.assertTrue(response['Content-Type'].startswith('application/atom+xml'))
+        self.assertIn(b'<title>Hello</title>', response.content)
+
+    def test_polling_costs_no_queries(self):
+        """
+        Ensure a built feed is served from cache and honours conditional requests.
+        """
+        etag = self.client.get(self.rss_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.rss_url)
+        self.assertEqual(response['ETag'], etag)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.rss_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_feed_is_per_language(self):
+        """
+        Ensure each language gets its own feed document.
+        """
+        self.assertIn(b'<title>Hello</title>', self.client.get(self.rss_url).content)
+        self.assertIn(b'<title>Hallo</title>', self.client.get(self.rss_url, HTTP_ACCEPT_LANGUAGE='de').content)
+
+    def test_feed_links_follow_the_requesting_host(self):
+        """
+        Ensure without FEED_SITE_URL each host gets a feed linking to itself, not the first requester's host.
+        """
+        blog_settings = {**settings.BLOG_API_SETTINGS, 'FEED_SITE_URL': ''}
+        with self.settings(BLOG_API_SETTINGS=blog_settings):
+            self.assertIn(b'http://testserver/', self.client.get(self.rss_url).content)
+            content = self.client.get(self.rss_url, HTTP_HOST='localhost').content
+        self.assertIn(b'http://localhost/', content)
+        self.assertNotIn(b'testserver', content)
+
+    def test_publishing_rebuilds_feed(self):
+        """
+        Ensure publishing and unpublishing a post replace the cached document.
+        """
+        etag = self.client.get(self.rss_url)['ETag']
+        Post.objects.create(title='Second', content='Body', status='published', published_at=timezone.now())
+        response = self.client.get(self.rss_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'Second', response.content)
+
+        self.post.status = 'draft'
+        self.post.save()
+        self.assertNotIn(b'<title>Hello</title>', self.client.get(self.rss_url).content)
+
+
+class TranslatedResponseTests(APITestCase):
+    """
+    Tests that post responses only load the columns of the requested language.
+    """
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            title_en='Hello', title_de='Hallo', title_fr='Bonjour', content_en='Body', content_de='Text',
+            status='published', published_at=timezone.now() - timedelta(minutes=1),
+        )
+        self.list_url = reverse('blog:post-list')
+
+    def _post_selects(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('SELECT') and 'FROM "blog_post"' in query['sql']]
+
+    def test_lang_param_selects_language(self):
+        """
+        Ensure ?lang= renders the requested language and skips the columns of the others.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {'lang': 'de'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'][0]['title'], 'Hallo')
+        selects = self._post_selects(queries)
+        self.assertTrue(selects)
+        self.assertFalse(any('"blog_post"."title_fr"' in sql for sql in selects))
+
+    def test_accept_language_and_fallback(self):
+        """
+        Ensure Accept-Language is honoured and empty translations fall back to the default language.
+        """
+        response = self.client.get(reverse('blog:post-detail', kwargs={'pk': self.post.pk}), HTTP_ACCEPT_LANGUAGE='fr')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Bonjour')
+        self.assertEqual(response.data['content'], 'Body')
+
+    def test_unknown_lang_is_rejected(self):
+        """
+        Ensure unknown language codes are answered with 400.
+        """
+        response = self.client.get(self.list_url, {'lang': 'xx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ScheduledPublishingTests(APITestCase):
+    """
+    Tests for publishing scheduled posts once they are due.
+    """
+    def setUp(self):
+        cache.clear()
+        self.list_url = reverse('blog:post-list')
+
+    def test_future_posts_are_scheduled(self):
+        """
+        Ensure publishing with a future date schedules the post instead.
+        """
+        post = Post.objects.create(title='Later', content='Body', status='published', published_at=timezone.now() + timedelta(days=1))
+        self.assertEqual(post.status, 'scheduled')
+        self.assertFalse(Post.published.filter(pk=post.pk).exists())
+
+        post = Post.objects.create(title='Now', content='Body', status='published')
+        self.assertIsNotNone(post.published_at)
+
+    def test_seeded_future_posts_are_scheduled(self):
+        """
+        Ensure posts bulk inserted by the seeder with a future date are scheduled, not listed early.
+        """
+        seed_model(User, 3)
+        with mock.patch('apps.admin_api.seeding.SEED_EPOCH', timezone.now() + timedelta(days=400)):
+            seed_model(Post, 20, seed=1)
+        self.assertTrue(Post.objects.filter(status='scheduled', published_at__gt=timezone.now()).exists())
+        self.assertFalse(Post.objects.filter(status='published', published_at__gt=timezone.now()).exists())
+        self.assertEqual(self.client.get(self.list_url).data['meta']['pagination']['count'], 0)
+
+    def test_due_posts_are_published_in_batches(self):
+        """
+        Ensure only due scheduled posts are published, across several batches.
+        """
+        now = timezone.now()
+        due = [
+            Post.objects.create(title=f'Due {i}', content='Body', status='scheduled', published_at=now - timedelta(minutes=i))
+            for i in range(5)
+        ]
+        later = Post.objects.create(title='Later', content='Body', status='scheduled', published_at=now + timedelta(days=1))
+
+        self.assertEqual(publish_due_posts(batch_size=2), 5)
+        self.assertEqual(set(Post.published.values_list('pk', flat=True)), {post.pk for post in due})
+        later.refresh_from_db()
+        self.assertEqual(later.status, 'scheduled')
+        self.assertEqual(publish_due_posts(), 0)
+
+    def test_publishing_invalidates_cached_pages(self):
+        """
+        Ensure cached lists show newly published posts.
+        """
+        Post.objects.create(title='Due', content='Body', status='scheduled', published_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.client.get(self.list_url).data['meta']['pagination']['count'], 0)
+
+        call_command('publish_scheduled_posts', stdout=StringIO())
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['meta']['pagination']['count'], 1)
+
+
+class AdminQueryBudgetTests(APITestCase):
+    """
+    Tests that the generated admin endpoints for posts and comments stay within their query budgets.
+    """
+    def setUp(self):
+        admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpassword123')
+        self.client.force_authenticate(user=admin_user)
+        category = Category.objects.create(name='News')
+        tag = Tag.objects.create(name='python')
+        for i in range(10):
+            author = User.objects.create_user(username=f'writer{i}', password='testpassword123')
+            post = Post.objects.create(title=f'Post {i}', content='Body', author=author, status='published')
+            post.categories.add(category)
+            post.tags.add(tag)
+            Comment.objects.create(post=post, user=author, author_name='a', author_email='a@example.com', content='Hi')
+
+    def test_admin_endpoints_within_budget(self):
+        """
+        Ensure list and detail requests do not exceed the budgets declared on the ModelAdmins.
+        """
+        for model_name, model in (('post', Post), ('comment', Comment)):
+            with self.subTest(model=model_name):
+                response = self.client.get(reverse(f'admin_api:{model_name}-list'))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data['count'], 10)
+                pk = model.objects.values_list('pk', flat=True).first()
+                response = self.client.get(reverse(f'admin_api:{model_name}-detail', kwargs={'pk': pk}))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
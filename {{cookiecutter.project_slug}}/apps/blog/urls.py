@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     PostViewSet, CategoryViewSet, TagViewSet, CommentViewSet,
     AuthorViewSet, SearchAPIView,
-    CommentListCreateView, PostFeedView, BlogStatsView
+    CommentListCreateView, PostFeedView, BlogStatsView, ResponseCacheStatsView
 )
 
 router = DefaultRouter()
@@ -20,5 +20,7 @@ urlpatterns = [
     path('search/', SearchAPIView.as_view(), name='search'),
     path('posts/<uuid:post_pk>/comments/', CommentListCreateView.as_view(), name='post-comments'),
     path('feed/', PostFeedView.as_view(), name='post-feed'),
+    path('feed/atom/', PostFeedView.as_view(feed_format='atom'), name='post-feed-atom'),
     path('stats/', BlogStatsView.as_view(), name='blog-stats'),
+    path('cache-stats/', ResponseCacheStatsView.as_view(), name='cache-stats'),
 ] 
\ No newline at end of file
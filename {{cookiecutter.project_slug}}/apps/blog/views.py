@@ -1,82 +1,195 @@
 # apps/blog/views.py
+import uuid
+
 from rest_framework import viewsets, generics, status, mixins
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.contrib.auth.models import User
-from django.db.models import F, Q
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
 from django.shortcuts import get_object_or_404
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
 
 from .models import Post, Comment, PostLike
 from apps.core.models import Category, Tag
+from apps.core.category_tree import CategoryTree
+from apps.core.mixins import ConditionalGetMixin, LanguagePruningMixin
+from apps.core.utils import get_trusted_client_ip
 from .serializers import (
     PostListSerializer, PostDetailSerializer, CategorySerializer,
     TagSerializer, CommentSerializer, CommentCreateSerializer,
-    AuthorSerializer
+    AuthorSerializer, CategorySummarySerializer
 )
 from .permissions import IsAuthorOrReadOnly, IsAdminOrReadOnly, CanModerateComments
 from .pagination import BlogPagination
+from .view_counter import view_counter
+from .feeds import get_feed
+from .response_cache import add_cache_dependencies, cache_response, get_metrics, get_tag_versions, object_tag
 # from .filters import PostFilter, CommentFilter, CategoryFilter # Disabled due to tool issue
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.published.all().select_related('author').prefetch_related('categories', 'tags')
+def requested_post_tag(view, kwargs):
+    return object_tag('post', view._get_post_id(kwargs['pk']))
+
+class PostViewSet(ConditionalGetMixin, LanguagePruningMixin, viewsets.ModelViewSet):
     serializer_class = PostListSerializer
     pagination_class = BlogPagination
     # filterset_class = PostFilter # Disabled due to tool issue
     search_fields = ['title', 'content', 'excerpt']
     ordering_fields = ['published_at', 'view_count', 'likes_count']
 
+    def get_queryset(self):
+        # Built per request so the published_at cut-off is not frozen at import time
+        return self.prune_languages(Post.published.with_list_data())
+
+    def get_conditional_queryset(self):
+        return self.filter_queryset(Post.published.all())
+
+    def get_conditional_aggregates(self):
+        # Counters are bumped with update(), which leaves updated_at alone
+        return {'likes': Sum('likes_count'), 'views': Sum('view_count')}
+
+    def get_conditional_tokens(self):
+        # Covers related content such as comments and the neighbouring posts of a detail page
+        return get_tag_versions(('posts', 'comments', 'categories', 'tags'))
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return PostDetailSerializer
         return PostListSerializer
 
+    @cache_response('posts', 'comments', 'categories', 'tags')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    # A detail page depends on its own post, on which posts surround it and are related to it
+    # ('post_index'), and on the posts it embeds, recorded as dependencies while rendering
+    @cache_response(requested_post_tag, 'post_index', 'categories', 'tags')
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == 200:
+            embedded = [
+                response.data.get('previous_post'), response.data.get('next_post'), *response.data.get('related_posts', ()),
+            ]
+            add_cache_dependencies(request, [object_tag('post', post['id']) for post in embedded if post])
+        return response
+
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             self.permission_classes = [IsAuthenticated, IsAuthorOrReadOnly]
+        elif self.action in ['like', 'unlike', 'liked']:
+            self.permission_classes = [IsAuthenticated]
         else:
             self.permission_classes = [AllowAny]
         return super().get_permissions()
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def like(self, request, pk=None):
-        post = self.get_object()
-        user = request.user
-        if PostLike.objects.filter(post=post, user=user).exists():
-            return Response({"message": "You have already liked this post."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        PostLike.objects.create(post=post, user=user)
-        Post.objects.filter(pk=post.pk).update(likes_count=F('likes_count') + 1)
-        return Response({"message": "Post liked successfully."}, status=status.HTTP_200_OK)
+        post_id = self._get_post_id(pk)
+        with transaction.atomic():
+            try:
+                # The unique (post, user) constraint makes a repeated like a no-op
+                with transaction.atomic():
+                    PostLike.objects.create(post_id=post_id, user=request.user)
+            except IntegrityError:
+                return Response({"message": "You have already liked this post.", "liked": True}, status=status.HTTP_200_OK)
+
+            # Only count the like when the insert happened; a missing post rolls it back
+            if not Post.published.filter(pk=post_id).update(likes_count=F('likes_count') + 1):
+                raise Http404
+        return Response({"message": "Post liked successfully.", "liked": True}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def unlike(self, request, pk=None):
-        post = self.get_object()
-        user = request.user
-        like = PostLike.objects.filter(post=post, user=user)
-        if not like.exists():
-            return Response({"message": "You have not liked this post."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        like.delete()
-        Post.objects.filter(pk=post.pk).update(likes_count=F('likes_count') - 1)
-        return Response({"message": "Post unliked successfully."}, status=status.HTTP_200_OK)
+        post_id = self._get_post_id(pk)
+        with transaction.atomic():
+            deleted, _ = PostLike.objects.filter(post_id=post_id, user=request.user).delete()
+            if not deleted:
+                return Response({"message": "You have not liked this post.", "liked": False}, status=status.HTTP_200_OK)
+            Post.objects.filter(pk=post_id, likes_count__gt=0).update(likes_count=F('likes_count') - 1)
+        return Response({"message": "Post unliked successfully.", "liked": False}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def liked(self, request):
+        """
+        Returns which of the given posts (?ids=<uuid>,<uuid>,...) the current
+        user has liked, so a whole page can be checked with one query.
+        """
+        try:
+            post_ids = [uuid.UUID(value) for value in request.query_params.get('ids', '').split(',') if value]
+        except ValueError:
+            return Response({"message": "ids must be a comma-separated list of post ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(post_ids) > BlogPagination.max_page_size:
+            return Response({"message": f"At most {BlogPagination.max_page_size} ids can be checked at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+        liked = set(PostLike.objects.filter(user=request.user, post_id__in=post_ids).values_list('post_id', flat=True))
+        return Response({str(post_id): post_id in liked for post_id in post_ids})
 
     @action(detail=True, methods=['post'])
     def increment_view(self, request, pk=None):
-        post = self.get_object()
-        Post.objects.filter(pk=post.pk).update(view_count=F('view_count') + 1)
+        # Views are buffered and written behind in bulk, so the post is not fetched here.
+        # Visitors are told apart by an address they cannot forge, so the dedup holds
+        view_counter.record(
+            self._get_post_id(pk),
+            ip_address=get_trusted_client_ip(request),
+            user=request.user,
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        )
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    def _get_post_id(self, pk):
+        try:
+            return uuid.UUID(str(pk))
+        except ValueError:
+            raise Http404
+
+class CategoryViewSet(ConditionalGetMixin, LanguagePruningMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     # filterset_class = CategoryFilter # Disabled due to tool issue
     search_fields = ['name', 'description']
 
+    def get_conditional_tokens(self):
+        # Post counts and subcategories change without touching updated_at
+        return get_tag_versions(('categories',))
+
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """The full active category hierarchy, served from cache."""
+        def build(tree):
+            context = self.get_serializer_context()
+            context['_category_tree'] = tree
+            return CategorySerializer(tree.roots, many=True, context=context).data
+        return Response(CategoryTree.get_serialized(build))
+
+    @action(detail=True, methods=['get'])
+    def descendants(self, request, pk=None):
+        tree = CategoryTree.get()
+        category = self._get_tree_node(tree, pk)
+        return Response(CategorySummarySerializer(tree.descendants(category.pk), many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def ancestors(self, request, pk=None):
+        tree = CategoryTree.get()
+        category = self._get_tree_node(tree, pk)
+        return Response(CategorySummarySerializer(tree.ancestors(category.pk), many=True).data)
+
+    def _get_tree_node(self, tree, pk):
+        try:
+            category = tree.get_node(int(pk))
+        except (TypeError, ValueError):
+            category = None
+        if category is None:
+            raise Http404
+        return category
+
     @action(detail=True, methods=['get'])
     def posts(self, request, pk=None):
         category = self.get_object()
-        posts = Post.published.filter(categories=category)
+        posts = self.prune_languages(Post.published.filter(categories=category).with_list_data())
         page = self.paginate_queryset(posts)
         if page is not None:
             serializer = PostListSerializer(page, many=True, context={'request': request})
@@ -85,7 +198,7 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(LanguagePruningMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     search_fields = ['name']
@@ -93,7 +206,7 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def posts(self, request, pk=None):
         tag = self.get_object()
-        posts = Post.published.filter(tags=tag)
+        posts = self.prune_languages(Post.published.filter(tags=tag).with_list_data())
         page = self.paginate_queryset(posts)
         if page is not None:
             serializer = PostListSerializer(page, many=True, context={'request': request})
@@ -101,14 +214,14 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = PostListSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
 
-class AuthorViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = User.objects.filter(is_active=True)
+class AuthorViewSet(LanguagePruningMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = User.objects.filter(is_active=True).annotate(blog_post_count=Count('blog_posts'))
     serializer_class = AuthorSerializer
 
     @action(detail=True, methods=['get'])
     def posts(self, request, pk=None):
         author = self.get_object()
-        posts = Post.published.filter(author=author)
+        posts = self.prune_languages(Post.published.filter(author=author).with_list_data())
         page = self.paginate_queryset(posts)
         if page is not None:
             serializer = PostListSerializer(page, many=True, context={'request': request})
@@ -116,7 +229,26 @@ class AuthorViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = PostListSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentThreadMixin:
+    """
+    Lists comments as threads: top-level comments are paginated and the
+    approved replies below the page's comments are loaded in a single query
+    and nested in memory.
+    """
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).filter(parent__isnull=True).select_related('user')
+        page = self.paginate_queryset(queryset)
+        threads = page if page is not None else list(queryset)
+
+        context = self.get_serializer_context()
+        context['reply_map'] = Comment.approved.replies_by_parent([comment.pk for comment in threads])
+        serializer = self.get_serializer(threads, many=True, context=context)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+class CommentViewSet(CommentThreadMixin, viewsets.ModelViewSet):
     queryset = Comment.approved.all()
     # filterset_class = CommentFilter # Disabled due to tool issue
     
@@ -140,21 +272,21 @@ class CommentViewSet(viewsets.ModelViewSet):
         user = self.request.user if self.request.user.is_authenticated else None
         serializer.save(post=post, user=user, is_approved=False) 
 
-class SearchAPIView(generics.ListAPIView):
+class SearchAPIView(LanguagePruningMixin, generics.ListAPIView):
     serializer_class = PostListSerializer
     pagination_class = BlogPagination
 
     def get_queryset(self):
         query = self.request.query_params.get('q', '')
         if query:
-            return Post.published.filter(
+            return self.prune_languages(Post.published.filter(
                 Q(title__icontains=query) |
                 Q(content__icontains=query) |
                 Q(excerpt__icontains=query)
-            ).distinct()
+            ).distinct().with_list_data())
         return Post.published.none()
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(CommentThreadMixin, generics.ListCreateAPIView):
     """
     View to list and create comments for a specific post.
     """
@@ -175,13 +307,28 @@ class CommentListCreateView(generics.ListCreateAPIView):
         user = self.request.user if self.request.user.is_authenticated else None
         serializer.save(post=post, user=user, is_approved=False)
 
-class PostFeedView(generics.ListAPIView):
+class PostFeedView(View):
     """
-    An RSS-like feed of the most recent posts.
+    RSS 2.0 or Atom feed of the most recent posts.
+
+    The document is rendered once per change and served from cache with
+    ETag and Last-Modified validators, so polling costs no queries.
+
+    Public on purpose: feed readers cannot send a JWT, and the feed only
+    lists published posts, which the post list already serves anonymously.
     """
-    queryset = Post.published.all()[:20] # Get 20 most recent
-    serializer_class = PostListSerializer 
-    # In a real app, you might want a specific FeedSerializer and a custom renderer
+    feed_format = 'rss'
+    # Feed readers poll constantly; keep them out of the request log
+    request_log_exempt = True
+
+    def get(self, request, *args, **kwargs):
+        feed = get_feed(self.feed_format, request)
+        response = get_conditional_response(request, etag=feed['etag'], last_modified=feed['last_modified'])
+        if response is None:
+            response = HttpResponse(feed['content'], content_type=feed['content_type'])
+        response['ETag'] = feed['etag']
+        response['Last-Modified'] = http_date(feed['last_modified'])
+        return response
 
 class BlogStatsView(generics.GenericAPIView):
     """
@@ -189,6 +336,7 @@ class BlogStatsView(generics.GenericAPIView):
     """
     permission_classes = [AllowAny]
 
+    @cache_response('posts', 'comments', 'categories', 'tags')
     def get(self, request, *args, **kwargs):
         stats = {
             'total_posts': Post.published.count(),
@@ -196,4 +344,13 @@ class BlogStatsView(generics.GenericAPIView):
             'total_categories': Category.objects.filter(is_active=True).count(),
             'total_tags': Tag.objects.count(),
         }
-        return Response(stats) 
\ No newline at end of file
+        return Response(stats)
+
+class ResponseCacheStatsView(generics.GenericAPIView):
+    """
+    Hit and miss counts of the public blog response cache.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_metrics())
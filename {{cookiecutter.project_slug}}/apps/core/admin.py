@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Category, Tag, AdminPreferences, RequestLog
+from django.utils import timezone
+from .models import Category, Tag, AdminPreferences, RequestLog, OutboundEmail
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin, GroupAdmin as BaseGroupAdmin
 
@@ -42,6 +43,8 @@ class CategoryAdmin(admin.ModelAdmin):
             'description': 'Organize posts into categories.',
             'include_in_dashboard': True,
         }
+        # Queries the generated API may run per request, including permission lookups
+        query_budget = {'list': 5, 'retrieve': 4}
         field_metadata = {
             'description': {'ui_component': 'textarea'},
         }
@@ -94,4 +97,37 @@ class RequestLogAdmin(admin.ModelAdmin):
             'category': 'Analytics',
             'description': 'View API request logs for analytics.',
             'include_in_dashboard': True,
-        }
\ No newline at end of file
+        }
+        # Queries the generated API may run per request, including permission lookups
+        query_budget = {'list': 4, 'retrieve': 3}
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    # Bodies may carry live links such as password reset tokens; they are hidden here, in the admin API and in exports
+    exclude = ('body', 'html_body')
+    readonly_fields = (
+        'subject', 'from_email', 'to', 'headers', 'attempts', 'last_error', 'created_at', 'sent_at',
+    )
+    actions = ['requeue']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Queue the selected emails again')
+    def requeue(self, request, queryset):
+        # Messages whose body was already purged have nothing left to send
+        queryset.exclude(status='sent').exclude(body='', html_body='').update(
+            status='queued', attempts=0, next_attempt_at=timezone.now(),
+        )
+
+    class Meta:
+        frontend_config = {
+            'icon': 'mail',
+            'category': 'Analytics',
+            'description': 'Monitor the outbound email queue.',
+            'include_in_dashboard': True,
+        }
+
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
-    verbose_name = 'Core' 
\ No newline at end of file
+    verbose_name = 'Core'
+
+    def ready(self):
+        import apps.core.signals
@@ -3,17 +3,19 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from rest_framework.response import Response
 from rest_framework import status
-from django_otp.plugins.otp_totp.models import TOTPDevice
+from .authentication import ClaimsRefreshToken
+from .throttling import PasswordVerificationMixin
+from .two_factor import has_confirmed_device
 
 class TwoFactorTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
     def validate(self, attrs):
         data = super().validate(attrs)
         
-        # Check if the user has a 2FA device
-        user = self.user
-        devices = TOTPDevice.objects.filter(user=user)
-        
-        if devices.exists() and devices.first().confirmed:
+        # Check if the user has a confirmed 2FA device; never from the cache,
+        # which may not have seen a device confirmed in another process
+        if has_confirmed_device(self.user):
             # 2FA is enabled, so don't return tokens yet.
             # Instead, indicate that 2FA is required.
             data['is_2fa_enabled'] = True
@@ -25,7 +27,7 @@ class TwoFactorTokenObtainPairSerializer(TokenObtainPairSerializer):
         
         return data
 
-class TwoFactorTokenObtainPairView(TokenObtainPairView):
+class TwoFactorTokenObtainPairView(PasswordVerificationMixin, TokenObtainPairView):
     """
     A custom token obtain pair view that handles 2FA.
     """
@@ -0,0 +1,143 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .permission_cache import get_permissions_version, get_user_permissions, has_cached_perm
+from .utils import cache_is_shared
+
+PERMISSIONS_VERSION_CLAIM = 'perms_version'
+USER_KEY_PREFIX = 'auth:user'
+
+
+def get_user_cache_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def user_cache_key(user_id):
+    return f'{USER_KEY_PREFIX}:{user_id}'
+
+
+def get_cached_user(user_id):
+    """The user row for ``user_id``, cached briefly between requests."""
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        cache.set(key, user, get_user_cache_timeout())
+    return user
+
+
+def add_user_claims(token, user):
+    """Stamps ``token`` with what StatelessJWTAuthentication needs to skip the user query."""
+    token['username'] = user.get_username()
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    token[PERMISSIONS_VERSION_CLAIM] = get_permissions_version()
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying the user claims; access tokens derived from it inherit them."""
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+
+class ClaimsUser(TokenUser):
+    """
+    A user built from the claims of a validated token.
+
+    Staff flags come from the claims and model permissions from the
+    permission cache. Any other attribute, groups and object permissions
+    load the full user on first access.
+    """
+
+    @cached_property
+    def full_user(self):
+        return get_cached_user(self.id)
+
+    @property
+    def groups(self):
+        return self.full_user.groups
+
+    @property
+    def user_permissions(self):
+        return self.full_user.user_permissions
+
+    def get_group_permissions(self, obj=None):
+        return self.full_user.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.full_user.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        if obj is not None:
+            return self.full_user.has_perm(perm, obj)
+        return has_cached_perm(self, perm)
+
+    def has_perms(self, perm_list, obj=None):
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, app_label):
+        if self.is_superuser:
+            return True
+        return any(perm.startswith(f'{app_label}.') for perm in get_user_permissions(self))
+
+    def __getattr__(self, attr):
+        # Private names and the token itself are never claims; this also keeps copy and pickle working
+        if attr.startswith('_') or attr == 'token':
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.full_user, attr)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without a user query on the hot path.
+
+    Tokens issued by ClaimsRefreshToken carry the staff flags and the
+    permissions version they were issued under. While that version is current
+    the request user is a ClaimsUser built from the claims. Tokens without the
+    claims, or issued before a grant or user change, fall back to the cached
+    user row, which is also checked for ``is_active`` on both paths.
+
+    Versions and user rows are only trusted from a cache shared by every
+    process, which sees the changes all of them make. With a per process
+    cache this behaves like JWTAuthentication and loads the user each time.
+    """
+
+    def get_user(self, validated_token):
+        if not cache_is_shared():
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = get_cached_user(user_id)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if validated_token.get(PERMISSIONS_VERSION_CLAIM) == get_permissions_version():
+            claims_user = ClaimsUser(validated_token)
+            claims_user.full_user = user
+            return claims_user
+        return user
+
+
+def with_stateless_jwt(authentication_classes):
+    """``authentication_classes`` with JWTAuthentication swapped for StatelessJWTAuthentication."""
+    return [StatelessJWTAuthentication if cls is JWTAuthentication else cls for cls in authentication_classes]
@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.core.cache import cache
+from modeltranslation.utils import get_language
+
+from .models import Category
+
+CACHE_KEY = 'category_tree'
+SERIALIZED_CACHE_KEY = 'category_tree_data'
+
+
+class CategoryTree:
+    """
+    In-memory view of the active category hierarchy.
+
+    The whole tree is loaded with a single query and cached until a category
+    changes, so children, subtree and ancestor lookups cost no queries.
+    Categories whose parent is missing or inactive are treated as roots, and
+    parent links that would form a cycle are ignored.
+    """
+    def __init__(self, categories):
+        self._nodes = {category.pk: category for category in categories}
+        self._children = {}
+        self._roots = []
+
+        candidates = {}
+        for category in categories:
+            if category.parent_id in self._nodes:
+                candidates.setdefault(category.parent_id, []).append(category)
+            else:
+                self._roots.append(category)
+
+        self._root_ids = {category.pk for category in self._roots}
+
+        # Only keep edges reachable from a root so the tree can never loop.
+        stack = list(self._roots)
+        while stack:
+            node = stack.pop()
+            children = candidates.get(node.pk, [])
+            self._children[node.pk] = children
+            stack.extend(children)
+
+    @classmethod
+    def load(cls):
+        """Build a tree from the database with a single query."""
+        return cls(list(Category.objects.filter(is_active=True).order_by('name')))
+
+    @classmethod
+    def get(cls):
+        """Return the cached tree, building it on a cache miss."""
+        tree = cache.get(CACHE_KEY)
+        if tree is None:
+            tree = cls.load()
+            cache.set(CACHE_KEY, tree, None)
+        return tree
+
+    @classmethod
+    def get_serialized(cls, builder):
+        """
+        Return the cached output of ``builder(tree)`` for the active language.
+        Translated fields make the serialized form language dependent.
+        """
+        key = f'{SERIALIZED_CACHE_KEY}_{get_language()}'
+        data = cache.get(key)
+        if data is None:
+            data = builder(cls.get())
+            cache.set(key, data, None)
+        return data
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the cached tree and every cached serialization of it."""
+        keys = [CACHE_KEY] + [f'{SERIALIZED_CACHE_KEY}_{code}' for code, _ in settings.LANGUAGES]
+        cache.delete_many(keys)
+
+    @property
+    def roots(self):
+        return self._roots
+
+    def get_node(self, pk):
+        return self._nodes.get(pk)
+
+    def children(self, pk):
+        return self._children.get(pk, [])
+
+    def descendants(self, pk):
+        """All categories below ``pk`` in depth-first order."""
+        result = []
+        stack = list(reversed(self.children(pk)))
+        while stack:
+            node = stack.pop()
+            result.append(node)
+            stack.extend(reversed(self.children(node.pk)))
+        return result
+
+    def ancestors(self, pk):
+        """The chain of categories from the root down to the parent of ``pk``."""
+        result = []
+        seen = {pk}
+        node = self._nodes.get(pk)
+        while node is not None and node.pk not in self._root_ids:
+            node = self._nodes.get(node.parent_id)
+            if node is None or node.pk in seen:
+                break
+            seen.add(node.pk)
+            result.append(node)
+        result.reverse()
+        return result
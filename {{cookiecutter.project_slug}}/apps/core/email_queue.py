@@ -0,0 +1,179 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 60,
+    'MAX_RETRY_DELAY': 6 * 60 * 60,
+    'LEASE': 10 * 60,
+    'FAILED_BODY_RETENTION': 3 * 24 * 60 * 60,
+    'BACKEND': None,
+}
+
+
+def get_queue_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'EMAIL_QUEUE', {})}
+
+
+def queue_mail(subject, message, from_email=None, recipient_list=(), html_message=None, headers=None):
+    """
+    Queues an email for the send_queued_mail worker. Takes the arguments of
+    send_mail, for requests and signals that must not wait on the mail server.
+    Queued inside the caller's transaction, so a rolled back request sends nothing.
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+        headers=headers or {},
+    )
+
+
+def queue_messages(messages, batch_size=1000):
+    """Queues EmailMessage instances with bulk inserts. Returns the number queued."""
+    emails = []
+    for message in messages:
+        html_body = next(
+            (content for content, mimetype in getattr(message, 'alternatives', ()) if mimetype == 'text/html'), ''
+        )
+        emails.append(OutboundEmail(
+            subject=message.subject,
+            body=message.body,
+            html_body=html_body,
+            from_email=message.from_email,
+            to=list(message.to),
+            headers=dict(message.extra_headers),
+        ))
+    OutboundEmail.objects.bulk_create(emails, batch_size=batch_size)
+    return len(emails)
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.to, headers=email.headers, connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def get_retry_delay(attempts, conf=None):
+    """Seconds before retry number ``attempts``: exponential backoff, capped."""
+    conf = conf or get_queue_settings()
+    return min(conf['RETRY_BACKOFF'] * 2 ** (attempts - 1), conf['MAX_RETRY_DELAY'])
+
+
+def claim_batch(batch_size, now, lease):
+    """
+    Reserves up to ``batch_size`` due messages for this worker by moving them
+    to 'sending' with a lease. Messages whose lease ran out, left behind by
+    a worker that died mid-batch, are due again.
+    """
+    with transaction.atomic():
+        due = (
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=('queued', 'sending'), next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+        )
+        ids = list(due.values_list('pk', flat=True)[:batch_size])
+        OutboundEmail.objects.filter(pk__in=ids).update(status='sending', next_attempt_at=now + timedelta(seconds=lease))
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def _record_failure(email, error, now, conf):
+    attempts = email.attempts + 1
+    gave_up = attempts >= conf['MAX_ATTEMPTS']
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status='failed' if gave_up else 'queued',
+        attempts=attempts,
+        next_attempt_at=now + timedelta(seconds=0 if gave_up else get_retry_delay(attempts, conf)),
+        last_error=f'{type(error).__name__}: {error}',
+    )
+    log = logger.error if gave_up else logger.warning
+    log('Sending email %s failed (attempt %s): %s', email.pk, attempts, error)
+
+
+def purge_failed_bodies(now, retention):
+    """
+    Blanks the bodies of messages that gave up more than ``retention`` seconds
+    ago. Like sent ones, they may carry live links such as password reset
+    tokens, and are only kept this long to be queued again from the admin.
+    """
+    return (
+        OutboundEmail.objects.filter(status='failed', next_attempt_at__lte=now - timedelta(seconds=retention))
+        .exclude(body='', html_body='')
+        .update(body='', html_body='')
+    )
+
+
+def _reconnect(connection):
+    try:
+        connection.close()
+        connection.open()
+    except Exception:
+        # The next send reports the error for its own message
+        logger.exception('Reopening the email connection failed')
+
+
+def send_queued_mail(batch_size=None, now=None):
+    """
+    Sends every due message in batches over a single backend connection.
+    Failed messages are queued again with exponential backoff until
+    MAX_ATTEMPTS is reached. The bodies of sent messages are blanked at once,
+    those of failed ones after FAILED_BODY_RETENTION seconds. Returns the
+    number of messages sent and failed.
+    """
+    conf = get_queue_settings()
+    batch_size = batch_size or conf['BATCH_SIZE']
+    sent = failed = 0
+
+    connection = get_connection(conf['BACKEND'])
+    try:
+        connection.open()
+    except Exception:
+        # Nothing was claimed yet; the messages stay due for the next run
+        logger.exception('Opening the email connection failed')
+        return sent, failed
+
+    try:
+        while True:
+            batch_now = now or timezone.now()
+            batch = claim_batch(batch_size, batch_now, conf['LEASE'])
+            if not batch:
+                break
+
+            delivered = []
+            for email in batch:
+                try:
+                    connection.send_messages([build_message(email, connection)])
+                except Exception as e:
+                    failed += 1
+                    _record_failure(email, e, batch_now, conf)
+                    _reconnect(connection)
+                else:
+                    delivered.append(email.pk)
+            OutboundEmail.objects.filter(pk__in=delivered).update(
+                status='sent', sent_at=timezone.now(), attempts=F('attempts') + 1, last_error='',
+                body='', html_body='',
+            )
+            sent += len(delivered)
+
+            if len(batch) < batch_size:
+                break
+    finally:
+        connection.close()
+    purge_failed_bodies(now or timezone.now(), conf['FAILED_BODY_RETENTION'])
+    return sent, failed
@@ -0,0 +1,215 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+_current_stats = contextvars.ContextVar('request_query_stats', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its budget allows."""
+
+
+def get_instrumentation_settings():
+    return getattr(settings, 'QUERY_INSTRUMENTATION', {})
+
+
+class RequestStats:
+    """
+    Query and timing figures for one request. Instances are installed as a
+    connection.execute_wrapper, so every query on every connection is seen.
+    """
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.view_name = None
+        self.view_query_count = None
+        self.query_budget = None
+        self._statements = Counter()
+        self._templates = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.query_count += 1
+            self._templates[sql] += 1
+            self._statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicate_count(self):
+        """Queries repeated with identical SQL and parameters."""
+        return sum(count - 1 for count in self._statements.values() if count > 1)
+
+    @property
+    def similar_count(self):
+        """Queries repeated with the same SQL but other parameters, typically N+1 lookups."""
+        return sum(count - 1 for count in self._templates.values() if count > 1)
+
+    @property
+    def over_budget(self):
+        return self.query_budget is not None and self.view_query_count > self.query_budget
+
+    def server_timing(self, total_time):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'dup;desc="{self.duplicate_count} duplicate, {self.similar_count} similar"',
+            f'serialize;dur={self.serializer_time * 1000:.1f}',
+            f'total;dur={total_time * 1000:.1f}',
+        ])
+
+
+def get_current_stats():
+    return _current_stats.get()
+
+
+@contextmanager
+def collect_request_stats(stats):
+    """Makes ``stats`` current and routes every database query through it."""
+    token = _current_stats.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class ViewMetrics:
+    """
+    Per-view aggregates of the request stats, kept in process memory so
+    recording them costs nothing per request. Each worker process reports
+    the requests it served.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, stats, total_time):
+        with self._lock:
+            metrics = self._views.setdefault(stats.view_name, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'db_time': 0.0,
+                'serializer_time': 0.0,
+                'total_time': 0.0,
+                'duplicate_queries': 0,
+                'similar_queries': 0,
+                'query_budget': None,
+                'over_budget': 0,
+            })
+            metrics['requests'] += 1
+            metrics['queries'] += stats.query_count
+            metrics['max_queries'] = max(metrics['max_queries'], stats.query_count)
+            metrics['db_time'] += stats.db_time
+            metrics['serializer_time'] += stats.serializer_time
+            metrics['total_time'] += total_time
+            metrics['duplicate_queries'] += stats.duplicate_count
+            metrics['similar_queries'] += stats.similar_count
+            if stats.query_budget is not None:
+                metrics['query_budget'] = stats.query_budget
+                metrics['over_budget'] += int(stats.over_budget)
+
+    def snapshot(self):
+        """Per-view averages, slowest total database time first."""
+        with self._lock:
+            views = {name: dict(metrics) for name, metrics in self._views.items()}
+
+        report = []
+        for name, metrics in sorted(views.items(), key=lambda item: item[1]['db_time'], reverse=True):
+            requests = metrics['requests']
+            report.append({
+                'view': name,
+                'requests': requests,
+                'avg_queries': round(metrics['queries'] / requests, 2),
+                'max_queries': metrics['max_queries'],
+                'avg_db_ms': round(metrics['db_time'] * 1000 / requests, 2),
+                'avg_serializer_ms': round(metrics['serializer_time'] * 1000 / requests, 2),
+                'avg_total_ms': round(metrics['total_time'] * 1000 / requests, 2),
+                'duplicate_queries': metrics['duplicate_queries'],
+                'similar_queries': metrics['similar_queries'],
+                'query_budget': metrics['query_budget'],
+                'over_budget': metrics['over_budget'],
+            })
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_metrics = ViewMetrics()
+
+
+@contextmanager
+def serializer_timer():
+    stats = get_current_stats()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.serializer_time += time.perf_counter() - start
+
+
+class TimedSerializerMixin:
+    """Adds the time spent building ``serializer.data`` to the request stats."""
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class QueryBudgetMixin:
+    """
+    Checks how many queries a view ran against ``query_budget``, either a
+    number or a mapping of viewset action to number. Over-budget views are
+    logged, or raise QueryBudgetExceeded when STRICT_BUDGETS is enabled.
+    """
+    query_budget = None
+
+    def get_query_budget(self):
+        if isinstance(self.query_budget, dict):
+            return self.query_budget.get(getattr(self, 'action', None))
+        return self.query_budget
+
+    def initial(self, request, *args, **kwargs):
+        stats = get_current_stats()
+        self._query_count_start = stats.query_count if stats is not None else None
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        stats = get_current_stats()
+        start = getattr(self, '_query_count_start', None)
+        if stats is None or start is None:
+            return response
+
+        stats.view_query_count = stats.query_count - start
+        stats.query_budget = self.get_query_budget()
+        if stats.over_budget:
+            message = (
+                f'{self.__class__.__name__}.{getattr(self, "action", None) or request.method} ran '
+                f'{stats.view_query_count} queries, over its budget of {stats.query_budget}.'
+            )
+            if get_instrumentation_settings().get('STRICT_BUDGETS', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
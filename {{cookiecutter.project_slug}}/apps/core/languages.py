@@ -0,0 +1,61 @@
+from modeltranslation.manager import get_translatable_fields_for_model
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname, get_language, resolution_order
+from rest_framework.exceptions import ValidationError
+
+LANGUAGE_PARAM = 'lang'
+
+
+def get_requested_languages(request):
+    """
+    Languages asked for with ``?lang=de`` or ``?lang=de,fr``, in order, or
+    None without the parameter. Unknown codes are rejected.
+    """
+    value = request.query_params.get(LANGUAGE_PARAM)
+    if not value:
+        return None
+    languages = []
+    for code in value.split(','):
+        code = code.strip().lower()
+        if code and code not in languages:
+            languages.append(code)
+    unknown = [code for code in languages if code not in AVAILABLE_LANGUAGES]
+    if unknown:
+        raise ValidationError({
+            LANGUAGE_PARAM: f"Unknown language(s): {', '.join(unknown)}. Available: {', '.join(AVAILABLE_LANGUAGES)}.",
+        })
+    return languages or None
+
+
+def get_loaded_languages(languages=None):
+    """
+    The languages whose columns must be loaded to render ``languages``
+    (the active language by default): each one plus its fallbacks, since
+    translated accessors fall back to them on empty values.
+    """
+    loaded = []
+    for language in languages or [get_language()]:
+        for code in resolution_order(language):
+            if code not in loaded:
+                loaded.append(code)
+    return loaded
+
+
+def get_language_fields(model, languages):
+    """Names of the per-language fields of ``model`` for the given languages."""
+    return [
+        build_localized_fieldname(name, language)
+        for name in get_translatable_fields_for_model(model) or ()
+        for language in languages
+    ]
+
+
+def defer_other_languages(queryset, languages=None):
+    """
+    Defers the per-language columns a response in ``languages`` (the active
+    language by default) never reads. The untranslated original column is
+    left alone: modeltranslation rewrites it to the active language.
+    """
+    loaded = get_loaded_languages(languages)
+    unused = get_language_fields(queryset.model, [code for code in AVAILABLE_LANGUAGES if code not in loaded])
+    return queryset.defer(*unused) if unused else queryset
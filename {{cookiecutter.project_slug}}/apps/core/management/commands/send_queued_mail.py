@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.email_queue import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails in batches over a single connection, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Number of emails claimed per batch.')
+        parser.add_argument(
+            '--interval', type=int, default=None,
+            help='Keep running and check for due emails every INTERVAL seconds.',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            sent, failed = send_queued_mail(batch_size=options['batch_size'])
+            if sent or failed or not interval:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent} email(s), {failed} failed.'))
+            if not interval:
+                break
+            time.sleep(interval)
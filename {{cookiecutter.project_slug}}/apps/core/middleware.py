@@ -1,5 +1,8 @@
 import time
+from django.conf import settings
+from .instrumentation import RequestStats, collect_request_stats, get_instrumentation_settings, view_metrics
 from .models import RequestLog
+from .utils import get_client_ip
 
 class RequestLoggingMiddleware:
     def __init__(self, get_response):
@@ -10,23 +13,20 @@ class RequestLoggingMiddleware:
         
         response = self.get_response(request)
         
-        # Only log API requests, and exclude admin/schema paths
+        # Only log API requests, and exclude admin/schema paths and exempt views
         path = request.path_info
-        if path.startswith('/api/') and not path.startswith('/api/admin/') and not path.startswith('/api/schema/'):
+        exempt = getattr(request, '_request_log_exempt', False)
+        if path.startswith('/api/') and not path.startswith('/api/admin/') and not path.startswith('/api/schema/') and not exempt:
             end_time = time.time()
             response_time_ms = int((end_time - start_time) * 1000)
             
-            user = request.user if request.user.is_authenticated else None
+            # By id: stateless JWT users are not model instances
+            user_id = request.user.pk if request.user.is_authenticated else None
             
-            # Get IP address
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                ip_address = x_forwarded_for.split(',')[0]
-            else:
-                ip_address = request.META.get('REMOTE_ADDR')
+            ip_address = get_client_ip(request)
 
             RequestLog.objects.create(
-                user=user,
+                user_id=user_id,
                 ip_address=ip_address,
                 method=request.method,
                 path=path,
@@ -34,4 +34,38 @@ class RequestLoggingMiddleware:
                 response_time_ms=response_time_ms,
             )
             
-        return response 
\ No newline at end of file
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Views can opt out of logging, e.g. endpoints that are polled constantly
+        view_class = getattr(view_func, 'view_class', None)
+        request._request_log_exempt = getattr(view_class, 'request_log_exempt', False) 
+
+class QueryInstrumentationMiddleware:
+    """
+    Counts the queries, database time and serializer time of each request,
+    aggregates them per view and, in DEBUG or for staff users, reports them
+    in a Server-Timing header.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_instrumentation_settings().get('ENABLED', True):
+            return self.get_response(request)
+
+        stats = RequestStats()
+        start_time = time.perf_counter()
+        with collect_request_stats(stats):
+            response = self.get_response(request)
+        total_time = time.perf_counter() - start_time
+
+        match = request.resolver_match
+        if match is not None:
+            stats.view_name = match.view_name or match._func_path
+            view_metrics.record(stats, total_time)
+
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            response['Server-Timing'] = stats.server_timing(total_time)
+        return response
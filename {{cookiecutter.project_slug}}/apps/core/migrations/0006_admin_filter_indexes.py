@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_adminpreferences_requestlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='requestlog',
+            index=models.Index(fields=['-timestamp'], name='core_reqlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestlog',
+            index=models.Index(fields=['status_code', '-timestamp'], name='core_reqlog_status_ts_idx'),
+        ),
+    ]
@@ -1,8 +1,140 @@
+import hashlib
 import uuid
+from urllib.parse import urlencode
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Count, Max
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+from rest_framework.permissions import SAFE_METHODS
+
+from .languages import defer_other_languages, get_requested_languages
 
 class UUIDMixin(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     class Meta:
-        abstract = True 
\ No newline at end of file
+        abstract = True 
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified validators to list and retrieve responses.
+
+    Validators are derived from a single aggregate query (latest timestamp
+    and row count of the filtered queryset) and checked before anything is
+    serialized, so unchanged resources are answered with 304 Not Modified.
+    Views add further aggregates or tokens when their responses depend on
+    more than the rows themselves. Last-Modified is only sent where the
+    timestamp is the whole validator, a retrieve without extra aggregates
+    or tokens: a list does not move it when a row is deleted, nor a detail
+    when a counter is bumped with update(), so clients sending only
+    If-Modified-Since would get stale 304s.
+    """
+    conditional_timestamp_field = 'updated_at'
+
+    def get_conditional_queryset(self):
+        """The queryset validators are computed from, without list-only extras."""
+        return self.filter_queryset(self.get_queryset())
+
+    def get_conditional_aggregates(self):
+        """Extra aggregates whose values change the ETag."""
+        return {}
+
+    def get_conditional_tokens(self):
+        """Extra strings, e.g. cache versions, whose values change the ETag."""
+        return []
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(
+            request, self.get_conditional_queryset(),
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_conditional_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except (KeyError, TypeError, ValueError, ValidationError):
+            queryset = None
+        return self._conditional_response(
+            request, queryset,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+    def _conditional_response(self, request, queryset, get_response):
+        etag, last_modified = self._get_validators(request, queryset)
+        if etag is None:
+            return get_response()
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = get_response()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def _get_validators(self, request, queryset):
+        field_names = {field.name for field in queryset.model._meta.fields} if queryset is not None else ()
+        if self.conditional_timestamp_field not in field_names:
+            return None, None
+
+        extra_aggregates = self.get_conditional_aggregates()
+        aggregates = {
+            'last_modified': Max(self.conditional_timestamp_field),
+            'count': Count('pk'),
+            **extra_aggregates,
+        }
+        values = queryset.order_by().aggregate(**aggregates)
+        if getattr(self, 'action', None) == 'retrieve' and not values['count']:
+            # Let the view raise its usual 404
+            return None, None
+
+        parts = [
+            request.path,
+            urlencode(sorted(request.GET.lists()), doseq=True),
+            get_language() or '',
+            getattr(request, 'accepted_media_type', '') or '',
+        ]
+        parts += [f'{name}={values[name]}' for name in sorted(values)]
+        tokens = self.get_conditional_tokens()
+        parts += tokens
+        etag = quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+
+        last_modified = values['last_modified']
+        if getattr(self, 'action', None) != 'retrieve' or extra_aggregates or tokens or last_modified is None:
+            return etag, None
+        return etag, int(last_modified.timestamp())
+
+
+class LanguagePruningMixin:
+    """
+    Serves translated content in one language without loading the others.
+
+    ``?lang=`` overrides the language negotiated from Accept-Language. Read
+    querysets defer the per-language columns of every other language, apart
+    from the fallbacks the translated accessors may read.
+    """
+    requested_languages = None
+
+    def initial(self, request, *args, **kwargs):
+        self.requested_languages = get_requested_languages(request)
+        if self.requested_languages:
+            translation.activate(self.requested_languages[0])
+            request.LANGUAGE_CODE = self.requested_languages[0]
+        super().initial(request, *args, **kwargs)
+
+    def prune_languages(self, queryset):
+        """Defers unused language columns on reads; writes keep every column loaded."""
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return queryset
+        return defer_other_languages(queryset, self.requested_languages)
+
+    def get_queryset(self):
+        return self.prune_languages(super().get_queryset())
@@ -84,8 +84,51 @@ class RequestLog(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp'], name='core_reqlog_timestamp_idx'),
+            models.Index(fields=['status_code', '-timestamp'], name='core_reqlog_status_ts_idx'),
+        ]
         verbose_name = 'Request Log'
         verbose_name_plural = 'Request Logs'
 
     def __str__(self):
-        return f"{self.method} {self.path} {self.status_code} at {self.timestamp}" 
\ No newline at end of file
+        return f"{self.method} {self.path} {self.status_code} at {self.timestamp}" 
+
+class OutboundEmail(models.Model):
+    """
+    An email in the outbound queue. Requests and signals queue messages; the
+    send_queued_mail worker delivers them in batches over one connection and
+    retries failures with exponential backoff.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When a queued message is due, or when the lease of a message being sent runs out
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='core_email_queue_due_idx'),
+        ]
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+
@@ -0,0 +1,71 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .utils import cache_is_shared
+
+VERSION_KEY = 'permissions:version'
+ENTRY_KEY_PREFIX = 'permissions:user'
+
+# Attribute holding the resolved set on the user instance
+INSTANCE_ATTR = '_cached_permission_set'
+
+
+def get_cache_timeout():
+    return getattr(settings, 'PERMISSION_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_permissions_version():
+    """
+    Returns the current permissions version token. Like the response cache
+    tags it is random, so an evicted token can never revive stale entries.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_permissions_version():
+    """Invalidates every cached permission set after a group or permission change."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_user_permissions(user):
+    """
+    The ``app_label.codename`` permissions of ``user``, direct and through
+    groups, as a frozenset.
+
+    Resolved once per user instance. With a cache shared by every process it
+    is also kept between requests, so users reloaded on every request (JWT)
+    do not query their permissions again until a grant changes. A per
+    process cache would miss the version bumps of other processes and keep
+    revoked grants, so without one the set is resolved on every request.
+    """
+    if not user.is_active or user.is_anonymous:
+        return frozenset()
+    cached = getattr(user, INSTANCE_ATTR, None)
+    if cached is not None:
+        return cached
+
+    if not cache_is_shared():
+        permissions = frozenset(user.get_all_permissions())
+        setattr(user, INSTANCE_ATTR, permissions)
+        return permissions
+
+    key = f'{ENTRY_KEY_PREFIX}:{user.pk}:{get_permissions_version()}'
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = frozenset(user.get_all_permissions())
+        cache.set(key, permissions, get_cache_timeout())
+    setattr(user, INSTANCE_ATTR, permissions)
+    return permissions
+
+
+def has_cached_perm(user, perm):
+    """``user.has_perm(perm)`` for model level permissions, served from the cached set."""
+    if user.is_active and user.is_superuser:
+        return True
+    return perm in get_user_permissions(user)
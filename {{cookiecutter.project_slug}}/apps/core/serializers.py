@@ -2,12 +2,11 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext_lazy as _
 from django_otp.plugins.otp_totp.models import TOTPDevice
-import qrcode
-import qrcode.image.svg
-from io import BytesIO
 import time
 import logging
 
+from .two_factor import get_enrollment_device, is_2fa_enabled, render_qr_code
+
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
@@ -21,7 +20,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ('email', 'is_2fa_enabled')
 
     def get_is_2fa_enabled(self, user):
-        return TOTPDevice.objects.filter(user=user, confirmed=True).exists()
+        return is_2fa_enabled(user)
 
 class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True, write_only=True)
@@ -59,21 +58,10 @@ class TwoFactorEnableSerializer(serializers.Serializer):
     Serializer for enabling 2FA. Generates a QR code.
     """
     def to_representation(self, instance):
-        user = self.context['request'].user
-        # Delete any unconfirmed devices for this user to ensure a fresh start
-        TOTPDevice.objects.filter(user=user, confirmed=False).delete()
-        
-        device, _ = TOTPDevice.objects.get_or_create(user=user, name='default', confirmed=False)
-        
-        # Generate QR code
-        uri = device.config_url
-        img = qrcode.make(uri, image_factory=qrcode.image.svg.SvgImage)
-        stream = BytesIO()
-        img.save(stream)
-
+        device = get_enrollment_device(self.context['request'].user)
         return {
             'secret_key': device.key,
-            'qr_code': stream.getvalue().decode('utf-8')
+            'qr_code': render_qr_code(device).decode('utf-8')
         }
 
 class TwoFactorVerifySerializer(serializers.Serializer):
@@ -98,6 +86,8 @@ class TwoFactorVerifySerializer(serializers.Serializer):
 
         device.confirmed = True
         device.save()
+        # The confirmed device replaces any earlier one
+        TOTPDevice.objects.filter(user=user).exclude(pk=device.pk).delete()
         return value
 
 class TwoFactorDisableSerializer(serializers.Serializer):
@@ -0,0 +1,58 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from django_otp.plugins.otp_totp.models import TOTPDevice
+from .models import Category
+from .category_tree import CategoryTree
+from .authentication import user_cache_key
+from .permission_cache import bump_permissions_version
+from .two_factor import invalidate_qr_code, refresh_2fa_status
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def clear_category_tree_cache(sender, instance, **kwargs):
+    """
+    Clear the cached category tree when a category is saved or deleted.
+    """
+    CategoryTree.invalidate()
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def clear_permission_cache_on_grant(sender, action, **kwargs):
+    """
+    Clear cached permission sets when users, groups and permissions are linked or unlinked.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_permissions_version()
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def clear_permission_cache_on_delete(sender, instance, **kwargs):
+    """
+    Clear cached permission sets when a group or permission disappears with its grants.
+    """
+    bump_permissions_version()
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def clear_user_auth_cache(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop the cached user row and, unless only bookkeeping fields such as
+    last_login changed, invalidate the claims of issued tokens.
+    """
+    cache.delete(user_cache_key(instance.pk))
+    if update_fields is None or set(update_fields) & {'is_active', 'is_staff', 'is_superuser'}:
+        bump_permissions_version()
+
+@receiver(post_save, sender=TOTPDevice)
+@receiver(post_delete, sender=TOTPDevice)
+def clear_2fa_status_cache(sender, instance, **kwargs):
+    """
+    Rewrite the cached 2FA status when a device is created, confirmed or deleted,
+    and clear the cached QR code of a device that is no longer pending.
+    """
+    refresh_2fa_status(instance.user_id)
+    if instance.confirmed or kwargs.get('signal') is post_delete:
+        invalidate_qr_code(instance)
@@ -1,14 +1,35 @@
+from django.conf import settings
 from django.test import TestCase, override_settings
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.core import mail
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
+from apps.core import throttling
+from apps.core.email_queue import queue_mail, send_queued_mail
+from apps.core.models import OutboundEmail
 from rest_framework import status
 from django.core.signing import Signer
+import tempfile
+import threading
 import time
+from datetime import timedelta
+from unittest import mock
 import pyotp
 import urllib.parse
 
+# A cache every process sees, as Redis is in production; the local memory
+# cache of the test settings is private to one process
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='shared-cache-'),
+    }
+}
+
 class AuthAPITests(APITestCase):
     """
     Tests for the authentication, password reset, and 2FA API endpoints.
@@ -17,6 +38,7 @@ class AuthAPITests(APITestCase):
         """
         Set up a test user for authentication-required endpoints.
         """
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword123')
         self.password_reset_url = reverse('password_reset_request')
         self.password_reset_confirm_url = reverse('password_reset_confirm')
@@ -40,7 +62,9 @@ class AuthAPITests(APITestCase):
         """
         response = self.client.post(self.password_reset_url, {'email': 'test@example.com'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        # Check that one email has been sent.
+        # The email is queued and sent by the worker
+        self.assertEqual(len(mail.outbox), 0)
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, 'Password Reset Request')
 
@@ -111,4 +135,360 @@ class AuthAPITests(APITestCase):
 
         # Check that the device has been deleted
         from django_otp.plugins.otp_totp.models import TOTPDevice
-        self.assertFalse(TOTPDevice.objects.filter(user=self.user).exists()) 
\ No newline at end of file
+        self.assertFalse(TOTPDevice.objects.filter(user=self.user).exists())
+
+    def test_2fa_enrollment_reuses_pending_device(self):
+        """
+        Ensure reloading the enrollment page keeps the device and serves the cached QR code.
+        """
+        from django_otp.plugins.otp_totp.models import TOTPDevice
+        self.client.force_authenticate(user=self.user)
+        first = self.client.get(self.two_fa_enable_url)
+        with mock.patch('qrcode.QRCode.make_image') as make_image:
+            second = self.client.get(self.two_fa_enable_url)
+        make_image.assert_not_called()
+        self.assertEqual(first.data['secret_key'], second.data['secret_key'])
+        self.assertEqual(first.data['qr_code'], second.data['qr_code'])
+        self.assertEqual(TOTPDevice.objects.filter(user=self.user).count(), 1)
+
+        png_url = reverse('2fa_qr_code', kwargs={'image_format': 'png'})
+        self.assertEqual(first.data['qr_code_urls']['png'], f'http://testserver{png_url}')
+        response = self.client.get(png_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+        self.assertIn('private', response['Cache-Control'])
+        response = self.client.get(png_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        svg = self.client.get(reverse('2fa_qr_code', kwargs={'image_format': 'svg'}))
+        self.assertEqual(svg.content.decode(), first.data['qr_code'])
+        self.assertEqual(self.client.get(reverse('2fa_qr_code', kwargs={'image_format': 'gif'})).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_confirmed_device_survives_re_enrollment(self):
+        """
+        Ensure starting a new enrollment keeps 2FA active until the new device is confirmed.
+        """
+        from django_otp.plugins.otp_totp.models import TOTPDevice
+        self.test_2fa_enable_and_verify()
+        old_device = TOTPDevice.objects.get(user=self.user)
+
+        self.client.get(self.two_fa_enable_url)
+        self.assertTrue(TOTPDevice.objects.filter(pk=old_device.pk, confirmed=True).exists())
+        new_device = TOTPDevice.objects.get(user=self.user, confirmed=False)
+
+        secret = urllib.parse.parse_qs(urllib.parse.urlparse(new_device.config_url).query)['secret'][0]
+        response = self.client.post(self.two_fa_verify_url, {'otp': pyotp.TOTP(secret).now()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(TOTPDevice.objects.filter(user=self.user).values_list('pk', 'confirmed')), [(new_device.pk, True)])
+
+    def test_2fa_status_is_cached(self):
+        """
+        Ensure profile reads only query the OTP tables after a device change, while logins always check them.
+        """
+        profile_url = reverse('user-profile')
+        self.client.force_authenticate(user=self.user)
+        self.assertFalse(self.client.get(profile_url).data['is_2fa_enabled'])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(self.client.get(profile_url).data['is_2fa_enabled'])
+        self.assertFalse([query for query in queries if 'otp_totp' in query['sql']])
+
+        self.test_2fa_enable_and_verify()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.client.get(profile_url).data['is_2fa_enabled'])
+        self.assertFalse([query for query in queries if 'otp_totp' in query['sql']])
+        response = self.client.post(self.token_obtain_url, {'username': 'testuser', 'password': 'testpassword123'}, format='json')
+        self.assertTrue(response.data['is_2fa_enabled'])
+        self.assertNotIn('access', response.data)
+
+        self.client.post(self.two_fa_disable_url)
+        self.assertFalse(self.client.get(profile_url).data['is_2fa_enabled'])
+
+    def test_login_does_not_trust_a_stale_2fa_status(self):
+        """
+        Ensure a device confirmed in another process is enforced at login even while this process caches no 2FA.
+        """
+        from django_otp.plugins.otp_totp.models import TOTPDevice
+        self.client.force_authenticate(user=self.user)
+        self.assertFalse(self.client.get(reverse('user-profile')).data['is_2fa_enabled'])
+        # Another process confirms a device; its signal never reaches this process's cache
+        with mock.patch('apps.core.signals.refresh_2fa_status'):
+            TOTPDevice.objects.create(user=self.user, name='default', confirmed=True)
+        self.client.force_authenticate(user=None)
+
+        response = self.client.post(self.token_obtain_url, {'username': 'testuser', 'password': 'testpassword123'}, format='json')
+        self.assertTrue(response.data['is_2fa_enabled'])
+        self.assertNotIn('access', response.data)
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class StatelessJWTAuthenticationTests(APITestCase):
+    """
+    Tests that admin API requests authenticate from token claims without loading the user.
+    """
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name='Editors')
+        self.group.permissions.add(Permission.objects.get(codename='view_category'))
+        self.user = User.objects.create_user(
+            username='editor', email='editor@example.com', password='testpassword123', is_staff=True
+        )
+        self.user.groups.add(self.group)
+        self.url = reverse('admin_api:category-list')
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'editor', 'password': 'testpassword123'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def _user_queries(self, queries):
+        return [query['sql'] for query in queries if 'FROM "auth_user"' in query['sql'] or '"auth_permission"' in query['sql']]
+
+    def test_requests_skip_the_user_query(self):
+        """
+        Ensure repeated requests are authorized from the claims and the permission cache.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._user_queries(queries), [])
+
+    def test_full_user_is_loaded_on_demand(self):
+        """
+        Ensure attributes outside the claims come from the user row.
+        """
+        response = self.client.get(reverse('admin_api:admin-user-info'))
+        self.assertEqual(response.data['email'], 'editor@example.com')
+        self.assertEqual(response.data['groups'], ['Editors'])
+        self.assertEqual(response.data['permissions'], ['core.view_category'])
+
+    def test_user_changes_invalidate_the_claims(self):
+        """
+        Ensure revoking staff status takes effect on tokens issued before.
+        """
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_changes_made_by_another_process_invalidate_the_claims(self):
+        """
+        Ensure revoking staff status in another process takes effect on tokens issued before.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        # The other process has its own connection to the shared cache
+        other_process_cache = caches.create_connection('default')
+        with mock.patch('apps.core.permission_cache.cache', other_process_cache), \
+                mock.patch('apps.core.signals.cache', other_process_cache):
+            self.user.is_staff = False
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_inactive_users_are_rejected_while_the_claims_are_current(self):
+        """
+        Ensure a deactivated user is rejected even when the permissions version still matches the token.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with mock.patch('apps.core.signals.bump_permissions_version'):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_loads_the_user(self):
+        """
+        Ensure the claims are not trusted when the cache is private to the process.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.assertTrue(any('FROM "auth_user"' in sql for sql in self._user_queries(queries)))
+
+
+@override_settings(AUTH_THROTTLE={'RATES': {'auth_ip': '5/min', 'auth_username': '3/min'}, 'HASHING_WAIT': 0})
+class AuthThrottleTests(APITestCase):
+    """
+    Tests for rate limiting and bounding password checks on the auth endpoints.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.url = reverse('token_obtain_pair')
+
+    def _login(self, username='testuser', password='wrong', **extra):
+        return self.client.post(self.url, {'username': username, 'password': password}, format='json', **extra)
+
+    def test_username_limit_rejects_before_hashing(self):
+        """
+        Ensure attempts over the per-account limit are rejected without checking the password.
+        """
+        with mock.patch.object(User, 'check_password', autospec=True, return_value=False) as check_password:
+            for _ in range(3):
+                self.assertEqual(self._login().status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self._login(username='TestUser ')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(check_password.call_count, 3)
+
+        # Other accounts are only bound by the per-IP limit
+        self.assertEqual(self._login(username='other').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ip_limit_spans_usernames(self):
+        """
+        Ensure spreading attempts over many usernames still hits the per-IP limit.
+        """
+        for i in range(5):
+            self.assertEqual(self._login(username=f'user{i}').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._login(username='user5').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(self.url, {'username': 'x'}, format='json', REMOTE_ADDR='10.0.0.2')
+        self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_ip_limit_ignores_forwarded_for_written_by_the_client(self):
+        """
+        Ensure varying X-Forwarded-For does not escape the per-IP limit, unless a trusted proxy added the entry.
+        """
+        for i in range(5):
+            self._login(username=f'user{i}', HTTP_X_FORWARDED_FOR=f'192.0.2.{i}')
+        response = self._login(username='user5', HTTP_X_FORWARDED_FOR='192.0.2.5')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            # The proxy appends the address it saw; anything before it is the client's claim
+            response = self._login(username='user6', HTTP_X_FORWARDED_FOR='192.0.2.5, 198.51.100.7')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_previous_window_still_counts(self):
+        """
+        Ensure attempts late in one window count towards the start of the next.
+        """
+        with mock.patch.object(throttling.SlidingWindowRateThrottle, 'timer', return_value=59.0):
+            for _ in range(3):
+                self._login()
+        with mock.patch.object(throttling.SlidingWindowRateThrottle, 'timer', return_value=61.0):
+            self.assertEqual(self._login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        with mock.patch.object(throttling.SlidingWindowRateThrottle, 'timer', return_value=119.0):
+            self.assertEqual(self._login(password='testpassword123').status_code, status.HTTP_200_OK)
+
+    def test_hashing_gate_bounds_concurrent_checks(self):
+        """
+        Ensure requests are turned away while every hashing slot is busy, and slots are released.
+        """
+        gate = threading.BoundedSemaphore(1)
+        with mock.patch.object(throttling, '_hashing_gate', gate):
+            gate.acquire()
+            self.assertEqual(self._login(password='testpassword123').status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            gate.release()
+            self.assertEqual(self._login(password='testpassword123').status_code, status.HTTP_200_OK)
+            self.assertTrue(gate.acquire(blocking=False))
+
+
+class EmailQueueTests(TestCase):
+    """
+    Tests for the outbound email queue and its worker.
+    """
+    def test_batches_share_one_connection(self):
+        """
+        Ensure queued emails are sent in batches over a single connection.
+        """
+        for i in range(5):
+            queue_mail(f'Subject {i}', 'Body', None, [f'user{i}@example.com'], html_message='<p>Body</p>')
+        self.assertEqual(len(mail.outbox), 0)
+
+        with mock.patch('apps.core.email_queue.get_connection', wraps=mail.get_connection) as get_connection:
+            self.assertEqual(send_queued_mail(batch_size=2), (5, 0))
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertEqual(OutboundEmail.objects.filter(status='sent', attempts=1).count(), 5)
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+    def test_failures_are_retried_with_backoff(self):
+        """
+        Ensure a failed send is retried later, with growing delays, until it gives up.
+        """
+        email = queue_mail('Subject', 'Body', None, ['user@example.com'])
+        now = timezone.now()
+        failing = mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('down'))
+        with failing, self.assertLogs('apps.core.email_queue', level='WARNING'):
+            self.assertEqual(send_queued_mail(now=now), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('queued', 1))
+            self.assertEqual(email.next_attempt_at, now + timedelta(seconds=60))
+            self.assertIn('down', email.last_error)
+
+            # Not due yet
+            self.assertEqual(send_queued_mail(now=now + timedelta(seconds=30)), (0, 0))
+            send_queued_mail(now=now + timedelta(seconds=60))
+            email.refresh_from_db()
+            self.assertEqual(email.next_attempt_at, now + timedelta(seconds=180))
+
+        self.assertEqual(send_queued_mail(now=now + timedelta(seconds=180)), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.last_error), ('sent', ''))
+
+    @override_settings(EMAIL_QUEUE={'MAX_ATTEMPTS': 2, 'RETRY_BACKOFF': 0})
+    def test_gives_up_after_max_attempts(self):
+        """
+        Ensure an email that keeps failing is marked failed.
+        """
+        email = queue_mail('Subject', 'Body', None, ['user@example.com'])
+        failing = mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('down'))
+        with failing, self.assertLogs('apps.core.email_queue', level='WARNING') as logs:
+            send_queued_mail()
+            send_queued_mail()
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING', 'ERROR'])
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+    @override_settings(EMAIL_QUEUE={'MAX_ATTEMPTS': 1, 'FAILED_BODY_RETENTION': 60})
+    def test_bodies_are_not_kept(self):
+        """
+        Ensure sent emails lose their body at once and failed ones after the retention period.
+        """
+        sent = queue_mail('Reset', 'https://example.com/reset/token', None, ['user@example.com'], html_message='<p>token</p>')
+        failed = queue_mail('Reset', 'https://example.com/reset/token', None, ['user@example.com'])
+        now = timezone.now()
+        OutboundEmail.objects.filter(pk=failed.pk).update(next_attempt_at=now + timedelta(seconds=1))
+        send_queued_mail(now=now)
+        sent.refresh_from_db()
+        self.assertEqual((sent.status, sent.body, sent.html_body), ('sent', '', ''))
+        self.assertIn('reset/token', mail.outbox[0].body)
+
+        failing = mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('down'))
+        with failing, self.assertLogs('apps.core.email_queue', level='ERROR'):
+            send_queued_mail(now=now + timedelta(seconds=1))
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.body), ('failed', 'https://example.com/reset/token'))
+
+        send_queued_mail(now=now + timedelta(seconds=61))
+        failed.refresh_from_db()
+        self.assertEqual(failed.body, '')
+
+    def test_bodies_are_hidden_from_the_admin_api(self):
+        """
+        Ensure the generated admin API and its exports leave out email bodies.
+        """
+        queue_mail('Reset', 'https://example.com/reset/token', None, ['user@example.com'], html_message='<p>token</p>')
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser(username='admin', email='admin@example.com', password='testpassword123'))
+        detail = client.get(reverse('admin_api:outboundemail-detail', kwargs={'pk': OutboundEmail.objects.get().pk}))
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
+        self.assertNotIn('body', detail.json())
+        self.assertNotIn('html_body', detail.json())
+        export = client.get(reverse('admin_api:outboundemail-export'), {'format': 'csv'})
+        self.assertNotIn('reset/token', export.content.decode())
+        self.assertNotIn('body', client.get(reverse('admin_api:outboundemail-config')).json()['fields'])
+
+    def test_expired_leases_are_reclaimed(self):
+        """
+        Ensure emails claimed by a worker that died are sent once the lease runs out.
+        """
+        now = timezone.now()
+        queue_mail('Subject', 'Body', None, ['user@example.com'])
+        OutboundEmail.objects.update(status='sending', next_attempt_at=now + timedelta(minutes=10))
+        self.assertEqual(send_queued_mail(now=now), (0, 0))
+        self.assertEqual(send_queued_mail(now=now + timedelta(minutes=10)), (1, 0))
+
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import SimpleRateThrottle
+
+DEFAULT_RATES = {
+    'auth_ip': '30/min',
+    'auth_username': '10/min',
+}
+
+
+def get_auth_throttle_settings():
+    return getattr(settings, 'AUTH_THROTTLE', {})
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Rate limit estimated over a sliding window from two fixed-window counters.
+
+    The count of the previous window is weighted by how much of it still
+    overlaps the sliding window. Counters are bumped with ``cache.incr``, so
+    concurrent attempts cannot slip past the limit, and every attempt counts,
+    including rejected ones.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def get_rate(self):
+        # Read per request rather than at import so settings overrides apply
+        rates = get_auth_throttle_settings().get('RATES', DEFAULT_RATES)
+        try:
+            return rates[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No throttle rate set for scope '{self.scope}'.")
+
+    def get_ident_value(self, request, view):
+        """The value requests are grouped by, or None to leave the request alone."""
+        raise NotImplementedError('.get_ident_value() must be overridden')
+
+    def get_cache_key(self, request, view):
+        value = self.get_ident_value(request, view)
+        if value is None:
+            return None
+        ident = hashlib.md5(str(value).encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        current_key = f'{self.key}:{window}'
+
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.current = self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr()
+            self.current = 1
+            self.cache.set(current_key, 1, self.duration * 2)
+        self.previous = self.cache.get(f'{self.key}:{window - 1}', 0)
+
+        weight = 1 - self.elapsed / self.duration
+        return self.previous * weight + self.current <= self.num_requests
+
+    def wait(self):
+        remaining = self.duration - self.elapsed
+        if self.current > self.num_requests or not self.previous:
+            return remaining
+        # Time until enough of the previous window has slid out
+        needed = self.duration * (1 - (self.num_requests - self.current) / self.previous) - self.elapsed
+        return max(0, min(needed, remaining))
+
+
+class AuthIPRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limits credential checks per client IP, as DRF identifies it: the
+    X-Forwarded-For entry added by the NUM_PROXIES trusted proxies, never
+    one the client wrote itself.
+    """
+    scope = 'auth_ip'
+
+    def get_ident_value(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthUsernameRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limits credential checks per account: the submitted username, or the
+    authenticated user for endpoints that re-check a password.
+    """
+    scope = 'auth_username'
+
+    def get_ident_value(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return f'username:{username.strip().lower()}'
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in attempts are being processed. Try again shortly.'
+    default_code = 'hashing_unavailable'
+
+
+_hashing_gate = None
+_hashing_gate_lock = threading.Lock()
+
+
+def get_hashing_gate():
+    """Process-wide semaphore bounding concurrent password hashing."""
+    global _hashing_gate
+    if _hashing_gate is None:
+        with _hashing_gate_lock:
+            if _hashing_gate is None:
+                slots = get_auth_throttle_settings().get('HASHING_CONCURRENCY') or os.cpu_count() or 1
+                _hashing_gate = threading.BoundedSemaphore(slots)
+    return _hashing_gate
+
+
+class PasswordVerificationMixin:
+    """
+    For views that hash passwords or check OTPs on POST.
+
+    Attempts are rate limited per IP and per account before any hashing
+    happens, then wait for one of a bounded number of hashing slots. When no
+    slot frees up within ``HASHING_WAIT`` seconds the request is rejected
+    instead of queueing more CPU work.
+    """
+    throttle_classes = [AuthIPRateThrottle, AuthUsernameRateThrottle]
+    _holds_hashing_slot = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == 'POST':
+            timeout = get_auth_throttle_settings().get('HASHING_WAIT', 2)
+            if not get_hashing_gate().acquire(timeout=timeout):
+                raise HashingUnavailable()
+            self._holds_hashing_slot = True
+
+    def dispatch(self, request, *args, **kwargs):
+        # Released here rather than in finalize_response, which uncaught exceptions skip
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._holds_hashing_slot:
+                self._holds_hashing_slot = False
+                get_hashing_gate().release()
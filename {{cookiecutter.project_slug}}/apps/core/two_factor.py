@@ -0,0 +1,104 @@
+import hashlib
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.core.cache import cache
+from django_otp.plugins.otp_totp.models import TOTPDevice
+
+CACHE_KEY_PREFIX = 'two_factor:enabled'
+QR_CACHE_KEY_PREFIX = 'two_factor:qr'
+
+# Content types of the formats QR codes are rendered in
+QR_CODE_FORMATS = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png',
+}
+
+
+def _cache_key(user_id):
+    return f'{CACHE_KEY_PREFIX}:{user_id}'
+
+
+def get_2fa_status_timeout():
+    return getattr(settings, 'TWO_FACTOR_STATUS_CACHE_TIMEOUT', 5 * 60)
+
+
+def has_confirmed_device(user):
+    """Whether ``user`` has a confirmed TOTP device, read from the database."""
+    return TOTPDevice.objects.filter(user_id=user.pk, confirmed=True).exists()
+
+
+def is_2fa_enabled(user):
+    """
+    Whether ``user`` has a confirmed TOTP device, for display such as profile
+    reads. Cached for TWO_FACTOR_STATUS_CACHE_TIMEOUT seconds and rewritten
+    whenever one of their devices changes. With a per process cache other
+    processes only see the change once their entry expires, so decisions
+    that enforce 2FA use has_confirmed_device instead.
+    """
+    key = _cache_key(user.pk)
+    enabled = cache.get(key)
+    if enabled is None:
+        enabled = has_confirmed_device(user)
+        # add() so a value read before a device change never replaces the one written after it
+        cache.add(key, enabled, get_2fa_status_timeout())
+    return enabled
+
+
+def refresh_2fa_status(user_id):
+    """Writes the current 2FA status of ``user_id`` to the cache after one of their devices changed."""
+    enabled = TOTPDevice.objects.filter(user_id=user_id, confirmed=True).exists()
+    cache.set(_cache_key(user_id), enabled, get_2fa_status_timeout())
+
+
+def get_enrollment_device(user):
+    """
+    The user's pending TOTP device, created on first use and reused until it
+    is confirmed, so reloading the enrollment page keeps the same secret.
+    A confirmed device stays active until its replacement is confirmed.
+    """
+    device = TOTPDevice.objects.filter(user=user, confirmed=False).order_by('pk').first()
+    if device is None:
+        device = TOTPDevice.objects.create(user=user, name='default', confirmed=False)
+    return device
+
+
+def get_qr_code_timeout():
+    return getattr(settings, 'TWO_FACTOR_QR_CACHE_TIMEOUT', 10 * 60)
+
+
+def get_qr_code_digest(device):
+    """Stable digest of the device secret, used for cache keys and ETags without exposing the key."""
+    return hashlib.sha256(device.key.encode()).hexdigest()[:32]
+
+
+def _qr_cache_key(device, image_format):
+    return f'{QR_CACHE_KEY_PREFIX}:{image_format}:{get_qr_code_digest(device)}'
+
+
+def render_qr_code(device, image_format='svg'):
+    """
+    The provisioning QR code of ``device`` as SVG or PNG bytes, rendered once
+    per device and format and cached for TWO_FACTOR_QR_CACHE_TIMEOUT seconds.
+    """
+    key = _qr_cache_key(device, image_format)
+    data = cache.get(key)
+    if data is None:
+        qr = qrcode.QRCode(box_size=4 if image_format == 'png' else 10, border=2)
+        qr.add_data(device.config_url)
+        qr.make(fit=True)
+        stream = BytesIO()
+        if image_format == 'svg':
+            # A single path is far smaller than one rect per module
+            qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(stream)
+        else:
+            qr.make_image().save(stream, format='PNG', optimize=True)
+        data = stream.getvalue()
+        cache.set(key, data, get_qr_code_timeout())
+    return data
+
+
+def invalidate_qr_code(device):
+    cache.delete_many([_qr_cache_key(device, image_format) for image_format in QR_CODE_FORMATS])
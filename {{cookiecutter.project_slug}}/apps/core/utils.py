@@ -0,0 +1,32 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.throttling import BaseThrottle
+
+
+def get_client_ip(request):
+    """
+    Returns the client IP address, preferring the first X-Forwarded-For entry.
+    """
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def get_trusted_client_ip(request):
+    """
+    Returns the client IP address as DRF throttles identify it: the
+    X-Forwarded-For entry added by the NUM_PROXIES trusted proxies, or
+    REMOTE_ADDR. Unlike ``get_client_ip``, the client cannot choose it.
+    """
+    return BaseThrottle().get_ident(request)
+
+
+def cache_is_shared(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Whether every process sees the same cache ``alias``. The local memory and
+    dummy backends are private to a process, so an invalidation made by one
+    worker never reaches the others.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
@@ -1,8 +1,9 @@
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
 from django.conf import settings
 from django.core.signing import Signer, BadSignature, SignatureExpired
+from django.http import Http404, HttpResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -18,14 +19,20 @@ from .serializers import (
 )
 import time
 from django_otp.plugins.otp_totp.models import TOTPDevice
-import qrcode
-import qrcode.image.svg
-from io import BytesIO
 from django.contrib.auth import get_user_model
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import default_token_generator
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import ClaimsRefreshToken
+from .email_queue import queue_mail
+from .throttling import PasswordVerificationMixin
+from .two_factor import (
+    QR_CODE_FORMATS,
+    get_enrollment_device,
+    get_qr_code_digest,
+    get_qr_code_timeout,
+    render_qr_code,
+)
 
 User = get_user_model()
 
@@ -39,7 +46,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
-class ChangePasswordView(generics.GenericAPIView):
+class ChangePasswordView(PasswordVerificationMixin, generics.GenericAPIView):
     """
     Change password for the current user.
     """
@@ -70,13 +77,12 @@ class PasswordResetRequestView(generics.GenericAPIView):
 
             # In a real application, you would build a full URL with the domain
             reset_link = f"/password-reset-confirm?token={token}" # Example link
-            # Send email
-            send_mail(
+            # Delivered by the send_queued_mail worker so a slow mail server never stalls the request
+            queue_mail(
                 'Password Reset Request',
                 f'Click the link to reset your password: {reset_link}',
                 settings.DEFAULT_FROM_EMAIL,
                 [email],
-                fail_silently=False,
             )
         except User.DoesNotExist:
             # We don't want to reveal if the user exists or not
@@ -88,7 +94,7 @@ class PasswordResetRequestView(generics.GenericAPIView):
         )
 
 
-class PasswordResetConfirmView(generics.GenericAPIView):
+class PasswordResetConfirmView(PasswordVerificationMixin, generics.GenericAPIView):
     serializer_class = PasswordResetConfirmSerializer
     permission_classes = [AllowAny]
 
@@ -124,27 +130,40 @@ class TwoFactorEnableView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        user = request.user
-        # Delete any existing devices for this user to ensure a fresh start
-        TOTPDevice.objects.filter(user=user).delete()
-        
-        # Create a new, unconfirmed device
-        device = TOTPDevice.objects.create(user=user, name='default', confirmed=False)
-        
-        # Get QR code
-        qr_url = device.config_url
-        img = qrcode.make(qr_url, image_factory=qrcode.image.svg.SvgImage)
-        
-        stream = BytesIO()
-        img.save(stream)
-
+        # Reuses the pending device, so reloading the page neither churns rows nor re-renders the QR code
+        device = get_enrollment_device(request.user)
         return Response({
-            "qr_code": stream.getvalue().decode(),
+            "qr_code": render_qr_code(device).decode(),
+            "qr_code_urls": {
+                image_format: request.build_absolute_uri(reverse('2fa_qr_code', kwargs={'image_format': image_format}))
+                for image_format in QR_CODE_FORMATS
+            },
             "secret_key": device.key
         }, status=status.HTTP_200_OK)
 
 
-class TwoFactorVerifyView(generics.GenericAPIView):
+class TwoFactorQRCodeView(generics.GenericAPIView):
+    """
+    The QR code of the pending 2FA device as an SVG or PNG image, cacheable by
+    the client until the device changes.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, image_format, *args, **kwargs):
+        if image_format not in QR_CODE_FORMATS:
+            raise Http404
+        device = get_enrollment_device(request.user)
+        etag = f'"{get_qr_code_digest(device)}-{image_format}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(render_qr_code(device, image_format), content_type=QR_CODE_FORMATS[image_format])
+        response['ETag'] = etag
+        # The image embeds the device secret: never store it in shared caches
+        patch_cache_control(response, private=True, max_age=get_qr_code_timeout())
+        return response
+
+
+class TwoFactorVerifyView(PasswordVerificationMixin, generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = TwoFactorVerifySerializer
 
@@ -164,7 +183,7 @@ class TwoFactorDisableView(generics.GenericAPIView):
         return Response({"message": "2FA has been disabled."}, status=status.HTTP_200_OK)
 
 
-class TwoFactorTokenVerifyView(generics.GenericAPIView):
+class TwoFactorTokenVerifyView(PasswordVerificationMixin, generics.GenericAPIView):
     """
     Takes username, password, and OTP to verify and return tokens.
     """
@@ -176,7 +195,7 @@ class TwoFactorTokenVerifyView(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
         
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         
         return Response({
             'refresh': str(refresh),
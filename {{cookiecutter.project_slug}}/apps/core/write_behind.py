@@ -0,0 +1,111 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Base of the buffers that keep hits in process memory and write them
+    behind in bulk.
+
+    Subclasses buffer entries through ``buffer`` and implement ``take``
+    (swap the buffered state out), ``restore`` (merge a state back) and
+    ``write`` (store a state, returning what ``flush`` reports), plus the
+    flush interval and threshold. A flush runs once the buffer holds enough
+    entries, or the interval has elapsed, either from the request that found
+    it due or from a background thread, so an idle worker does not sit on
+    its buffer. A flush that fails is logged and its state put back for the
+    next one; recording never raises.
+    """
+    # Named in log messages
+    description = 'buffered writes'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._flusher = None
+        atexit.register(self._flush_on_exit)
+
+    def get_flush_interval(self):
+        raise NotImplementedError
+
+    def get_flush_threshold(self):
+        raise NotImplementedError
+
+    def take(self):
+        raise NotImplementedError
+
+    def restore(self, state):
+        raise NotImplementedError
+
+    def write(self, state):
+        raise NotImplementedError
+
+    def buffer(self, add, count=1):
+        """Calls ``add`` under the lock to buffer ``count`` entries, then flushes if due."""
+        with self._lock:
+            add()
+            self._pending += count
+            flush_due = (
+                self._pending >= self.get_flush_threshold()
+                or time.monotonic() - self._last_flush >= self.get_flush_interval()
+            )
+        self.start_flusher()
+        if flush_due:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered entries. Returns what ``write`` returns, or 0 when nothing was written."""
+        with self._lock:
+            state = self.take()
+            pending, self._pending = self._pending, 0
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+        try:
+            return self.write(state)
+        except Exception:
+            logger.exception('Could not flush %s; keeping them for the next flush.', self.description)
+            with self._lock:
+                self.restore(state)
+                self._pending += pending
+            return 0
+
+    def start_flusher(self):
+        """Starts the background flush thread of this process, unless WRITE_BEHIND_FLUSH_THREAD is off."""
+        if not getattr(settings, 'WRITE_BEHIND_FLUSH_THREAD', True):
+            return
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so a forked worker starts its own
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(
+                    target=self._run_flusher, name=f'write-behind-{type(self).__name__}', daemon=True,
+                )
+                self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            interval = self.get_flush_interval()
+            time.sleep(max(interval - (time.monotonic() - self._last_flush), 1))
+            if self._pending and time.monotonic() - self._last_flush >= interval:
+                try:
+                    self.flush()
+                finally:
+                    # The thread's own connections; requests never share them
+                    connections.close_all()
+
+    def _flush_on_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Could not flush %s on exit.', self.description)
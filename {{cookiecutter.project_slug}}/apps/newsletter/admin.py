@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Subscriber, Campaign, Email
+from .models import Subscriber, Campaign, CampaignHourlyStats, Email
 
 @admin.register(Subscriber)
 class SubscriberAdmin(admin.ModelAdmin):
@@ -16,7 +16,9 @@ class SubscriberAdmin(admin.ModelAdmin):
 
 @admin.register(Campaign)
 class CampaignAdmin(admin.ModelAdmin):
-    list_display = ('name', 'subject', 'status', 'sent_at', 'created_at')
+    list_display = (
+        'name', 'subject', 'status', 'sent_count', 'open_count', 'unique_open_count', 'bounce_count', 'sent_at', 'created_at',
+    )
     list_filter = ('status',)
     search_fields = ('name', 'subject')
     class Meta:
@@ -27,10 +29,32 @@ class CampaignAdmin(admin.ModelAdmin):
             'include_in_dashboard': True,
         }
 
+@admin.register(CampaignHourlyStats)
+class CampaignHourlyStatsAdmin(admin.ModelAdmin):
+    list_display = ('campaign', 'hour', 'sent_count', 'open_count', 'unique_open_count', 'bounce_count')
+    list_filter = ('campaign',)
+    search_fields = ('campaign__name',)
+    readonly_fields = ('campaign', 'hour', 'sent_count', 'open_count', 'unique_open_count', 'bounce_count')
+    ordering = ('-hour',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    class Meta:
+        frontend_config = {
+            'icon': 'bar-chart',
+            'category': 'Newsletter',
+            'description': 'View campaign sends, opens and bounces by hour.',
+            'include_in_dashboard': True,
+        }
+
 @admin.register(Email)
 class EmailAdmin(admin.ModelAdmin):
-    list_display = ('subscriber', 'campaign', 'sent_at', 'opened_at')
-    list_filter = ('sent_at', 'opened_at')
+    list_display = ('subscriber', 'campaign', 'status', 'sent_at', 'opened_at')
+    list_filter = ('status', 'sent_at', 'opened_at')
     search_fields = ('subscriber__email', 'campaign__name')
     class Meta:
         frontend_config = {
@@ -0,0 +1,181 @@
+import platform
+import socketserver
+import threading
+import time
+
+import django
+from django.core.mail import get_connection
+from django.db import connection
+from django.utils import timezone
+
+from .models import Campaign, Email, Subscriber
+from .sending import CampaignSender
+
+BATCH_SIZE = 5000
+
+CAMPAIGN_CONTENT = (
+    '<p>Hello {name},</p>\n'
+    '<p>This is the benchmark campaign. It is about as long as a short newsletter, with a few paragraphs '
+    'of text and links, so rendering and the SMTP transfer carry a realistic payload.</p>\n'
+    '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore '
+    'et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris.</p>\n'
+    '<p><a href="{unsubscribe}">Unsubscribe</a></p>\n'
+)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: accepts every command and discards the messages."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost SMTP stand-in')
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line.rstrip(b'\r\n') == b'.':
+                    in_data = False
+                    self.server.received()
+                    self.reply('250 OK')
+                continue
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.wfile.write(b'250-localhost\r\n250 8BITMIME\r\n')
+            elif command == b'DATA':
+                in_data = True
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, latency):
+        super().__init__(address, _SMTPHandler)
+        self.latency = latency
+        self.message_count = 0
+        self._lock = threading.Lock()
+
+    def received(self):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.message_count += 1
+
+
+class SMTPStandIn:
+    """
+    A local SMTP server that accepts and drops every message, to benchmark
+    the sender without a mail provider. ``latency`` adds seconds of delay
+    to each accepted message, like a remote server would.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0):
+        self.server = _SMTPServer((host, port), latency)
+        self.host, self.port = self.server.server_address[:2]
+        self._thread = None
+
+    @property
+    def message_count(self):
+        return self.server.message_count
+
+    def connection_factory(self):
+        return get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=self.host, port=self.port, username='', password='', use_tls=False, use_ssl=False, timeout=30,
+        )
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+
+def generate_subscribers(size):
+    """Bulk creates ``size`` subscribers, every tenth of them inactive."""
+    for start in range(0, size, BATCH_SIZE):
+        Subscriber.objects.bulk_create(
+            [
+                Subscriber(
+                    email=f'bench-subscriber-{i}@example.com',
+                    first_name=f'Reader{i}',
+                    last_name='Benchmark',
+                    is_active=i % 10 != 9,
+                )
+                for i in range(start, min(start + BATCH_SIZE, size))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def run_send_benchmark(size, workers=None, rate=None, batch_size=None, latency=0, stdout=None):
+    """
+    Seeds ``size`` subscribers in the current database and sends a campaign
+    to them through an SMTPStandIn, then sends it again to time the resume
+    scan over a fully sent campaign. Returns a JSON-serializable report.
+    """
+    data_start = time.perf_counter()
+    generate_subscribers(size)
+    data_time = time.perf_counter() - data_start
+
+    {% raw %}content = CAMPAIGN_CONTENT.format(name='{{ subscriber.first_name }}', unsubscribe='{{ unsubscribe_url }}')
+    campaign = Campaign.objects.create(name='Benchmark', subject='News for {{ subscriber.first_name }}', content=content){% endraw %}
+
+    with SMTPStandIn(latency=latency) as smtp:
+        sender = CampaignSender(
+            campaign, batch_size=batch_size, workers=workers, rate=rate, connection_factory=smtp.connection_factory,
+        )
+        if stdout is not None:
+            stdout(f'Sending to {size} subscriber(s) with {sender.workers} worker(s)...')
+        send_start = time.perf_counter()
+        sent, failed = sender.run()
+        send_time = time.perf_counter() - send_start
+        received = smtp.message_count
+
+        # As after a crash: the campaign is still 'sending' and every row is written
+        Campaign.objects.filter(pk=campaign.pk).update(status='sending')
+        campaign.refresh_from_db()
+        resume_start = time.perf_counter()
+        resent, _ = CampaignSender(
+            campaign, batch_size=batch_size, workers=workers, rate=rate, connection_factory=smtp.connection_factory,
+        ).run()
+        resume_time = time.perf_counter() - resume_start
+
+    return {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'database_version': '.'.join(str(part) for part in connection.get_database_version()),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'size': size,
+            'workers': sender.workers,
+            'batch_size': sender.batch_size,
+            'rate': rate,
+            'latency_ms': round(latency * 1000, 2),
+            'data_generation_s': round(data_time, 2),
+        },
+        'send': {
+            'sent': sent,
+            'failed': failed,
+            'received': received,
+            'email_rows': Email.objects.filter(campaign=campaign).count(),
+            'duration_s': round(send_time, 2),
+            'messages_per_s': round(sent / send_time, 1) if send_time else None,
+        },
+        'resume': {
+            'resent': resent,
+            'duration_s': round(resume_time, 2),
+        },
+    }
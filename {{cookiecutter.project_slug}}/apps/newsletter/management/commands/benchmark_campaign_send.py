@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from apps.newsletter.benchmarks import run_send_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the campaign sender against a throwaway test database and a local SMTP stand-in, '
+        'e.g. with --size 1000000, and reports the send rate and the cost of resuming a sent campaign. '
+        'Point DATABASE_URL at PostgreSQL to benchmark it instead of SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000, help='Number of generated subscribers.')
+        parser.add_argument('--workers', type=int, default=None, help='Number of sending threads and connections.')
+        parser.add_argument('--rate', type=float, default=None, help='Maximum messages per second across all workers.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Number of subscribers read per batch.')
+        parser.add_argument(
+            '--latency', type=float, default=0,
+            help='Milliseconds the SMTP stand-in waits before accepting each message.',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database between runs.')
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            report = run_send_benchmark(
+                options['size'],
+                workers=options['workers'],
+                rate=options['rate'],
+                batch_size=options['batch_size'],
+                latency=options['latency'] / 1000,
+                stdout=self.stdout.write,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        send, resume = report['send'], report['resume']
+        self.stdout.write(
+            f"Sent {send['sent']} ({send['failed']} failed, {send['received']} received) "
+            f"in {send['duration_s']}s: {send['messages_per_s']} messages/s."
+        )
+        self.stdout.write(f"Resume scan over the sent campaign: {resume['duration_s']}s, {resume['resent']} resent.")
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f"Report written to {options['output']}.")
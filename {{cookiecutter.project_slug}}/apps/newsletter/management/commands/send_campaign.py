@@ -0,0 +1,36 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.newsletter.models import Campaign
+from apps.newsletter.sending import CampaignAlreadySending, send_campaign
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends a newsletter campaign to every active subscriber it was not sent to yet. '
+        'Re-run it to resume a campaign that stopped or had failures.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign', help='Id of the campaign to send.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Number of subscribers read per batch.')
+        parser.add_argument('--workers', type=int, default=None, help='Number of sending threads and connections.')
+        parser.add_argument('--rate', type=float, default=None, help='Maximum messages per second across all workers.')
+
+    def handle(self, *args, **options):
+        try:
+            campaign = Campaign.objects.get(pk=options['campaign'])
+        except (Campaign.DoesNotExist, ValidationError):
+            raise CommandError(f"Campaign '{options['campaign']}' does not exist.")
+        if campaign.status == 'sent':
+            raise CommandError(f"Campaign '{campaign}' was already sent.")
+
+        try:
+            sent, failed = send_campaign(
+                campaign, batch_size=options['batch_size'], workers=options['workers'], rate=options['rate'],
+            )
+        except CampaignAlreadySending as e:
+            raise CommandError(str(e))
+        if failed:
+            raise CommandError(f'Sent {sent} email(s), {failed} failed. Run the command again to retry them.')
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} email(s); campaign '{campaign}' is sent."))
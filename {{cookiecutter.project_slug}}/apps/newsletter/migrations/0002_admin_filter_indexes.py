@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['is_active', '-subscribed_at'], name='newsletter_sub_active_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:27
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_emails(apps, schema_editor):
+    """Starts the counters of campaigns sent before they existed from their Email rows."""
+    Campaign = apps.get_model('newsletter', 'Campaign')
+    Email = apps.get_model('newsletter', 'Email')
+
+    def email_count(**filters):
+        emails = (
+            Email.objects.filter(campaign=OuterRef('pk'), **filters)
+            .order_by()
+            .values('campaign')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return Coalesce(Subquery(emails, output_field=IntegerField()), 0)
+
+    Campaign.objects.update(sent_count=email_count(), unique_open_count=email_count(opened_at__isnull=False))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0002_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='sent_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Sent'),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='unique_open_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Unique Opens'),
+        ),
+        migrations.RunPython(count_existing_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:40
+
+from django.db import migrations, models
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce, Lower, NullIf, Trim
+
+LANGUAGES = ('en', 'de', 'fr')
+UNTRANSLATED_FIELDS = ('email', 'first_name', 'last_name')
+
+
+def restore_original_columns(apps, schema_editor):
+    """
+    Subscribers are no longer translated. Saving one under another language
+    could blank the original column, so blanks are refilled from the first
+    language column holding a value before those columns are dropped.
+    """
+    Subscriber = apps.get_model('newsletter', 'Subscriber')
+    for name in UNTRANSLATED_FIELDS:
+        translations = [NullIf(f'{name}_{language}', Value('')) for language in LANGUAGES]
+        Subscriber.objects.filter(**{name: ''}).update(**{name: Coalesce(*translations, Value(''))})
+
+
+def normalize_subscriber_emails(apps, schema_editor):
+    """
+    Fills email_normalized and merges subscribers whose addresses only
+    differ in case into the oldest one, which takes over their emails and
+    stays unsubscribed if any of them was.
+    """
+    Subscriber = apps.get_model('newsletter', 'Subscriber')
+    Email = apps.get_model('newsletter', 'Email')
+
+    Subscriber.objects.update(email_normalized=Lower(Trim('email')))
+    duplicated = (
+        Subscriber.objects.order_by()
+        .values('email_normalized')
+        .annotate(count=Count('pk'))
+        .filter(count__gt=1)
+        .values_list('email_normalized', flat=True)
+    )
+    for normalized in list(duplicated):
+        kept, *others = Subscriber.objects.filter(email_normalized=normalized).order_by('subscribed_at', 'pk')
+        Email.objects.filter(subscriber__in=others).update(subscriber=kept)
+        if kept.is_active and any(not subscriber.is_active for subscriber in others):
+            Subscriber.objects.filter(pk=kept.pk).update(is_active=False)
+        Subscriber.objects.filter(pk__in=[subscriber.pk for subscriber in others]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0003_campaign_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_original_columns, migrations.RunPython.noop),
+        *[
+            migrations.RemoveField(model_name='subscriber', name=f'{name}_{language}')
+            for name in UNTRANSLATED_FIELDS
+            for language in LANGUAGES
+        ],
+        migrations.AddField(
+            model_name='subscriber',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True),
+        ),
+        migrations.RunPython(normalize_subscriber_emails, migrations.RunPython.noop),
+    ]
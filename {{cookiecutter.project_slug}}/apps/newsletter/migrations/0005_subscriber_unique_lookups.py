@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:40
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0004_subscriber_email_normalized'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subscriber',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='subscriber',
+            name='unsubscribe_token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncHour
+
+
+def roll_up_existing_emails(apps, schema_editor):
+    """
+    Builds the hourly rollups of campaigns sent before they existed from
+    their Email rows. Only first opens were recorded, so they also start
+    the open counts.
+    """
+    Campaign = apps.get_model('newsletter', 'Campaign')
+    CampaignHourlyStats = apps.get_model('newsletter', 'CampaignHourlyStats')
+    Email = apps.get_model('newsletter', 'Email')
+
+    Campaign.objects.update(open_count=F('unique_open_count'))
+
+    rollups = {}
+    sent = Email.objects.annotate(hour=TruncHour('sent_at')).values('campaign_id', 'hour').annotate(count=Count('pk'))
+    for row in sent.order_by():
+        rollups.setdefault((row['campaign_id'], row['hour']), {})['sent_count'] = row['count']
+    opened = (
+        Email.objects.filter(opened_at__isnull=False)
+        .annotate(hour=TruncHour('opened_at'))
+        .values('campaign_id', 'hour')
+        .annotate(count=Count('pk'))
+    )
+    for row in opened.order_by():
+        counters = rollups.setdefault((row['campaign_id'], row['hour']), {})
+        counters['open_count'] = counters['unique_open_count'] = row['count']
+    CampaignHourlyStats.objects.bulk_create(
+        [
+            CampaignHourlyStats(campaign_id=campaign_id, hour=hour, **counters)
+            for (campaign_id, hour), counters in rollups.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0005_subscriber_unique_lookups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='Hour')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Sent')),
+                ('open_count', models.PositiveIntegerField(default=0, verbose_name='Opens')),
+                ('unique_open_count', models.PositiveIntegerField(default=0, verbose_name='Unique Opens')),
+                ('bounce_count', models.PositiveIntegerField(default=0, verbose_name='Bounces')),
+            ],
+            options={
+                'verbose_name': 'Campaign Hourly Stats',
+                'verbose_name_plural': 'Campaign Hourly Stats',
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='bounce_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Bounces'),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='open_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Opens'),
+        ),
+        migrations.AddIndex(
+            model_name='email',
+            index=models.Index(fields=['campaign', 'opened_at'], name='newsletter_email_opened_idx'),
+        ),
+        migrations.AddField(
+            model_name='campaignhourlystats',
+            name='campaign',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_stats', to='newsletter.campaign'),
+        ),
+        migrations.AddConstraint(
+            model_name='campaignhourlystats',
+            constraint=models.UniqueConstraint(fields=('campaign', 'hour'), name='newsletter_stats_campaign_hour_uniq'),
+        ),
+        migrations.RunPython(roll_up_existing_emails, migrations.RunPython.noop),
+    ]
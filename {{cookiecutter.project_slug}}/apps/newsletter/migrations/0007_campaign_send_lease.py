@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0006_campaign_analytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='send_lease_expires_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='send_lease_token',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
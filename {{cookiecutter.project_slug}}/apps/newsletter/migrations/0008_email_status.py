@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0007_campaign_send_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='email',
+            name='status',
+            field=models.CharField(choices=[('sent', 'Sent'), ('bounced', 'Bounced')], default='sent', max_length=10, verbose_name='Status'),
+        ),
+    ]
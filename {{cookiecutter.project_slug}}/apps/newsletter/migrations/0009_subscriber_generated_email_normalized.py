@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-19 14:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0008_email_status'),
+    ]
+
+    # A column cannot be altered into a generated one, so it is dropped and
+    # added back; 0004 already merged the subscribers it would have to reject
+    operations = [
+        migrations.RemoveField(
+            model_name='subscriber',
+            name='email_normalized',
+        ),
+        migrations.AddField(
+            model_name='subscriber',
+            name='email_normalized',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('email')), output_field=models.CharField(max_length=254), unique=True),
+        ),
+    ]
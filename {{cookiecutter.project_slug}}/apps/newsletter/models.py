@@ -1,14 +1,30 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Lower, Trim
 from django.utils.translation import gettext_lazy as _
 import uuid
 
+
+def normalize_email(email):
+    """The form of ``email`` subscribers are deduplicated by: trimmed and lowercased, as ``email_normalized``."""
+    return email.strip().lower()
+
+
 class Subscriber(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField(unique=True, verbose_name=_('Email'))
+    # Unique, so addresses differing only in case are one subscriber. Derived
+    # by the database, so bulk inserts and updates keep it in sync as well
+    email_normalized = models.GeneratedField(
+        expression=Lower(Trim('email')),
+        output_field=models.CharField(max_length=254),
+        db_persist=True,
+        unique=True,
+    )
     first_name = models.CharField(max_length=100, blank=True, verbose_name=_('First Name'))
     last_name = models.CharField(max_length=100, blank=True, verbose_name=_('Last Name'))
     is_active = models.BooleanField(default=True, verbose_name=_('Is Active'))
-    unsubscribe_token = models.UUIDField(default=uuid.uuid4, editable=False)
+    unsubscribe_token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     subscribed_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Subscribed At'))
     confirmed_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Confirmed At'))
 
@@ -16,10 +32,21 @@ class Subscriber(models.Model):
         verbose_name = _('Subscriber')
         verbose_name_plural = _('Subscribers')
         ordering = ['-subscribed_at']
+        indexes = [
+            models.Index(fields=['is_active', '-subscribed_at'], name='newsletter_sub_active_idx'),
+        ]
 
     def __str__(self):
         return self.email
 
+    def validate_unique(self, exclude=None):
+        # email_normalized only has a value once the row is saved, so its
+        # uniqueness is checked here, against the email it will be derived from
+        super().validate_unique({*(exclude or ()), 'email_normalized'})
+        duplicates = Subscriber.objects.filter(email_normalized=normalize_email(self.email)).exclude(pk=self.pk)
+        if self.email and duplicates.exists():
+            raise ValidationError({'email': _('A subscriber with this email already exists.')})
+
 class Campaign(models.Model):
     STATUS_CHOICES = (
         ('draft', _('Draft')),
@@ -32,6 +59,14 @@ class Campaign(models.Model):
     content = models.TextField(verbose_name=_('Content'))
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     sent_at = models.DateTimeField(null=True, blank=True)
+    # Maintained by the sender and the open tracker (see stats.py), so reports need no scan of the emails
+    sent_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Sent'))
+    open_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Opens'))
+    unique_open_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Unique Opens'))
+    bounce_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Bounces'))
+    # Held by the run sending the campaign, so a second run refuses to start; one that died is taken over once it expires
+    send_lease_token = models.UUIDField(null=True, blank=True, editable=False)
+    send_lease_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -43,10 +78,47 @@ class Campaign(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def open_rate(self):
+        return self.unique_open_count / self.sent_count if self.sent_count else 0
+
+    @property
+    def bounce_rate(self):
+        attempted = self.sent_count + self.bounce_count
+        return self.bounce_count / attempted if attempted else 0
+
+
+class CampaignHourlyStats(models.Model):
+    """The counters of a campaign for one hour, added to as sends and opens are recorded."""
+    campaign = models.ForeignKey(Campaign, related_name='hourly_stats', on_delete=models.CASCADE)
+    hour = models.DateTimeField(verbose_name=_('Hour'))
+    sent_count = models.PositiveIntegerField(default=0, verbose_name=_('Sent'))
+    open_count = models.PositiveIntegerField(default=0, verbose_name=_('Opens'))
+    unique_open_count = models.PositiveIntegerField(default=0, verbose_name=_('Unique Opens'))
+    bounce_count = models.PositiveIntegerField(default=0, verbose_name=_('Bounces'))
+
+    class Meta:
+        verbose_name = _('Campaign Hourly Stats')
+        verbose_name_plural = _('Campaign Hourly Stats')
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'hour'], name='newsletter_stats_campaign_hour_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign.name} at {self.hour:%Y-%m-%d %H:00}"
+
+
 class Email(models.Model):
+    STATUS_CHOICES = (
+        ('sent', _('Sent')),
+        # Refused by the mail server; recorded so re-runs do not retry the recipient
+        ('bounced', _('Bounced')),
+    )
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     campaign = models.ForeignKey(Campaign, related_name='emails', on_delete=models.CASCADE)
     subscriber = models.ForeignKey(Subscriber, related_name='emails', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='sent', verbose_name=_('Status'))
     sent_at = models.DateTimeField(auto_now_add=True)
     opened_at = models.DateTimeField(null=True, blank=True)
 
@@ -54,6 +126,9 @@ class Email(models.Model):
         verbose_name = _('Email')
         verbose_name_plural = _('Emails')
         ordering = ['-sent_at']
+        indexes = [
+            models.Index(fields=['campaign', 'opened_at'], name='newsletter_email_opened_idx'),
+        ]
 
     def __str__(self):
         return f"Email to {self.subscriber.email} for campaign {self.campaign.name}"
@@ -0,0 +1,384 @@
+import logging
+import smtplib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Q
+from django.template import Context, Engine
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import Campaign, Email, Subscriber
+from .stats import record_campaign_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'SEND_BATCH_SIZE': 1000,
+    'SEND_WORKERS': 4,
+    'SEND_RATE': None,
+    'SEND_LEASE': 10 * 60,
+    'FROM_EMAIL': None,
+    'UNSUBSCRIBE_URL': '',
+    'TRACKING_SITE_URL': '',
+    'BACKEND': None,
+}
+
+# Standalone engine: campaign templates get the builtin tags and filters, never the project's loaders
+ENGINE = Engine()
+
+# Columns read per subscriber, in the order of the rows handed to CampaignMessages.build
+SUBSCRIBER_COLUMNS = ('pk', 'email', 'first_name', 'last_name', 'unsubscribe_token')
+
+{% raw %}OPEN_PIXEL_TAG = '<img src="{{ open_tracking_url }}" width="1" height="1" alt="" border="0">'{% endraw %}
+
+
+class CampaignAlreadySending(Exception):
+    """Raised when another run holds the lease of the campaign, or took it over from this one."""
+
+
+def get_newsletter_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'NEWSLETTER_SETTINGS', {})}
+
+
+def get_email_id(campaign_id, subscriber_id):
+    """
+    The id of the Email row recording ``campaign_id`` sent to ``subscriber_id``.
+    Derived rather than random, so it is known before the row is written and
+    a resumed run finds the rows of the run that crashed.
+    """
+    return uuid.uuid5(campaign_id, str(subscriber_id))
+
+
+def iter_subscriber_batches(batch_size):
+    """
+    Yields the active subscribers as lists of SUBSCRIBER_COLUMNS tuples,
+    walking the primary key instead of using OFFSET, so every batch costs the
+    same however far into the list it is.
+    """
+    queryset = Subscriber.objects.filter(is_active=True).order_by('pk').values_list(*SUBSCRIBER_COLUMNS)
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(batch[:batch_size])
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last_pk = rows[-1][0]
+
+
+def add_open_pixel(html):
+    """``html`` with the open tracking pixel at the end of its body."""
+    end = html.lower().rfind('</body>')
+    if end == -1:
+        return html + OPEN_PIXEL_TAG
+    return html[:end] + OPEN_PIXEL_TAG + html[end:]
+
+
+class CampaignEmail(EmailMultiAlternatives):
+    """
+    An EmailMultiAlternatives with a random MIME boundary. Left unset, the
+    email generator compiles a new regex for every message to pick one that
+    does not occur in the body, which costs more than rendering it.
+    """
+
+    def message(self):
+        message = super().message()
+        if message.is_multipart() and message.get_boundary() is None:
+            message.set_boundary(f'=============={uuid.uuid4().hex}==')
+        return message
+
+
+class CampaignMessages:
+    """
+    Builds the personalized messages of a campaign.
+
+    The subject and content are compiled once. The content is the HTML part
+    when it contains markup, and the plain text part is compiled from it with
+    the tags stripped, so no message pays for strip_tags. With a
+    TRACKING_SITE_URL the HTML part gets an open tracking pixel. Templates
+    see ``subscriber`` (email, first_name, last_name), ``campaign``,
+    ``unsubscribe_url``, ``open_tracking_url`` and ``email_id``.
+    """
+
+    def __init__(self, campaign, conf=None):
+        conf = conf or get_newsletter_settings()
+        self.campaign_id = campaign.pk
+        self.campaign = {'name': campaign.name, 'subject': campaign.subject}
+        self.from_email = conf['FROM_EMAIL'] or settings.DEFAULT_FROM_EMAIL
+        self.unsubscribe_url = conf['UNSUBSCRIBE_URL']
+        self.tracking_site_url = conf['TRACKING_SITE_URL'].rstrip('/')
+
+        text = strip_tags(campaign.content)
+        self.subject_template = ENGINE.from_string(campaign.subject)
+        self.text_template = ENGINE.from_string(text)
+        self.html_template = None
+        if text != campaign.content:
+            html = campaign.content
+            if self.tracking_site_url:
+                html = add_open_pixel(html)
+            self.html_template = ENGINE.from_string(html)
+
+    def get_open_tracking_url(self, email_id):
+        if not self.tracking_site_url:
+            return ''
+        return self.tracking_site_url + reverse('newsletter:open-pixel', args=[self.campaign_id, email_id])
+
+    def build(self, row, connection=None):
+        subscriber_id, email, first_name, last_name, unsubscribe_token = row
+        unsubscribe_url = self.unsubscribe_url.format(token=unsubscribe_token) if self.unsubscribe_url else ''
+        email_id = get_email_id(self.campaign_id, subscriber_id)
+        data = {
+            'subscriber': {'email': email, 'first_name': first_name, 'last_name': last_name},
+            'campaign': self.campaign,
+            'unsubscribe_url': unsubscribe_url,
+            'open_tracking_url': self.get_open_tracking_url(email_id),
+            'email_id': email_id,
+        }
+        plain = Context(data, autoescape=False)
+        subject = ' '.join(self.subject_template.render(plain).split())
+        headers = {'List-Unsubscribe': f'<{unsubscribe_url}>'} if unsubscribe_url else None
+
+        message = CampaignEmail(
+            subject, self.text_template.render(plain), self.from_email, [email],
+            headers=headers, connection=connection,
+        )
+        if self.html_template is not None:
+            message.attach_alternative(self.html_template.render(Context(data)), 'text/html')
+        return message
+
+
+class RateLimiter:
+    """Spaces calls to ``wait`` evenly at ``rate`` per second across all threads."""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = self.clock()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+class ConnectionPool:
+    """One backend connection per worker thread, opened once and kept for the whole campaign."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self.factory()
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def reset(self):
+        """Drops the calling thread's connection after an error; the next get() opens a new one."""
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                logger.exception('Closing an email connection failed')
+
+
+class CampaignSender:
+    """
+    Sends a campaign to every active subscriber without an Email row for it.
+
+    Subscribers are read in primary key batches and each batch is split
+    between ``workers`` threads with their own connection, paced by a shared
+    rate limit (messages per second, None for no limit). While one batch is
+    on the wire the next is read, and the Email rows of each delivered
+    batch are bulk inserted, along with rows marking the recipients that
+    bounced. Re-running a campaign that stopped half way only sends to the
+    subscribers without a row; a crash can repeat at most the batches that
+    were in flight. Bounces are final, so only other failures keep the
+    campaign from being sent.
+
+    A run first claims the campaign's lease with a conditional update and
+    renews it before every batch, so a second run started meanwhile raises
+    CampaignAlreadySending instead of sending the same batches. The lease of
+    a run that died expires after SEND_LEASE seconds.
+    """
+
+    def __init__(self, campaign, batch_size=None, workers=None, rate=None, connection_factory=None):
+        conf = get_newsletter_settings()
+        self.campaign = campaign
+        self.batch_size = batch_size or conf['SEND_BATCH_SIZE']
+        self.workers = max(workers or conf['SEND_WORKERS'], 1)
+        self.messages = CampaignMessages(campaign, conf)
+        self.limiter = RateLimiter(rate if rate is not None else conf['SEND_RATE'])
+        self.lease = timedelta(seconds=conf['SEND_LEASE'])
+        self.lease_token = uuid.uuid4()
+        self.pool = ConnectionPool(connection_factory or (lambda: get_connection(conf['BACKEND'])))
+
+    def send_chunk(self, rows):
+        """
+        Sends ``rows`` over this thread's connection. Returns the ids of the
+        subscribers delivered to and of those that bounced, recipients the
+        mail server refused, and the count of the other failures.
+        """
+        delivered = []
+        bounced = []
+        failed = 0
+        for row in rows:
+            self.limiter.wait()
+            try:
+                connection = self.pool.get()
+                connection.send_messages([self.messages.build(row, connection)])
+            except smtplib.SMTPRecipientsRefused as e:
+                # The connection is still usable; only this recipient was refused
+                bounced.append(row[0])
+                logger.warning('Campaign %s to %s bounced: %s', self.campaign.pk, row[1], e)
+            except Exception as e:
+                failed += 1
+                logger.warning('Sending campaign %s to %s failed: %s', self.campaign.pk, row[1], e)
+                self.pool.reset()
+            else:
+                delivered.append(row[0])
+        return delivered, bounced, failed
+
+    def pending_rows(self, rows):
+        """``rows`` without the subscribers an earlier run already sent this campaign to or saw bounce."""
+        ids = [get_email_id(self.campaign.pk, row[0]) for row in rows]
+        done = set(Email.objects.filter(pk__in=ids).values_list('subscriber_id', flat=True))
+        return [row for row in rows if row[0] not in done]
+
+    def record(self, futures):
+        delivered = []
+        bounced = []
+        failed = 0
+        for future in futures:
+            chunk_delivered, chunk_bounced, chunk_failed = future.result()
+            delivered.extend(chunk_delivered)
+            bounced.extend(chunk_bounced)
+            failed += chunk_failed
+        Email.objects.bulk_create(
+            [
+                Email(
+                    id=get_email_id(self.campaign.pk, subscriber_id), campaign_id=self.campaign.pk,
+                    subscriber_id=subscriber_id, status=status,
+                )
+                for subscriber_ids, status in ((delivered, 'sent'), (bounced, 'bounced'))
+                for subscriber_id in subscriber_ids
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        record_campaign_stats(self.campaign.pk, timezone.now(), sent_count=len(delivered), bounce_count=len(bounced))
+        return len(delivered), failed
+
+    def claim_lease(self):
+        """Takes the campaign unless another run holds an unexpired lease on it."""
+        now = timezone.now()
+        claimed = (
+            Campaign.objects.filter(pk=self.campaign.pk, status__in=('draft', 'sending'))
+            .filter(Q(send_lease_expires_at__isnull=True) | Q(send_lease_expires_at__lte=now))
+            .update(status='sending', send_lease_token=self.lease_token, send_lease_expires_at=now + self.lease)
+        )
+        if not claimed:
+            raise CampaignAlreadySending(f"Campaign '{self.campaign}' is being sent by another run.")
+
+    def renew_lease(self):
+        """Extends the lease for the next batch. False when another run took the campaign over."""
+        return bool(
+            Campaign.objects.filter(pk=self.campaign.pk, send_lease_token=self.lease_token)
+            .update(send_lease_expires_at=timezone.now() + self.lease)
+        )
+
+    def release_lease(self, **fields):
+        Campaign.objects.filter(pk=self.campaign.pk, send_lease_token=self.lease_token).update(
+            send_lease_token=None, send_lease_expires_at=None, **fields,
+        )
+
+    def run(self):
+        """Sends the campaign. Returns the number of messages sent and failed, bounces being neither."""
+        if self.campaign.status == 'sent':
+            return 0, 0
+        self.claim_lease()
+        self.campaign.status = 'sending'
+
+        sent = failed = 0
+        in_flight = []
+        lost_lease = False
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='campaign-sender') as executor:
+                for rows in iter_subscriber_batches(self.batch_size):
+                    if not self.renew_lease():
+                        # The batches in flight are still recorded below
+                        lost_lease = True
+                        break
+                    rows = self.pending_rows(rows)
+                    futures = [
+                        executor.submit(self.send_chunk, rows[i::self.workers])
+                        for i in range(min(self.workers, len(rows)))
+                    ]
+                    if in_flight:
+                        batch_sent, batch_failed = self.record(in_flight)
+                        sent += batch_sent
+                        failed += batch_failed
+                    in_flight = futures
+                if in_flight:
+                    batch_sent, batch_failed = self.record(in_flight)
+                    sent += batch_sent
+                    failed += batch_failed
+        finally:
+            self.pool.close()
+
+        if lost_lease:
+            raise CampaignAlreadySending(f"Campaign '{self.campaign}' was taken over by another run after {sent} email(s).")
+        if failed:
+            # Failed subscribers have no Email row; the campaign stays 'sending' so a re-run retries them
+            self.release_lease()
+        else:
+            sent_at = timezone.now()
+            self.release_lease(status='sent', sent_at=sent_at)
+            self.campaign.status = 'sent'
+            self.campaign.sent_at = sent_at
+        return sent, failed
+
+
+def send_campaign(campaign, batch_size=None, workers=None, rate=None, connection_factory=None):
+    """
+    Sends ``campaign`` to its pending subscribers; see CampaignSender.
+    Returns the number of messages sent and failed, and raises
+    CampaignAlreadySending when another run is sending it.
+    """
+    return CampaignSender(
+        campaign, batch_size=batch_size, workers=workers, rate=rate, connection_factory=connection_factory,
+    ).run()
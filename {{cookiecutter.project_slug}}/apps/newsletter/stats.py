@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import Campaign, CampaignHourlyStats
+
+COUNTERS = ('sent_count', 'open_count', 'unique_open_count', 'bounce_count')
+
+
+def record_campaign_stats(campaign_id, when, **deltas):
+    """
+    Adds ``deltas`` (COUNTERS names) to the counters of the campaign and of
+    its rollup for the hour of ``when``. Called once per batch by the
+    sender and once per flush by the open tracker, never per email.
+    """
+    deltas = {name: count for name, count in deltas.items() if count}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown campaign counter(s): {', '.join(sorted(unknown))}")
+
+    hour = when.replace(minute=0, second=0, microsecond=0)
+    increments = {name: F(name) + count for name, count in deltas.items()}
+    with transaction.atomic():
+        Campaign.objects.filter(pk=campaign_id).update(**increments)
+        updated = CampaignHourlyStats.objects.filter(campaign_id=campaign_id, hour=hour).update(**increments)
+        if not updated:
+            # Two workers starting the same hour: the loser adds to the winner's row
+            _, created = CampaignHourlyStats.objects.get_or_create(campaign_id=campaign_id, hour=hour, defaults=deltas)
+            if not created:
+                CampaignHourlyStats.objects.filter(campaign_id=campaign_id, hour=hour).update(**increments)
@@ -0,0 +1,145 @@
+import csv
+import io
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from .models import Subscriber, normalize_email
+
+# Rows reported back per import; the counts cover the rest
+MAX_REPORTED_ERRORS = 20
+
+
+def get_import_batch_size():
+    return getattr(settings, 'NEWSLETTER_SETTINGS', {}).get('IMPORT_BATCH_SIZE', 1000)
+
+
+def iter_csv_rows(file):
+    """
+    Streams the rows of an uploaded CSV file as dicts keyed by lowercased
+    header, decoding as it reads instead of loading the whole file.
+    """
+    reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip().lower() for name in header]
+    if 'email' not in header:
+        raise ValidationError("The CSV file needs an 'email' column.")
+    for values in reader:
+        yield dict(zip(header, values))
+
+
+def upsert_subscribers(subscribers):
+    """
+    Inserts ``subscribers`` (unsaved instances with distinct normalized
+    emails) in one statement. Existing subscribers get the names the rows
+    give, keep the ones they leave blank, and keep their status, so an
+    import never erases a name or resubscribes anyone who left.
+    Returns the number of new subscribers.
+    """
+    existing = {
+        normalized: names
+        for normalized, *names in Subscriber.objects.filter(
+            email_normalized__in=[subscriber.email_normalized for subscriber in subscribers],
+        ).values_list('email_normalized', 'first_name', 'last_name')
+    }
+    for subscriber in subscribers:
+        if subscriber.email_normalized in existing:
+            first_name, last_name = existing[subscriber.email_normalized]
+            subscriber.first_name = subscriber.first_name or first_name
+            subscriber.last_name = subscriber.last_name or last_name
+    Subscriber.objects.bulk_create(
+        subscribers,
+        update_conflicts=True,
+        unique_fields=['email_normalized'],
+        update_fields=['first_name', 'last_name'],
+    )
+    return len(subscribers) - len(existing)
+
+
+def import_subscribers(rows, batch_size=None):
+    """
+    Adds or updates subscribers from dicts with an ``email`` and optional
+    ``first_name`` and ``last_name``, with one upsert per batch on the
+    normalized email. Rows repeating an address, in any case, update it;
+    a name left blank or missing never replaces one already known.
+    Returns the counts and the first invalid rows, numbered from 1.
+    """
+    batch_size = batch_size or get_import_batch_size()
+    result = {'processed': 0, 'created': 0, 'updated': 0, 'invalid': 0, 'errors': []}
+    batch = {}
+
+    def flush():
+        created = upsert_subscribers(list(batch.values()))
+        result['created'] += created
+        result['updated'] += len(batch) - created
+        batch.clear()
+
+    for number, row in enumerate(rows, start=1):
+        result['processed'] += 1
+        email = (row.get('email') or '').strip()
+        try:
+            validate_email(email)
+        except ValidationError:
+            result['invalid'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append({'row': number, 'email': email, 'error': 'Enter a valid email address.'})
+            continue
+
+        normalized = normalize_email(email)
+        first_name = (row.get('first_name') or '').strip()[:100]
+        last_name = (row.get('last_name') or '').strip()[:100]
+        if normalized in batch:
+            # Counted once per batch; the last row for an address wins, except for blank names
+            result['updated'] += 1
+            first_name = first_name or batch[normalized].first_name
+            last_name = last_name or batch[normalized].last_name
+        batch[normalized] = Subscriber(
+            email=email,
+            email_normalized=normalized,
+            first_name=first_name,
+            last_name=last_name,
+        )
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return result
+
+
+def iter_token_lines(file):
+    """Streams the first column of each non-empty line of an uploaded file."""
+    for values in csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline='')):
+        if values and values[0].strip():
+            yield values[0]
+
+
+def unsubscribe_tokens(values, batch_size=None):
+    """
+    Deactivates the subscribers holding the unsubscribe tokens in
+    ``values``, read as a stream, with one UPDATE per batch. Unknown tokens
+    and subscribers already inactive are left alone. Returns the counts.
+    """
+    batch_size = batch_size or get_import_batch_size()
+    result = {'processed': 0, 'unsubscribed': 0, 'invalid': 0}
+    batch = set()
+
+    def flush():
+        result['unsubscribed'] += Subscriber.objects.filter(unsubscribe_token__in=batch, is_active=True).update(is_active=False)
+        batch.clear()
+
+    for value in values:
+        result['processed'] += 1
+        try:
+            batch.add(uuid.UUID(str(value).strip()))
+        except ValueError:
+            result['invalid'] += 1
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return result
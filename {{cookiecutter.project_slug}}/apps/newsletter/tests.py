@@ -1,3 +1,471 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.contrib.auth.models import Permission, User
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.db import DatabaseError, IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.admin_api.seeding import seed_model
+from apps.newsletter.benchmarks import run_send_benchmark
+from apps.newsletter.models import Campaign, CampaignHourlyStats, Email, Subscriber
+from apps.newsletter.sending import CampaignAlreadySending, CampaignSender, RateLimiter, get_email_id, send_campaign
+from apps.newsletter.subscribers import unsubscribe_tokens
+from apps.newsletter.tracking import PIXEL_GIF, open_tracker
+from unittest import mock
+import smtplib
+import uuid
 
-# Create your tests here.
+
+class CampaignSendingTests(TestCase):
+    """
+    Tests for the campaign sender.
+    """
+    def setUp(self):
+        """
+        Create a campaign and a few subscribers, one of them inactive.
+        """
+        {% raw %}self.campaign = Campaign.objects.create(
+            name='Launch',
+            subject='News for {{ subscriber.first_name }}',
+            content='<p>Hello {{ subscriber.first_name }} & co</p><a href="{{ unsubscribe_url }}">Unsubscribe</a>',
+        ){% endraw %}
+        self.subscribers = [
+            Subscriber.objects.create(email=f'reader{i}@example.com', first_name=f'Reader <{i}>')
+            for i in range(5)
+        ]
+        Subscriber.objects.create(email='gone@example.com', is_active=False)
+
+    @override_settings(NEWSLETTER_SETTINGS={'UNSUBSCRIBE_URL': 'https://example.com/unsubscribe/{token}/'})
+    def test_sends_personalized_messages_to_active_subscribers(self):
+        """
+        Ensure every active subscriber gets one personalized message and an Email row.
+        """
+        self.assertEqual(send_campaign(self.campaign, batch_size=2, workers=3), (5, 0))
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [s.email for s in self.subscribers])
+        message = next(message for message in mail.outbox if message.to == ['reader0@example.com'])
+        subscriber = self.subscribers[0]
+        self.assertEqual(message.subject, 'News for Reader <0>')
+        self.assertEqual(message.body, 'Hello Reader <0> & coUnsubscribe')
+        html, mimetype = message.alternatives[0]
+        self.assertEqual(mimetype, 'text/html')
+        self.assertIn('Hello Reader &lt;0&gt; & co', html)
+        self.assertIn(f'https://example.com/unsubscribe/{subscriber.unsubscribe_token}/', html)
+        self.assertEqual(message.extra_headers['List-Unsubscribe'], f'<https://example.com/unsubscribe/{subscriber.unsubscribe_token}/>')
+
+        self.assertEqual(
+            set(Email.objects.values_list('pk', flat=True)),
+            {get_email_id(self.campaign.pk, s.pk) for s in self.subscribers},
+        )
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sent')
+        self.assertIsNotNone(self.campaign.sent_at)
+        self.assertEqual(self.campaign.sent_count, 5)
+        rollup = CampaignHourlyStats.objects.get(campaign=self.campaign)
+        self.assertEqual(rollup.hour, timezone.now().replace(minute=0, second=0, microsecond=0))
+        self.assertEqual((rollup.sent_count, rollup.bounce_count), (5, 0))
+
+    @override_settings(NEWSLETTER_SETTINGS={'TRACKING_SITE_URL': 'https://example.com/'})
+    def test_html_part_gets_an_open_pixel(self):
+        """
+        Ensure the HTML part loads the tracking pixel of its own Email row.
+        """
+        send_campaign(self.campaign)
+        message = next(message for message in mail.outbox if message.to == ['reader0@example.com'])
+        email_id = get_email_id(self.campaign.pk, self.subscribers[0].pk)
+        pixel_url = 'https://example.com' + reverse('newsletter:open-pixel', args=[self.campaign.pk, email_id])
+        self.assertIn(f'<img src="{pixel_url}"', message.alternatives[0][0])
+        self.assertNotIn('img', message.body)
+
+    def test_resume_skips_subscribers_already_sent(self):
+        """
+        Ensure a campaign resumed after a crash only sends to subscribers without an Email row.
+        """
+        Campaign.objects.filter(pk=self.campaign.pk).update(status='sending')
+        self.campaign.refresh_from_db()
+        Email.objects.create(
+            id=get_email_id(self.campaign.pk, self.subscribers[0].pk), campaign=self.campaign, subscriber=self.subscribers[0],
+        )
+
+        self.assertEqual(send_campaign(self.campaign, batch_size=2), (4, 0))
+        self.assertNotIn(['reader0@example.com'], [message.to for message in mail.outbox])
+        self.assertEqual(Email.objects.count(), 5)
+        self.assertEqual(send_campaign(self.campaign), (0, 0))
+
+    def test_failed_sends_are_retried_by_the_next_run(self):
+        """
+        Ensure a failed message leaves the campaign sending and is sent by the next run.
+        """
+        send_messages = locmem.EmailBackend.send_messages
+
+        def flaky(backend, messages):
+            if messages[0].to == ['reader3@example.com']:
+                raise OSError('mailbox unavailable')
+            return send_messages(backend, messages)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', autospec=True, side_effect=flaky):
+            with self.assertLogs('apps.newsletter.sending', level='WARNING'):
+                self.assertEqual(send_campaign(self.campaign, workers=2), (4, 1))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sending')
+        self.assertFalse(Email.objects.filter(subscriber=self.subscribers[3]).exists())
+
+        mail.outbox = []
+        self.assertEqual(send_campaign(self.campaign), (1, 0))
+        self.assertEqual([message.to for message in mail.outbox], [['reader3@example.com']])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sent')
+
+    def test_refused_recipients_count_as_bounces(self):
+        """
+        Ensure refused recipients are recorded as bounces, never retried, and do not keep the campaign from being sent.
+        """
+        send_messages = locmem.EmailBackend.send_messages
+
+        def refusing(backend, messages):
+            recipient = messages[0].to[0]
+            if recipient in ('reader1@example.com', 'reader2@example.com'):
+                raise smtplib.SMTPRecipientsRefused({recipient: (550, b'No such user')})
+            if recipient == 'reader3@example.com':
+                raise OSError('connection reset')
+            return send_messages(backend, messages)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', autospec=True, side_effect=refusing):
+            with self.assertLogs('apps.newsletter.sending', level='WARNING'):
+                self.assertEqual(send_campaign(self.campaign, batch_size=2, workers=2), (2, 1))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sending')
+        self.assertEqual((self.campaign.sent_count, self.campaign.bounce_count), (2, 2))
+        self.assertAlmostEqual(self.campaign.bounce_rate, 0.5)
+        rollup = CampaignHourlyStats.objects.get(campaign=self.campaign)
+        self.assertEqual((rollup.sent_count, rollup.bounce_count), (2, 2))
+        self.assertEqual(
+            set(Email.objects.filter(status='bounced').values_list('subscriber__email', flat=True)),
+            {'reader1@example.com', 'reader2@example.com'},
+        )
+
+        # Only the failure is retried, and the bounces are not counted again
+        mail.outbox = []
+        self.assertEqual(send_campaign(self.campaign), (1, 0))
+        self.assertEqual([message.to for message in mail.outbox], [['reader3@example.com']])
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.sent_count, self.campaign.bounce_count), ('sent', 3, 2))
+
+    def test_second_run_is_refused_while_the_first_holds_the_lease(self):
+        """
+        Ensure a run refuses to send a campaign another run holds, and takes it over once that lease expired.
+        """
+        Campaign.objects.filter(pk=self.campaign.pk).update(
+            status='sending', send_lease_token=uuid.uuid4(), send_lease_expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        with self.assertRaises(CampaignAlreadySending):
+            send_campaign(self.campaign)
+        self.assertEqual(mail.outbox, [])
+
+        Campaign.objects.filter(pk=self.campaign.pk).update(send_lease_expires_at=timezone.now())
+        self.assertEqual(send_campaign(self.campaign), (5, 0))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sent')
+        self.assertIsNone(self.campaign.send_lease_token)
+
+    def test_run_stops_when_taken_over(self):
+        """
+        Ensure a run whose lease was taken over records the batch in flight and sends no further batch.
+        """
+        pending_rows = CampaignSender.pending_rows
+
+        def taken_over(sender, rows):
+            # Another run takes the campaign over while the first batch is sent
+            Campaign.objects.filter(pk=self.campaign.pk).update(send_lease_token=uuid.uuid4())
+            return pending_rows(sender, rows)
+
+        with mock.patch.object(CampaignSender, 'pending_rows', autospec=True, side_effect=taken_over):
+            with self.assertRaises(CampaignAlreadySending):
+                send_campaign(self.campaign, batch_size=2, workers=1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Email.objects.count(), 2)
+
+    def test_rate_limiter_spaces_sends(self):
+        """
+        Ensure the rate limiter hands out evenly spaced slots.
+        """
+        now = [100.0]
+        sleeps = []
+        limiter = RateLimiter(10, clock=lambda: now[0], sleep=sleeps.append)
+        for _ in range(3):
+            limiter.wait()
+        self.assertEqual([round(delay, 3) for delay in sleeps], [0.1, 0.2])
+
+        RateLimiter(None, clock=lambda: now[0], sleep=sleeps.append).wait()
+        self.assertEqual(len(sleeps), 2)
+
+
+@override_settings(NEWSLETTER_SETTINGS={'OPEN_FLUSH_INTERVAL': 3600, 'OPEN_FLUSH_THRESHOLD': 1000})
+class OpenTrackingTests(TestCase):
+    """
+    Tests for the open tracking pixel and its write-behind buffer.
+    """
+    def setUp(self):
+        """
+        Create a sent campaign with three emails and empty the buffer.
+        """
+        open_tracker.flush()
+        self.campaign = Campaign.objects.create(name='Launch', subject='News', content='Hello', status='sent', sent_count=3)
+        self.emails = [
+            Email.objects.create(
+                campaign=self.campaign, subscriber=Subscriber.objects.create(email=f'reader{i}@example.com'),
+            )
+            for i in range(3)
+        ]
+
+    def pixel_url(self, email, campaign=None):
+        return reverse('newsletter:open-pixel', args=[(campaign or self.campaign).pk, email.pk])
+
+    def test_pixel_is_served_without_queries(self):
+        """
+        Ensure the pixel answers with the GIF and leaves the open in the buffer.
+        """
+        with self.assertNumQueries(0):
+            response = self.client.get(self.pixel_url(self.emails[0]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response.content, PIXEL_GIF)
+        self.assertIn('no-store', response['Cache-Control'])
+
+        self.emails[0].refresh_from_db()
+        self.assertIsNone(self.emails[0].opened_at)
+
+    def test_opens_are_flushed_once_per_email(self):
+        """
+        Ensure a flush stamps each email once, counts every open and the unique
+        ones on the campaign, and adds them to the rollup of the hour.
+        """
+        for email in (self.emails[0], self.emails[0], self.emails[1]):
+            self.client.get(self.pixel_url(email))
+        other_campaign = Campaign.objects.create(name='Other', subject='News', content='Hello')
+        self.client.get(self.pixel_url(self.emails[2], campaign=other_campaign))
+        self.client.get(reverse('newsletter:open-pixel', args=[self.campaign.pk, uuid.uuid4()]))
+
+        self.assertEqual(open_tracker.flush(), 2)
+        opened_at = dict(Email.objects.values_list('pk', 'opened_at'))
+        self.assertIsNotNone(opened_at[self.emails[0].pk])
+        self.assertIsNone(opened_at[self.emails[2].pk])
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.open_count, self.campaign.unique_open_count), (3, 2))
+        self.assertAlmostEqual(self.campaign.open_rate, 2 / 3)
+        rollup = CampaignHourlyStats.objects.get(campaign=self.campaign)
+        self.assertEqual(rollup.hour, opened_at[self.emails[0].pk].replace(minute=0))
+        self.assertEqual((rollup.open_count, rollup.unique_open_count), (3, 2))
+        self.assertFalse(CampaignHourlyStats.objects.filter(campaign=other_campaign).exists())
+
+        # Opens of emails already stamped only count as repeat opens
+        self.client.get(self.pixel_url(self.emails[0]))
+        self.assertEqual(open_tracker.flush(), 0)
+        self.assertEqual(Email.objects.get(pk=self.emails[0].pk).opened_at, opened_at[self.emails[0].pk])
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.open_count, self.campaign.unique_open_count), (4, 2))
+
+    @override_settings(NEWSLETTER_SETTINGS={'OPEN_FLUSH_INTERVAL': 3600, 'OPEN_FLUSH_THRESHOLD': 2})
+    def test_buffer_flushes_at_threshold(self):
+        """
+        Ensure the buffer writes itself out once it holds enough opens.
+        """
+        self.client.get(self.pixel_url(self.emails[0]))
+        self.assertFalse(Email.objects.filter(opened_at__isnull=False).exists())
+        self.client.get(self.pixel_url(self.emails[1]))
+        self.assertEqual(Email.objects.filter(opened_at__isnull=False).count(), 2)
+
+    @override_settings(NEWSLETTER_SETTINGS={'OPEN_FLUSH_INTERVAL': 3600, 'OPEN_FLUSH_THRESHOLD': 2})
+    def test_failed_flush_keeps_the_opens(self):
+        """
+        Ensure a flush that fails neither fails the pixel nor drops the buffered opens.
+        """
+        self.client.get(self.pixel_url(self.emails[0]))
+        with mock.patch('apps.newsletter.tracking.record_campaign_stats', side_effect=DatabaseError('database is locked')):
+            with self.assertLogs('apps.core.write_behind', level='ERROR'):
+                response = self.client.get(self.pixel_url(self.emails[1]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Email.objects.filter(opened_at__isnull=False).exists())
+
+        self.client.get(self.pixel_url(self.emails[0]))
+        self.assertEqual(Email.objects.filter(opened_at__isnull=False).count(), 2)
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.open_count, self.campaign.unique_open_count), (3, 2))
+
+
+class SubscriberManagementTests(APITestCase):
+    """
+    Tests for the subscriber import and bulk unsubscribe endpoints.
+    """
+    def setUp(self):
+        """
+        Authenticate as a superuser and create an unsubscribed subscriber.
+        """
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='password')
+        self.client.force_authenticate(user=self.admin)
+        self.left = Subscriber.objects.create(email='Left@Example.com', first_name='Old', is_active=False)
+
+    def upload(self, url_name, content, name='subscribers.csv'):
+        file_obj = SimpleUploadedFile(name, content.encode(), content_type='text/csv')
+        return self.client.post(reverse(url_name), {'file': file_obj}, format='multipart')
+
+    @override_settings(NEWSLETTER_SETTINGS={'IMPORT_BATCH_SIZE': 2})
+    def test_import_upserts_on_the_normalized_email(self):
+        """
+        Ensure an import dedupes addresses case-insensitively and never resubscribes anyone.
+        """
+        response = self.upload('newsletter:subscriber-import', (
+            'Email,First_Name,last_name\n'
+            'new@example.com,New,Reader\n'
+            ' NEW@example.com ,Renamed,Reader\n'
+            'left@example.com,Back,Again\n'
+            'not-an-email,Broken,Row\n'
+            'other@example.com,,\n'
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: response.data[key] for key in ('processed', 'created', 'updated', 'invalid')},
+            {'processed': 5, 'created': 2, 'updated': 2, 'invalid': 1},
+        )
+        self.assertEqual(response.data['errors'], [{'row': 4, 'email': 'not-an-email', 'error': 'Enter a valid email address.'}])
+
+        self.assertEqual(Subscriber.objects.count(), 3)
+        new = Subscriber.objects.get(email_normalized='new@example.com')
+        self.assertEqual((new.email, new.first_name, new.is_active), ('NEW@example.com', 'Renamed', True))
+        self.left.refresh_from_db()
+        self.assertEqual((self.left.email, self.left.first_name, self.left.is_active), ('Left@Example.com', 'Back', False))
+
+    def test_import_keeps_names_the_file_leaves_blank(self):
+        """
+        Ensure importing a file without name columns, or with blank names, never erases the names on record.
+        """
+        self.assertEqual(self.upload('newsletter:subscriber-import', 'email\nleft@example.com\n').data['updated'], 1)
+        self.left.refresh_from_db()
+        self.assertEqual(self.left.first_name, 'Old')
+
+        self.upload('newsletter:subscriber-import', 'email,first_name,last_name\nleft@example.com,,Reader\nLEFT@example.com,,\n')
+        self.left.refresh_from_db()
+        self.assertEqual((self.left.first_name, self.left.last_name), ('Old', 'Reader'))
+
+    def test_case_variants_are_rejected_as_duplicates(self):
+        """
+        Ensure adding an address differing from a subscriber's only in case answers with a validation error.
+        """
+        response = self.client.post(reverse('admin_api:subscriber-list'), {'email': 'LEFT@example.com'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.data)
+        other = Subscriber.objects.create(email='other@example.com')
+        response = self.client.patch(
+            reverse('admin_api:subscriber-detail', kwargs={'pk': other.pk}), {'email': 'left@EXAMPLE.com'}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(
+            reverse('admin_api:subscriber-detail', kwargs={'pk': other.pk}), {'email': 'Other@example.com'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:newsletter_subscriber_add'), {'email': 'left@example.COM', 'is_active': 'on'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('email', response.context['adminform'].form.errors)
+        self.assertEqual(Subscriber.objects.count(), 2)
+
+    def test_import_rejects_files_without_an_email_column(self):
+        """
+        Ensure a CSV file without an email column imports nothing.
+        """
+        response = self.upload('newsletter:subscriber-import', 'name\nReader\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Subscriber.objects.count(), 1)
+
+    def test_addresses_differing_in_case_are_one_subscriber(self):
+        """
+        Ensure the normalized email is kept in sync and unique.
+        """
+        self.assertEqual(self.left.email_normalized, 'left@example.com')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Subscriber.objects.create(email='left@example.com')
+        Subscriber.objects.filter(pk=self.left.pk).update(email=' Moved@Example.com')
+        self.left.refresh_from_db()
+        self.assertEqual(self.left.email_normalized, 'moved@example.com')
+
+    def test_import_matches_seeded_subscribers(self):
+        """
+        Ensure subscribers bulk inserted by the seeder are matched by an import, whatever the case.
+        """
+        seed_model(Subscriber, 2, seed=5)
+        first, second = Subscriber.objects.exclude(pk=self.left.pk).order_by('email')
+        self.assertEqual(first.email_normalized, first.email.lower())
+        response = self.upload('newsletter:subscriber-import', f'email\n{first.email.upper()}\n{second.email}\n')
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 2))
+        self.assertEqual(Subscriber.objects.count(), 3)
+
+    def test_unsubscribe_tokens_in_batches(self):
+        """
+        Ensure tokens are deactivated with one UPDATE per batch.
+        """
+        subscribers = [Subscriber.objects.create(email=f'reader{i}@example.com') for i in range(3)]
+        tokens = [subscriber.unsubscribe_token for subscriber in subscribers] + [self.left.unsubscribe_token, uuid.uuid4()]
+        with self.assertNumQueries(3):
+            result = unsubscribe_tokens(tokens, batch_size=2)
+        self.assertEqual(result, {'processed': 5, 'unsubscribed': 3, 'invalid': 0})
+        self.assertFalse(Subscriber.objects.filter(is_active=True).exists())
+
+    def test_unsubscribe_endpoint_accepts_json_and_files(self):
+        """
+        Ensure tokens can be posted as a JSON list or as a file, and invalid ones are counted.
+        """
+        first, second = [Subscriber.objects.create(email=f'reader{i}@example.com') for i in range(2)]
+        response = self.client.post(
+            reverse('newsletter:subscriber-unsubscribe'), {'tokens': [str(first.unsubscribe_token), 'nope']}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'processed': 2, 'unsubscribed': 1, 'invalid': 1})
+
+        response = self.upload('newsletter:subscriber-unsubscribe', f'{second.unsubscribe_token}\n\n{first.unsubscribe_token}\n', 'tokens.txt')
+        self.assertEqual(response.data, {'processed': 2, 'unsubscribed': 1, 'invalid': 0})
+        self.assertFalse(Subscriber.objects.filter(is_active=True).exists())
+
+    def test_unsubscribe_requires_the_change_permission(self):
+        """
+        Ensure staff without the change permission cannot unsubscribe anyone.
+        """
+        staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.force_authenticate(user=staff)
+        response = self.client.post(
+            reverse('newsletter:subscriber-unsubscribe'), {'tokens': [str(self.left.unsubscribe_token)]}, format='json',
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_import_requires_the_add_and_change_permissions(self):
+        """
+        Ensure staff allowed to add subscribers, but not to change them, cannot import over existing ones.
+        """
+        staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+        staff.user_permissions.add(Permission.objects.get(codename='add_subscriber'))
+        self.client.force_authenticate(user=staff)
+        self.assertEqual(self.upload('newsletter:subscriber-import', 'email,first_name\nleft@example.com,Renamed\n').status_code, 403)
+        self.left.refresh_from_db()
+        self.assertEqual(self.left.first_name, 'Old')
+
+        staff.user_permissions.add(Permission.objects.get(codename='change_subscriber'))
+        self.client.force_authenticate(user=User.objects.get(pk=staff.pk))
+        self.assertEqual(self.upload('newsletter:subscriber-import', 'email,first_name\nleft@example.com,Renamed\n').status_code, 200)
+
+
+class SendBenchmarkTests(TestCase):
+    """
+    Tests for the campaign sender benchmark.
+    """
+    def test_benchmark_sends_through_the_smtp_stand_in(self):
+        """
+        Ensure the benchmark delivers every message over SMTP and the resume scan sends nothing.
+        """
+        report = run_send_benchmark(20, workers=2, batch_size=7)
+        self.assertEqual(report['send']['sent'], 18)
+        self.assertEqual(report['send']['received'], 18)
+        self.assertEqual(report['send']['email_rows'], 18)
+        self.assertEqual(report['resume']['resent'], 0)
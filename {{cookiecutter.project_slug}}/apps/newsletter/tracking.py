@@ -0,0 +1,114 @@
+import base64
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.core.write_behind import WriteBehindBuffer
+
+from .models import Email
+from .stats import record_campaign_stats
+
+# Transparent 1x1 GIF served by the open tracking pixel
+PIXEL_GIF = base64.b64decode('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')
+
+
+def get_tracking_settings():
+    newsletter_settings = getattr(settings, 'NEWSLETTER_SETTINGS', {})
+    return {
+        'interval': newsletter_settings.get('OPEN_FLUSH_INTERVAL', 30),
+        'threshold': newsletter_settings.get('OPEN_FLUSH_THRESHOLD', 1000),
+        'batch_size': newsletter_settings.get('OPEN_FLUSH_BATCH_SIZE', 500),
+    }
+
+
+class OpenTracker(WriteBehindBuffer):
+    """
+    Buffers email opens in process memory and writes them behind in bulk.
+
+    Opens are kept per campaign with the minute of the first one and a hit
+    count, so repeat opens of an email cost a counter increment. A flush,
+    once the flush interval has elapsed or the buffer holds enough opens,
+    stamps them with one ``UPDATE ... WHERE id IN (...) AND opened_at IS
+    NULL`` per batch and minute, then adds the hits to the campaign's open
+    count and the emails opened for the first time to its unique open count,
+    in the rollup of the hour they were opened. Opens already stored update
+    no email, and ids that are not emails of the campaign count nothing.
+    """
+    description = 'email opens'
+
+    def __init__(self):
+        super().__init__()
+        self._opens = {}
+
+    def get_flush_interval(self):
+        return get_tracking_settings()['interval']
+
+    def get_flush_threshold(self):
+        return get_tracking_settings()['threshold']
+
+    def record(self, campaign_id, email_id):
+        opened_at = int(time.time()) // 60 * 60
+
+        def add():
+            opens = self._opens.setdefault(campaign_id, {})
+            if email_id in opens:
+                opens[email_id][1] += 1
+            else:
+                opens[email_id] = [opened_at, 1]
+
+        self.buffer(add)
+
+    def take(self):
+        opens, self._opens = self._opens, {}
+        return opens
+
+    def restore(self, state):
+        for campaign_id, emails in state.items():
+            opens = self._opens.setdefault(campaign_id, {})
+            for email_id, (opened_at, hits) in emails.items():
+                if email_id in opens:
+                    opens[email_id] = [min(opens[email_id][0], opened_at), opens[email_id][1] + hits]
+                else:
+                    opens[email_id] = [opened_at, hits]
+
+    def write(self, opens):
+        """Writes buffered opens to the database. Returns the number of emails opened for the first time."""
+        batch_size = get_tracking_settings()['batch_size']
+        first_opens = 0
+        with transaction.atomic():
+            for campaign_id, emails in opens.items():
+                email_ids = list(emails)
+                known = set()
+                for start in range(0, len(email_ids), batch_size):
+                    known.update(Email.objects.filter(
+                        campaign_id=campaign_id, pk__in=email_ids[start:start + batch_size],
+                    ).values_list('pk', flat=True))
+
+                # {minute: [email ids]}, and {hour: [hits, first opens]} for the rollups
+                email_ids_by_minute = {}
+                counts_by_hour = {}
+                for email_id in known:
+                    opened_at, hits = emails[email_id]
+                    email_ids_by_minute.setdefault(opened_at, []).append(email_id)
+                    counts_by_hour.setdefault(opened_at // 3600 * 3600, [0, 0])[0] += hits
+
+                for opened_at, minute_ids in email_ids_by_minute.items():
+                    timestamp = datetime.fromtimestamp(opened_at, tz=dt_timezone.utc)
+                    for start in range(0, len(minute_ids), batch_size):
+                        counts_by_hour[opened_at // 3600 * 3600][1] += Email.objects.filter(
+                            pk__in=minute_ids[start:start + batch_size],
+                            opened_at__isnull=True,
+                        ).update(opened_at=timestamp)
+
+                for hour, (hits, opened) in counts_by_hour.items():
+                    record_campaign_stats(
+                        campaign_id, datetime.fromtimestamp(hour, tz=dt_timezone.utc),
+                        open_count=hits, unique_open_count=opened,
+                    )
+                    first_opens += opened
+        return first_opens
+
+
+open_tracker = OpenTracker()
@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import OpenPixelView, SubscriberImportView, SubscriberUnsubscribeView
+
+app_name = 'newsletter'
+
+urlpatterns = [
+    path('open/<uuid:campaign_id>/<uuid:email_id>.gif', OpenPixelView.as_view(), name='open-pixel'),
+    path('subscribers/import/', SubscriberImportView.as_view(), name='subscriber-import'),
+    path('subscribers/unsubscribe/', SubscriberUnsubscribeView.as_view(), name='subscriber-unsubscribe'),
+]
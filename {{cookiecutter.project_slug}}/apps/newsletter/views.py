@@ -1,3 +1,105 @@
-from django.shortcuts import render
+import csv
 
-# Create your views here.
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import never_cache
+from rest_framework import status
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from apps.admin_api.permissions import AdminPermission
+from apps.core.authentication import with_stateless_jwt
+from apps.core.permission_cache import has_cached_perm
+
+from .models import Subscriber
+from .subscribers import import_subscribers, iter_csv_rows, iter_token_lines, unsubscribe_tokens
+from .tracking import PIXEL_GIF, open_tracker
+
+
+@method_decorator(never_cache, name='dispatch')
+class OpenPixelView(View):
+    """
+    The open tracking pixel embedded in campaign emails.
+
+    Answers with a prebuilt GIF; the open goes to the in-memory buffer of
+    the open tracker, which writes opens behind in bulk. Only the request
+    that finds a flush due runs queries, and a failed flush never fails it.
+    Not cached, so every client that loads images reaches the server.
+    """
+    # One hit per email opened; keep them out of the request log
+    request_log_exempt = True
+
+    def get(self, request, campaign_id, email_id):
+        open_tracker.record(campaign_id, email_id)
+        return HttpResponse(PIXEL_GIF, content_type='image/gif')
+
+
+class SubscriberUnsubscribePermission(AdminPermission):
+    perms_map = {'POST': 'change'}
+
+
+class SubscriberImportPermission(AdminPermission):
+    """An import adds new subscribers and updates existing ones, so it needs both permissions."""
+    def has_permission(self, request, view):
+        return super().has_permission(request, view) and (
+            request.user.is_superuser or has_cached_perm(request.user, 'newsletter.change_subscriber')
+        )
+
+
+class SubscriberImportView(APIView):
+    """
+    Adds or updates subscribers from an uploaded CSV file (multipart, key
+    'file') with an 'email' column and optional 'first_name' and
+    'last_name' columns. The file is parsed as it is read and upserted in
+    batches on the normalized email; existing subscribers keep their status
+    and any name the file leaves blank.
+    """
+    authentication_classes = with_stateless_jwt(api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+    permission_classes = [SubscriberImportPermission]
+    parser_classes = [MultiPartParser]
+    queryset = Subscriber.objects.all()
+
+    def post(self, request, *args, **kwargs):
+        file_obj = request.FILES.get('file')
+        if not file_obj:
+            return Response({'error': 'File not provided.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # All or nothing: a file that turns out unreadable half way imports no row
+            with transaction.atomic():
+                result = import_subscribers(iter_csv_rows(file_obj))
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response({'error': f'Error parsing file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+class SubscriberUnsubscribeView(APIView):
+    """
+    Unsubscribes the subscribers holding the given unsubscribe tokens, sent
+    as JSON ``{"tokens": [...]}`` or as an uploaded file (multipart, key
+    'file') with one token per line, with one UPDATE per batch.
+    """
+    authentication_classes = with_stateless_jwt(api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+    permission_classes = [SubscriberUnsubscribePermission]
+    parser_classes = [JSONParser, MultiPartParser]
+    queryset = Subscriber.objects.all()
+
+    def post(self, request, *args, **kwargs):
+        file_obj = request.FILES.get('file')
+        if file_obj:
+            values = iter_token_lines(file_obj)
+        else:
+            values = request.data.get('tokens')
+            if not isinstance(values, list):
+                return Response({'error': "Send a 'tokens' list or a file."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = unsubscribe_tokens(values)
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response({'error': f'Error parsing file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
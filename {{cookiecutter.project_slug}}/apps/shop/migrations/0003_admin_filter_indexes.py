@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_remove_product_slug_de_remove_product_slug_en_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', '-created_at'], name='shop_order_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status_en', '-created_at'], name='shop_order_status__f1e449_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status_de', '-created_at'], name='shop_order_status__88433d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status_fr', '-created_at'], name='shop_order_status__c71a61_idx'),
+        ),
+    ]
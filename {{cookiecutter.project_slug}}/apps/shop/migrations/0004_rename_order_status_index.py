@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0003_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RenameIndex(
+            model_name='order',
+            new_name='shop_order_status_date_idx',
+            old_name='shop_order_status_created_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='order',
+            new_name='shop_order_status_date_idx-en',
+            old_name='shop_order_status__f1e449_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='order',
+            new_name='shop_order_status_date_idx-de',
+            old_name='shop_order_status__88433d_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='order',
+            new_name='shop_order_status_date_idx-fr',
+            old_name='shop_order_status__c71a61_idx',
+        ),
+    ]
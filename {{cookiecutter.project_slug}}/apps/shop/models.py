@@ -61,6 +61,9 @@ class Order(models.Model):
         verbose_name = _('Order')
         verbose_name_plural = _('Orders')
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='shop_order_status_date_idx'),
+        ]
 
     def __str__(self):
         return f'Order {self.id}'
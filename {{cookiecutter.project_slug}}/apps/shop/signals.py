@@ -1,9 +1,9 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
+from apps.core.email_queue import queue_mail
 from django.conf import settings
 from .models import Order
-from apps.newsletter.models import Subscriber
+from apps.newsletter.models import Subscriber, normalize_email
 
 @receiver(post_save, sender=Order)
 def handle_order_updates(sender, instance, created, **kwargs):
@@ -25,7 +25,7 @@ def handle_order_updates(sender, instance, created, **kwargs):
         # Assumes ADMINS setting is configured e.g., ADMINS = [('Admin', 'admin@example.com')]
         admin_emails = [admin[1] for admin in settings.ADMINS]
         if admin_emails:
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, admin_emails)
+            queue_mail(subject, message, settings.DEFAULT_FROM_EMAIL, admin_emails)
 
     if instance.status == 'confirmed':
         # Send confirmation email to the customer
@@ -38,12 +38,13 @@ def handle_order_updates(sender, instance, created, **kwargs):
 
         Thank you for your purchase!
         """
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [instance.email])
+        queue_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [instance.email])
 
-        # Add the customer to the newsletter subscribers list
+        # Add the customer to the newsletter subscribers list, whatever the case of the address
         Subscriber.objects.get_or_create(
-            email=instance.email,
+            email_normalized=normalize_email(instance.email),
             defaults={
+                'email': instance.email,
                 'first_name': instance.first_name,
                 'last_name': instance.last_name,
                 'is_active': True,
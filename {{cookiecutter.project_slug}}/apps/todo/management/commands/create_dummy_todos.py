@@ -5,6 +5,7 @@ from apps.todo.models import Project, Task
 from datetime import timedelta
 from django.utils import timezone
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from PIL import Image
 from io import BytesIO
 
@@ -55,22 +56,27 @@ class Command(BaseCommand):
         ]
 
         self.stdout.write(f'Creating {len(titles)} dummy tasks with file uploads...')
-        for title in titles:
-            task = Task(
+        # Upload each file once and point every task at it, instead of
+        # saving (and updating the task for) two files per task
+        cover_image = default_storage.save('task_covers/dummy_cover.png', self._generate_dummy_image())
+        attachment = default_storage.save('task_attachments/dummy_attachment.txt', self._generate_dummy_attachment())
+
+        tasks = [
+            Task(
                 project=project,
                 title=title,
                 description=f"This is a detailed description for the task: {title}.",
                 status=random.choice([choice[0] for choice in Task.Status.choices]),
                 assignee=random.choice(users),
                 due_date=timezone.now().date() + timedelta(days=random.randint(1, 30)),
-                metadata={"priority": random.choice(['low', 'medium', 'high'])}
+                metadata={"priority": random.choice(['low', 'medium', 'high'])},
+                cover_image=cover_image,
+                attachment=attachment,
             )
-            
-            # Attach generated files
-            task.cover_image.save('dummy_cover.png', self._generate_dummy_image())
-            task.attachment.save('dummy_attachment.txt', self._generate_dummy_attachment())
-
-            # The task is saved implicitly by the .save() on the FileField
-            self.stdout.write(f'  - Created task: "{title}"')
+            for title in titles
+        ]
+        Task.objects.bulk_create(tasks)
+        for task in tasks:
+            self.stdout.write(f'  - Created task: "{task.title}"')
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully created and uploaded files for {len(titles)} dummy tasks.')) 
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f'Successfully created and uploaded files for {len(titles)} dummy tasks.'))
\ No newline at end of file
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date'], name='todo_task_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status_en', 'due_date'], name='todo_task_status_due_idx-en'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status_de', 'due_date'], name='todo_task_status_due_idx-de'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status_fr', 'due_date'], name='todo_task_status_due_idx-fr'),
+        ),
+    ]
@@ -40,5 +40,10 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='todo_task_status_due_idx'),
+        ]
+
     def __str__(self):
         return self.title 
\ No newline at end of file
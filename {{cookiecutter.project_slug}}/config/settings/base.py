@@ -42,11 +42,13 @@ LOCAL_APPS = [
 {% if cookiecutter.use_blog_app == 'yes' %}    'apps.blog',{% endif %}
 {% if cookiecutter.use_shop_app == 'yes' %}    'apps.shop',{% endif %}
 {% if cookiecutter.use_newsletter_app == 'yes' %}    'apps.newsletter',{% endif %}
+{% if cookiecutter.use_todo_app == 'yes' %}    'apps.todo',{% endif %}
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'apps.core.middleware.QueryInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -87,6 +89,21 @@ DATABASES = {
     )
 }
 
+# Cache
+# Without REDIS_URL every process keeps its own local memory cache, which
+# cannot see invalidations made by other processes. Stateless JWT claims and
+# permission sets are then not reused across requests, and throttle counters
+# and cached 2FA statuses are per process. Set REDIS_URL in any deployment
+# with more than one worker process.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -171,6 +188,9 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Reverse proxies in front of the app; throttles take the client IP from the
+    # X-Forwarded-For entry the last of them appended, and ignore the header at 0
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
 # DRF Spectacular Settings
@@ -219,6 +239,53 @@ CORS_ALLOWED_ORIGINS = config(
 )
 CORS_ALLOW_CREDENTIALS = True
 
+# Query instrumentation (per-view query counts, Server-Timing, query budgets)
+QUERY_INSTRUMENTATION = {
+    'ENABLED': True,
+    'STRICT_BUDGETS': False,  # Raise instead of logging when a view exceeds its query budget
+}
+
+# Throttling of password and OTP checks (sliding window per IP and per account).
+# Counters live in the default cache, so the limits apply per process unless a
+# shared cache is configured (REDIS_URL)
+AUTH_THROTTLE = {
+    'RATES': {
+        'auth_ip': '30/min',
+        'auth_username': '10/min',
+    },
+    'HASHING_CONCURRENCY': None,  # Concurrent password checks per process; defaults to the CPU count
+    'HASHING_WAIT': 2,  # Seconds to wait for a free slot before answering 503
+}
+
+# Outbound email queue, delivered by the send_queued_mail command
+EMAIL_QUEUE = {
+    'BATCH_SIZE': 100,  # Emails claimed and sent per connection round
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 60,  # Seconds before the first retry, doubled for each further attempt
+    'MAX_RETRY_DELAY': 6 * 60 * 60,
+    'LEASE': 10 * 60,  # Seconds before emails claimed by a worker that died are sent again
+    # Seconds failed emails keep their body for requeueing; sent ones are blanked at once,
+    # as bodies may carry live links such as password reset tokens
+    'FAILED_BODY_RETENTION': 3 * 24 * 60 * 60,
+    'BACKEND': None,  # Defaults to EMAIL_BACKEND
+}
+
+# Flush write-behind buffers (post views, email opens) from a background thread per process,
+# so an idle worker does not hold them until it exits
+WRITE_BEHIND_FLUSH_THREAD = True
+
+# Seconds a user's 2FA status stays cached for profile reads. Device changes rewrite it,
+# but without a shared cache other processes only see them once it expires; logins
+# always check the database
+TWO_FACTOR_STATUS_CACHE_TIMEOUT = 5 * 60
+# Seconds a rendered 2FA enrollment QR code stays cached
+TWO_FACTOR_QR_CACHE_TIMEOUT = 10 * 60
+
+# Seconds a user's resolved permission set stays cached; grant changes invalidate it sooner
+PERMISSION_CACHE_TIMEOUT = 60 * 60
+# Seconds the user row stays cached for stateless JWT requests that need the full user
+AUTH_USER_CACHE_TIMEOUT = 60
+
 # BLOG API SETTINGS
 BLOG_API_SETTINGS = {
     'PAGINATION_SIZE': 20,
@@ -232,6 +299,32 @@ BLOG_API_SETTINGS = {
     'ENABLE_SEARCH': True,
     'CACHE_TIMEOUT': 300,  # 5 minutes
     'RELATED_POSTS_COUNT': 5,
+    'VIEW_COUNT_FLUSH_INTERVAL': 30,  # Seconds between write-behind flushes of view counts
+    'VIEW_COUNT_FLUSH_THRESHOLD': 500,  # Buffered hits that force an early flush
+    'RECORD_POST_VIEWS': True,  # Store deduplicated PostView rows
+    'POST_VIEW_DEDUP_WINDOW': 30 * 60,  # 30 minutes
+    'FEED_TITLE': '{{ cookiecutter.project_name }}',
+    'FEED_DESCRIPTION': '',
+    'FEED_ITEM_COUNT': 20,
+    'FEED_SITE_URL': config('FEED_SITE_URL', default=''),  # Falls back to the requesting host
+    'FEED_POST_URL': '/blog/{slug}/',  # Path of a post on the site, formatted with slug and id
+    'SCHEDULED_PUBLISH_BATCH_SIZE': 500,  # Posts flipped per batch by publish_scheduled_posts
+}
+
+# NEWSLETTER SETTINGS
+NEWSLETTER_SETTINGS = {
+    'SEND_BATCH_SIZE': 1000,  # Subscribers read, sent and recorded per batch by send_campaign
+    'SEND_WORKERS': 4,  # Sending threads, each with its own connection
+    'SEND_RATE': None,  # Messages per second across all workers; None for no limit
+    'SEND_LEASE': 10 * 60,  # Seconds a run holds a campaign per batch; longer than sending one batch takes
+    'FROM_EMAIL': None,  # Defaults to DEFAULT_FROM_EMAIL
+    'UNSUBSCRIBE_URL': config('NEWSLETTER_UNSUBSCRIBE_URL', default=''),  # Absolute URL formatted with token
+    'TRACKING_SITE_URL': config('NEWSLETTER_TRACKING_SITE_URL', default=''),  # Base of the open tracking pixel; empty disables it
+    'OPEN_FLUSH_INTERVAL': 30,  # Seconds between write-behind flushes of email opens
+    'OPEN_FLUSH_THRESHOLD': 1000,  # Buffered opens that force an early flush
+    'OPEN_FLUSH_BATCH_SIZE': 500,  # Email ids per UPDATE when flushing opens
+    'IMPORT_BATCH_SIZE': 1000,  # Rows per upsert when importing subscribers, tokens per UPDATE when unsubscribing
+    'BACKEND': None,  # Defaults to EMAIL_BACKEND
 }
 
 # Admin site configuration
@@ -13,6 +13,14 @@ DATABASES = {
     }
 }
 
+# Tests never reach a Redis server from the environment; shared cache tests
+# override CACHES with a file based cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Disable migrations for faster tests
 class DisableMigrations:
     def __contains__(self, item):
@@ -21,4 +29,13 @@ class DisableMigrations:
     def __getitem__(self, item):
         return None
 
-MIGRATION_MODULES = DisableMigrations() 
\ No newline at end of file
+MIGRATION_MODULES = DisableMigrations() 
+
+# Fail tests when a view exceeds the query budget declared on its ModelAdmin
+QUERY_INSTRUMENTATION = {**QUERY_INSTRUMENTATION, 'STRICT_BUDGETS': True}
+
+# Tests share one client IP; throttling tests enable the limits explicitly
+AUTH_THROTTLE = {**AUTH_THROTTLE, 'RATES': {'auth_ip': None, 'auth_username': None}}
+
+# Tests flush write-behind buffers explicitly, inside their own transaction
+WRITE_BEHIND_FLUSH_THREAD = False
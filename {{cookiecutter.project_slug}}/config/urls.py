@@ -16,6 +16,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/admin/', include('apps.admin_api.urls')),
     {% if cookiecutter.use_blog_app == 'yes' %}    path('api/blog/', include('apps.blog.urls', namespace='blog')),{% endif %}
+    {% if cookiecutter.use_newsletter_app == 'yes' %}    path('api/newsletter/', include('apps.newsletter.urls', namespace='newsletter')),{% endif %}
     path('api/token/', TwoFactorTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     # User Profile Management
@@ -28,6 +29,7 @@ urlpatterns = [
     path('api/auth/password_reset/confirm/', core_views.PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
     # 2FA
     path('api/auth/2fa/enable/', core_views.TwoFactorEnableView.as_view(), name='2fa_enable'),
+    path('api/auth/2fa/qr-code.<str:image_format>', core_views.TwoFactorQRCodeView.as_view(), name='2fa_qr_code'),
     path('api/auth/2fa/verify/', core_views.TwoFactorVerifyView.as_view(), name='2fa_verify'),
     path('api/auth/2fa/disable/', core_views.TwoFactorDisableView.as_view(), name='2fa_disable'),
     # API Schema: